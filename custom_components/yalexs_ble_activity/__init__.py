@@ -2,34 +2,85 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from functools import partial
 from importlib.metadata import version
 import logging
+import time
+from typing import Any
 
+from homeassistant.components import recorder
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import Event, HomeAssistant
-from homeassistant.exceptions import ConfigEntryError
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
 from homeassistant.helpers import (
     config_validation as cv,
     device_registry as dr,
     entity_registry as er,
 )
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 from homeassistant.helpers.event import async_track_entity_registry_updated_event
 from homeassistant.helpers.issue_registry import IssueSeverity, async_create_issue
-from homeassistant.util import package as pkg_util
+from homeassistant.helpers.typing import ConfigType
 import yalexs_ble
 
-from .const import CONF_LOCK_ENTITIES, DOMAIN, YALEXSBLE_PATCH_URL
+from .archive import ActivityArchive, archive_key
+from .audit import ActivityAudit
+from .const import (
+    CONF_ARCHIVE,
+    CONF_FILTERS,
+    CONF_LOCK_ENTITIES,
+    CONF_RETENTION_DAYS,
+    DOMAIN,
+    SIGNAL_LOCK_ENTITIES_UPDATED,
+)
+from .drain import ActivityDrainCoordinator
+from .entity import async_lock_addresses
+from .filters import ActivityFilter, compile_activity_filter
+from .history import async_warm_history
+from .installer import DATA_PATCH_INSTALLER, PatchInstaller, PatchStatus
+from .journal import ActivityJournal
+from .models import YaleXSBLEActivityConfigEntry, YaleXSBLEActivityData
+from .pipeline import ActivityPipeline
+from .retention import ActivityRetention
+from .services import async_setup_services
+from .sink import async_create_forwarders
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.EVENT, Platform.SENSOR]
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 YALEXSBLE_VERSION = version("yalexs-ble")
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001
+    """Set up Yale Access Bluetooth Activity.
+
+    Patches are installed in the background as soon as the integration is set
+    up, so they are often ready by the time config entries are set up.
+
+    Returns:
+        If the setup was successful.
+    """
+    installer = hass.data[DATA_PATCH_INSTALLER] = PatchInstaller(hass)
+    await installer.async_load()
+
+    if not _yalexs_ble_patched():
+        installer.async_ensure(YALEXSBLE_VERSION)
+
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    return True
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: YaleXSBLEActivityConfigEntry
+) -> bool:
     """Set up Yale Access Bluetooth Activity from a config entry.
 
     Returns:
@@ -37,63 +88,182 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     Raises:
         ConfigEntryError: If there is an issue with setup.
+        ConfigEntryNotReady: If patches are still being installed.
     """
     _LOGGER.debug("setup %s with config:%s", entry.title, entry.data)
+    started = time.perf_counter()
 
-    if not hasattr(yalexs_ble.PushLock, "register_activity_callback"):
+    if not _yalexs_ble_patched():
         _LOGGER.debug("%s no activity callback:%s", entry.title, entry.data)
 
-        def _install_yalexs_ble_patch() -> bool:
-            return bool(
-                pkg_util.install_package(
-                    YALEXSBLE_PATCH_URL.format(version=YALEXSBLE_VERSION)
-                )
+        status = hass.data[DATA_PATCH_INSTALLER].async_ensure(YALEXSBLE_VERSION)
+        translation_placeholders = {"yalexs_ble_version": YALEXSBLE_VERSION}
+
+        if status is PatchStatus.INSTALLING:
+            raise ConfigEntryNotReady(
+                translation_domain=DOMAIN,
+                translation_key="yalexs_ble_installing",
+                translation_placeholders=translation_placeholders,
             )
 
         raise ConfigEntryError(
             translation_domain=DOMAIN,
             translation_key="yalexs_ble_patched"
-            if (await hass.async_add_executor_job(_install_yalexs_ble_patch))
+            if status is PatchStatus.INSTALLED
             else "yalexs_ble_no_patch_available",
-            translation_placeholders={
-                "yalexs_ble_version": YALEXSBLE_VERSION,
-            },
+            translation_placeholders=translation_placeholders,
         )
 
-    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
-    entry.async_on_unload(
-        async_track_entity_registry_updated_event(
-            hass,
-            entry.data[CONF_LOCK_ENTITIES],
-            partial(_async_handle_lock_entity_change, hass, entry),
-        ),
+    journal = ActivityJournal(hass, entry)
+    await journal.async_load()
+
+    entry.runtime_data = YaleXSBLEActivityData(
+        data=dict(entry.data),
+        drain=ActivityDrainCoordinator(hass, entry),
+        pipeline=ActivityPipeline(hass, entry),
+        journal=journal,
+        filters=_async_compile_filters(hass, entry),
     )
 
+    if retention_days := entry.data.get(CONF_RETENTION_DAYS):
+        retention = ActivityRetention(
+            hass,
+            entry,
+            retention_days,
+            partial(_async_entity_ids, hass, entry),
+        )
+        entry.runtime_data.retention = retention
+        entry.async_on_unload(retention.async_start())
+
+    if entry.data.get(CONF_ARCHIVE):
+        archive = ActivityArchive(hass, entry)
+        entry.runtime_data.archive = archive
+        entry.async_on_unload(archive.async_start())
+
+        if recorder.DOMAIN in hass.config.components:
+            audit = ActivityAudit(
+                hass, entry, archive, partial(_async_archive_keys, hass, entry)
+            )
+            entry.runtime_data.audit = audit
+            entry.async_on_unload(audit.async_start())
+
+    for forwarder in async_create_forwarders(hass, entry):
+        entry.runtime_data.sinks.append(forwarder)
+        entry.async_on_unload(await forwarder.async_start())
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    entry.async_on_unload(_async_track_lock_entities(hass, entry))
+
+    _async_remove_stale_locks(hass, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    journal.async_discard_restored()
+    entry.async_create_background_task(
+        hass,
+        async_warm_history(hass, entry.runtime_data.locks),
+        f"yalexs_ble_activity warm history {entry.title}",
+    )
+
+    _LOGGER.debug("setup %s in %.3fs", entry.title, time.perf_counter() - started)
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_unload_entry(
+    hass: HomeAssistant, entry: YaleXSBLEActivityConfigEntry
+) -> bool:
     """Unload a config entry.
 
     Returns:
         If the unload was successful.
     """
+    unloaded = bool(await hass.config_entries.async_unload_platforms(entry, PLATFORMS))
+
+    if archive := entry.runtime_data.archive:
+        await archive.async_flush()
+
+    await entry.runtime_data.journal.async_sync()
+
+    for forwarder in entry.runtime_data.sinks:
+        await forwarder.async_stop()
+
+    return unloaded
+
 
-    # remove this config entry from the real core devices as a way of keeping
-    # the state of things clean. this is particularly helpful when changing
-    # the chosen locks on the entry where the UI would still display the old
-    # device connection when a lock was removed.
+@callback
+def _async_remove_stale_locks(
+    hass: HomeAssistant, entry: YaleXSBLEActivityConfigEntry
+) -> None:
+    """Remove the entities & device links of locks no longer part of an entry.
+
+    Locks removed along with other changes to the entry are not reconciled
+    while it's loaded since the entry is reloaded instead, so they're removed
+    when the entry is set up again.
+    """
+    entity_registry = er.async_get(hass)
     device_registry = dr.async_get(hass)
-    device_entries = dr.async_entries_for_config_entry(
-        device_registry, config_entry_id=entry.entry_id
-    )
-    for device in device_entries:
-        device_registry.async_update_device(
-            device.id, remove_config_entry_id=entry.entry_id
+    lock_device_ids = {
+        lock_entry.device_id
+        for lock_entity_id in entry.data[CONF_LOCK_ENTITIES]
+        if (lock_entry := entity_registry.async_get(lock_entity_id))
+    }
+
+    for entity_entry in er.async_entries_for_config_entry(
+        entity_registry, entry.entry_id
+    ):
+        if entity_entry.device_id not in lock_device_ids:
+            entity_registry.async_remove(entity_entry.entity_id)
+
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if device.id not in lock_device_ids:
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
+def _yalexs_ble_patched() -> bool:
+    return hasattr(yalexs_ble.PushLock, "register_activity_callback")
+
+
+@callback
+def _async_track_lock_entities(
+    hass: HomeAssistant, entry: YaleXSBLEActivityConfigEntry
+) -> CALLBACK_TYPE:
+    """Track registry changes to the locks of a config entry.
+
+    Tracking follows changes to the locks of the entry as they're applied.
+
+    Returns:
+        A callback to stop tracking.
+    """
+    untrack: CALLBACK_TYPE | None = None
+
+    @callback
+    def _async_track() -> None:
+        nonlocal untrack
+
+        if untrack is not None:
+            untrack()
+
+        untrack = async_track_entity_registry_updated_event(
+            hass,
+            entry.data[CONF_LOCK_ENTITIES],
+            partial(_async_handle_lock_entity_change, hass, entry),
         )
 
-    return bool(await hass.config_entries.async_unload_platforms(entry, PLATFORMS))
+    @callback
+    def _async_untrack() -> None:
+        assert untrack is not None
+
+        unsubscribe()
+        untrack()
+
+    _async_track()
+    unsubscribe = async_dispatcher_connect(
+        hass,
+        SIGNAL_LOCK_ENTITIES_UPDATED.format(entry_id=entry.entry_id),
+        _async_track,
+    )
+
+    return _async_untrack
 
 
 async def _async_handle_lock_entity_change(  # noqa: RUF029
@@ -112,16 +282,55 @@ async def _async_handle_lock_entity_change(  # noqa: RUF029
         old_lock_id = data["old_entity_id"]
         new_lock_id = data["entity_id"]
 
-        hass.config_entries.async_update_entry(
-            entry,
-            data={
-                **entry.data,
-                CONF_LOCK_ENTITIES: [
-                    new_lock_id if lock_id == old_lock_id else lock_id
-                    for lock_id in lock_entity_ids
-                ],
-            },
+        data = {
+            **entry.data,
+            CONF_LOCK_ENTITIES: [
+                new_lock_id if lock_id == old_lock_id else lock_id
+                for lock_id in lock_entity_ids
+            ],
+        }
+
+        if (filters := entry.data.get(CONF_FILTERS)) and old_lock_id in filters:
+            data[CONF_FILTERS] = {
+                new_lock_id if lock_id == old_lock_id else lock_id: rules
+                for lock_id, rules in filters.items()
+            }
+
+        hass.config_entries.async_update_entry(entry, data=data)
+
+
+@callback
+def _async_entity_ids(hass: HomeAssistant, entry: ConfigEntry) -> list[str]:
+    """Get the entity IDs that record activity for a config entry.
+
+    Both the operation sensors & the activity events record each activity.
+
+    Returns:
+        The entity IDs.
+    """
+    return [
+        entity_entry.entity_id
+        for entity_entry in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
         )
+        if entity_entry.domain in {Platform.EVENT, Platform.SENSOR}
+    ]
+
+
+@callback
+def _async_archive_keys(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, str]:
+    """Get the archive key of the entities that record activity for an entry.
+
+    Returns:
+        The archive keys keyed by entity ID.
+    """
+    return {
+        entity_entry.entity_id: archive_key(entity_entry.unique_id)
+        for entity_entry in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+        if entity_entry.domain == Platform.SENSOR
+    }
 
 
 def _create_removed_lock_entity_issue(
@@ -145,7 +354,55 @@ def _create_removed_lock_entity_issue(
 
 async def _async_update_listener(
     hass: HomeAssistant,
-    entry: ConfigEntry,
+    entry: YaleXSBLEActivityConfigEntry,
 ) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update.
+
+    When only the locks of the entry or their filters change, the change is
+    applied to the loaded entry so that the activity subscriptions & pending
+    updates of all other locks are left untouched. Any other change reloads
+    the entry.
+    """
+    runtime_data = entry.runtime_data
+
+    if _without_live_options(entry.data) != _without_live_options(runtime_data.data):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    runtime_data.data = dict(entry.data)
+
+    # sensors hold the filters, so they're replaced in place.
+    runtime_data.filters.clear()
+    runtime_data.filters.update(_async_compile_filters(hass, entry))
+
+    async_dispatcher_send(
+        hass, SIGNAL_LOCK_ENTITIES_UPDATED.format(entry_id=entry.entry_id)
+    )
+
+
+@callback
+def _async_compile_filters(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+) -> dict[str, ActivityFilter]:
+    """Compile the filter rules of the locks of an entry.
+
+    Returns:
+        The predicate of each lock that filters activity keyed by address.
+    """
+    addresses = async_lock_addresses(hass, entry.data[CONF_LOCK_ENTITIES])
+
+    return {
+        addresses[lock_entity_id]: activity_filter
+        for lock_entity_id, rules in entry.data.get(CONF_FILTERS, {}).items()
+        if lock_entity_id in addresses
+        and (activity_filter := compile_activity_filter(rules)) is not None
+    }
+
+
+def _without_live_options(data: Mapping[str, Any]) -> dict[str, Any]:
+    return {
+        key: value
+        for key, value in data.items()
+        if key not in {CONF_LOCK_ENTITIES, CONF_FILTERS}
+    }
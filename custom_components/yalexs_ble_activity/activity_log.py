@@ -0,0 +1,242 @@
+"""Per-lock activity processing log for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+import datetime as dt
+from itertools import islice
+from typing import Any
+
+from yalexs_ble import DoorActivity, LockActivity
+
+from .const import (
+    ACTIVITY_HISTORY_SIZE,
+    ATTR_REMOTE_TYPE,
+    ATTR_SLOT,
+    ATTR_SOURCE,
+    ATTR_TIMESTAMP,
+    DIAGNOSTICS_RECENT_ACTIVITY_COUNT,
+    TIMELINE_HISTORY_SIZE,
+)
+
+type TimelineKey = tuple[float, str]
+
+
+@dataclass(slots=True, frozen=True)
+class ProcessedActivity:
+    """An activity that was processed for a lock.
+
+    Activity restored from the recorder was not processed since startup and
+    has no processing time.
+    """
+
+    processed_at: dt.datetime | None
+    timestamp: dt.datetime
+    state: str | None
+    source: str | None = None
+    remote_type: str | None = None
+    slot: int | None = None
+
+    @classmethod
+    def from_values(
+        cls,
+        processed_at: dt.datetime,
+        state: str | None,
+        attributes: Mapping[str, Any],
+    ) -> ProcessedActivity:
+        """Create a processed activity from the values of the sensor.
+
+        Returns:
+            The processed activity.
+        """
+        return cls(
+            processed_at=processed_at,
+            timestamp=attributes[ATTR_TIMESTAMP],
+            state=state,
+            source=attributes.get(ATTR_SOURCE),
+            remote_type=attributes.get(ATTR_REMOTE_TYPE),
+            slot=attributes.get(ATTR_SLOT),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The processed activity.
+        """
+        return {
+            "processed_at": self.processed_at,
+            "timestamp": self.timestamp,
+            "state": self.state,
+            "source": self.source,
+            "remote_type": self.remote_type,
+            "slot": self.slot,
+        }
+
+
+class LockTimeline:
+    """The recent activity of a lock in chronological order.
+
+    Activity usually arrives in order & is appended, but backlog read from a
+    lock can arrive after more recent live activity, so it's inserted in
+    place. Only the most recent activities are kept, enough for the largest
+    page of the site-wide timeline from each lock. Each activity is keyed by
+    its timestamp & state, so an activity has the same key after a restart
+    when it's restored from the recorder & is only kept once.
+    """
+
+    __slots__ = ("_activities", "_keys", "size")
+
+    def __init__(self, size: int = TIMELINE_HISTORY_SIZE) -> None:
+        """Initialize the timeline."""
+        self.size = size
+        self._keys: list[TimelineKey] = []
+        self._activities: list[ProcessedActivity] = []
+
+    def __len__(self) -> int:
+        """Get the number of activities.
+
+        Returns:
+            The number of activities.
+        """
+        return len(self._keys)
+
+    def insert(self, activity: ProcessedActivity) -> None:
+        """Insert an activity in chronological order.
+
+        Once the timeline is full, the oldest activity is removed, and
+        activity older than all of the kept activity is not inserted. Activity
+        that's already in the timeline is not inserted again.
+        """
+        key = (activity.timestamp.timestamp(), activity.state or "")
+        index = bisect_left(self._keys, key)
+
+        if index < len(self._keys) and self._keys[index] == key:
+            return
+
+        if len(self._keys) >= self.size:
+            if index == 0:
+                return
+
+            del self._keys[0]
+            del self._activities[0]
+            index -= 1
+
+        self._keys.insert(index, key)
+        self._activities.insert(index, activity)
+
+    def before(
+        self, key: TimelineKey | None = None
+    ) -> Iterator[tuple[TimelineKey, ProcessedActivity]]:
+        """Iterate over the activity before a key, newest first.
+
+        Args:
+            key: The key to start before; the newest activity when `None`.
+
+        Yields:
+            The key & activity.
+        """
+        index = len(self._keys) if key is None else bisect_left(self._keys, key)
+
+        for position in range(index - 1, -1, -1):
+            yield self._keys[position], self._activities[position]
+
+
+@dataclass(slots=True)
+class LockActivityLog:
+    """Track how activity flows through the processing of a single lock.
+
+    Only a fixed number of recent activities are kept as the history of the
+    lock, and only the most recent of those are included in diagnostics, so
+    producing a diagnostics representation takes constant time regardless of
+    how much activity has been processed. The activity last written as the
+    state of the sensor is kept as the latest activity of the lock. More of
+    the same activity is kept in chronological order as the timeline of the
+    lock.
+    """
+
+    address: str
+    received: int = 0
+    filtered: int = 0
+    suppressed: int = 0
+    storms: int = 0
+    recorder_submissions: int = 0
+    events_fired: int = 0
+    states_written: int = 0
+    pending: DoorActivity | LockActivity | None = None
+    timer_armed: bool = False
+    latest: ProcessedActivity | None = None
+    recent: deque[ProcessedActivity] = field(
+        default_factory=lambda: deque(maxlen=ACTIVITY_HISTORY_SIZE)
+    )
+    timeline: LockTimeline = field(default_factory=LockTimeline)
+
+    def append(self, activity: ProcessedActivity) -> None:
+        """Add activity that was processed for the lock."""
+        self.recent.append(activity)
+        self.timeline.insert(activity)
+
+    def restore(self, activities: list[ProcessedActivity]) -> None:
+        """Restore history that predates activity processed since startup.
+
+        Restored activity that was also processed since startup is skipped.
+        The most recent restored activity is the latest activity of the lock
+        until activity is written as the state of the sensor.
+
+        Args:
+            activities: The activities to restore, oldest first.
+        """
+        processed = {(activity.timestamp, activity.state) for activity in self.recent}
+        history = [
+            activity
+            for activity in activities
+            if (activity.timestamp, activity.state) not in processed
+        ]
+
+        for activity in history[-self.timeline.size :]:
+            self.timeline.insert(activity)
+
+        history.extend(self.recent)
+
+        self.recent.clear()
+        self.recent.extend(history)
+
+        if self.latest is None and activities:
+            self.latest = activities[-1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The lock's activity processing state.
+        """
+        pending = self.pending
+
+        return {
+            "pending": None
+            if pending is None
+            else {
+                "type": "door" if isinstance(pending, DoorActivity) else "lock",
+                "status": pending.status.name.lower(),
+                "timestamp": pending.timestamp,
+            },
+            "timer_armed": self.timer_armed,
+            "received": self.received,
+            "filtered": self.filtered,
+            "suppressed": self.suppressed,
+            "storms": self.storms,
+            "recorder_submissions": self.recorder_submissions,
+            "events_fired": self.events_fired,
+            "states_written": self.states_written,
+            "recent": [
+                activity.as_dict()
+                for activity in reversed(
+                    list(
+                        islice(reversed(self.recent), DIAGNOSTICS_RECENT_ACTIVITY_COUNT)
+                    )
+                )
+            ],
+        }
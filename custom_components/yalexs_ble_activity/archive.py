@@ -0,0 +1,626 @@
+"""Columnar activity archive for Yale Access Bluetooth Activity.
+
+Activity is archived per lock in segment files of up to
+`ARCHIVE_SEGMENT_SIZE` activities. Each segment starts with a fixed size
+header, which includes the number of activities & the earliest & latest
+timestamps of the segment so reads can skip segments outside of a range.
+
+Each flush appends a block of activity to the final segment & then updates the
+header, so only the new activity is written. A block stores its activities as
+columns following the number of activities & a base timestamp:
+
+- timestamps: `int32` deltas in seconds from the previous activity (the first
+  is relative to the base timestamp of the block)
+- slots: `uint16` codes (`0xFFFF` for no slot)
+- statuses: `uint8` codes (the value of door statuses & the value of lock
+  statuses with the high bit set)
+- sources: `uint8` codes (the value of the source plus one, or `0` for no
+  source)
+
+Codes are derived from the values of the `yalexs_ble` enums, so they stay
+the same as statuses & sources are added.
+
+Blocks beyond the number of activities in the header, i.e. from a flush that
+was interrupted, are ignored & overwritten by the next flush.
+
+Segments are memory mapped for queries and columns are read through
+`memoryview` casts, so aggregations run over the mapped data without decoding
+rows into Python objects. The remote type of lock operations isn't archived.
+"""
+
+from __future__ import annotations
+
+from array import array
+import asyncio
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+import datetime as dt
+from functools import partial
+from itertools import accumulate, compress, islice, repeat
+import logging
+import mmap
+from operator import attrgetter, floordiv
+from pathlib import Path
+import struct
+import time
+from typing import IO, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import event as evt
+from homeassistant.util import dt as dt_util
+from yalexs_ble.const import DoorStatus, LockOperationSource, LockStatus
+
+from .const import ARCHIVE_FLUSH_INTERVAL, ARCHIVE_SEGMENT_SIZE, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_MAGIC = b"YBAA"
+_VERSION = 4
+_HEADER = struct.Struct("<4sHxxIqq4x")
+_BLOCK_HEADER = struct.Struct("<I4xq")
+_NO_SLOT = 0xFFFF
+_SEGMENT_SUFFIX = ".seg"
+
+_LOCK_STATUS_FLAG = 0x80
+_NO_SOURCE = 0
+
+_STATUSES = {
+    **{status.value: f"door_{status.name.lower()}" for status in DoorStatus},
+    **{
+        _LOCK_STATUS_FLAG | status.value: f"lock_{status.name.lower()}"
+        for status in LockStatus
+    },
+}
+_STATUS_CODES = {status: code for code, status in _STATUSES.items()}
+_SOURCES = {source.value + 1: source.name.lower() for source in LockOperationSource}
+_SOURCE_CODES = {source: code for code, source in _SOURCES.items()}
+
+
+class ArchiveSegmentError(Exception):
+    """An archive segment is not a supported format."""
+
+
+@dataclass(slots=True)
+class ActivityColumns:
+    """Columns of activity with absolute timestamps in seconds."""
+
+    timestamps: array[int] = field(default_factory=partial(array, "q"))
+    statuses: array[int] = field(default_factory=partial(array, "B"))
+    sources: array[int] = field(default_factory=partial(array, "B"))
+    slots: array[int] = field(default_factory=partial(array, "H"))
+
+    def __len__(self) -> int:
+        """Get the number of activities.
+
+        Returns:
+            The number of activities.
+        """
+        return len(self.timestamps)
+
+    def extend(self, other: ActivityColumns) -> None:
+        """Add the activities of other columns to these columns."""
+        self.timestamps.extend(other.timestamps)
+        self.statuses.extend(other.statuses)
+        self.sources.extend(other.sources)
+        self.slots.extend(other.slots)
+
+    def slice(self, start: int, stop: int) -> ActivityColumns:
+        """Get a range of activities.
+
+        Returns:
+            The columns of the activities.
+        """
+        return ActivityColumns(
+            self.timestamps[start:stop],
+            self.statuses[start:stop],
+            self.sources[start:stop],
+            self.slots[start:stop],
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class _Block:
+    """The mapped columns of a block of activity."""
+
+    base: int
+    deltas: memoryview
+    slots: memoryview
+    statuses: memoryview
+    sources: memoryview
+
+    @property
+    def timestamps(self) -> Iterator[int]:
+        """The absolute timestamps of the activities."""
+        return islice(accumulate(self.deltas, initial=self.base), 1, None)
+
+
+@dataclass(slots=True, frozen=True)
+class _MappedSegment:
+    """The header & mapped blocks of a segment."""
+
+    count: int
+    earliest: int
+    latest: int
+    end: int
+    blocks: list[_Block]
+
+
+@dataclass(slots=True, frozen=True)
+class ArchiveSummary:
+    """Aggregated usage of archived activity."""
+
+    activities: int
+    heatmap: list[list[int]]
+    slots: dict[int, int]
+    statuses: dict[str, int]
+    size: int
+    query_time: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for a service response.
+
+        Returns:
+            The summary.
+        """
+        return {
+            "activities": self.activities,
+            "heatmap": self.heatmap,
+            "slots": {str(slot): count for slot, count in sorted(self.slots.items())},
+            "statuses": self.statuses,
+            "size": self.size,
+            "query_time": self.query_time,
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class ArchivedActivity:
+    """An activity read from the archive with its timestamp in seconds."""
+
+    timestamp: int
+    state: str
+    source: str | None
+    slot: int | None
+
+
+class ActivityArchive:
+    """Archive the activity of the locks of a config entry.
+
+    Activity is buffered on the event loop & periodically written to disk in
+    the executor. Activity is appended to the final segment of each lock while
+    it has room, so the number of segments stays proportional to the activity.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the archive."""
+        self.hass = hass
+        self.entry = entry
+        self.path = Path(hass.config.path(DOMAIN, "archive"))
+        self.archived = 0
+        self.last_flush: dt.datetime | None = None
+        self._buffers: dict[str, ActivityColumns] = {}
+        self._buffered = 0
+        self._flush_lock = asyncio.Lock()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Schedule periodic flushes.
+
+        Returns:
+            A callback to stop scheduling flushes.
+        """
+        return evt.async_track_time_interval(
+            self.hass,
+            self._async_scheduled_flush,
+            ARCHIVE_FLUSH_INTERVAL,
+            name="yalexs_ble_activity archive flush",
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def _async_scheduled_flush(self, now: dt.datetime) -> None:  # noqa: ARG002
+        self.entry.async_create_background_task(
+            self.hass, self.async_flush(), "yalexs_ble_activity archive flush"
+        )
+
+    @callback
+    def async_append(
+        self,
+        key: str,
+        timestamp: dt.datetime,
+        state: str,
+        source: str | None,
+        slot: int | None,
+    ) -> None:
+        """Buffer an activity to be archived.
+
+        Args:
+            key: The key of the lock.
+            timestamp: The time of the activity.
+            state: The state of the activity.
+            source: The source of a lock operation.
+            slot: The slot used for a lock operation. Slots that don't fit
+                the archive are archived as no slot.
+        """
+        if (status_code := _STATUS_CODES.get(state)) is None:
+            return
+
+        if (columns := self._buffers.get(key)) is None:
+            columns = self._buffers[key] = ActivityColumns()
+
+        columns.timestamps.append(int(timestamp.timestamp()))
+        columns.statuses.append(status_code)
+        columns.sources.append(
+            _NO_SOURCE
+            if source is None
+            else _SOURCE_CODES.get(source, _SOURCE_CODES["unknown"])
+        )
+        columns.slots.append(
+            slot if slot is not None and 0 <= slot < _NO_SLOT else _NO_SLOT
+        )
+        self._buffered += 1
+
+        if self._buffered >= ARCHIVE_SEGMENT_SIZE:
+            self._buffered = 0
+            self.entry.async_create_background_task(
+                self.hass, self.async_flush(), "yalexs_ble_activity archive flush"
+            )
+
+    async def async_flush(self) -> None:
+        """Write buffered activity to disk.
+
+        Activity of locks that couldn't be written is buffered again ahead of
+        any activity buffered since, so it's written by the next flush.
+        """
+        async with self._flush_lock:
+            buffers, self._buffers = self._buffers, {}
+            self._buffered = 0
+
+            if not buffers:
+                return
+
+            buffered = sum(len(columns) for columns in buffers.values())
+
+            try:
+                await self.hass.async_add_executor_job(
+                    _write_buffers, self.path, buffers
+                )
+            except OSError:
+                _LOGGER.exception("failed to archive activity")
+                unwritten = sum(len(columns) for columns in buffers.values())
+                self.archived += buffered - unwritten
+
+                for key, columns in self._buffers.items():
+                    if key in buffers:
+                        buffers[key].extend(columns)
+                    else:
+                        buffers[key] = columns
+
+                self._buffers = buffers
+                self._buffered += unwritten
+                return
+
+            self.archived += buffered
+            self.last_flush = dt_util.utcnow()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The archive state.
+        """
+        return {
+            "buffered": sum(len(columns) for columns in self._buffers.values()),
+            "archived": self.archived,
+            "last_flush": self.last_flush,
+        }
+
+
+def archive_key(unique_id: str) -> str:
+    """Get a file system safe key for a lock.
+
+    Returns:
+        The key.
+    """
+    return "".join(char if char.isalnum() else "_" for char in unique_id).lower()
+
+
+def _write_buffers(path: Path, buffers: dict[str, ActivityColumns]) -> None:
+    """Write the buffered activity of each lock.
+
+    The activity of each lock is removed from the buffers once written, so
+    only unwritten activity remains if writing fails.
+    """
+    for key in list(buffers):
+        append_columns(path / key, buffers[key])
+        del buffers[key]
+
+
+def append_columns(directory: Path, columns: ActivityColumns) -> None:
+    """Append activity to the archive of a lock.
+
+    The activity is appended to the final segment as a block while it has
+    room, so the existing activity is never rewritten. Activity is written to
+    a new segment when the final segment is not a supported format.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    index = room = 0
+
+    if segments := _segments(directory):
+        last = segments[-1]
+        index = int(last.stem) + 1
+
+        try:
+            with _mapped_segment(last) as segment:
+                room = max(ARCHIVE_SEGMENT_SIZE - segment.count, 0)
+        except ArchiveSegmentError:
+            _LOGGER.warning("unsupported archive segment %s, starting a new one", last)
+
+        if room:
+            _append_block(last, segment, columns.slice(0, room))
+
+    for offset in range(room, len(columns), ARCHIVE_SEGMENT_SIZE):
+        _write_segment(
+            directory / f"{index:08d}{_SEGMENT_SUFFIX}",
+            columns.slice(offset, offset + ARCHIVE_SEGMENT_SIZE),
+        )
+        index += 1
+
+
+def _append_block(
+    path: Path, segment: _MappedSegment, columns: ActivityColumns
+) -> None:
+    """Append a block to a segment & then update its header.
+
+    The header is written last, so an interrupted append leaves the segment
+    with its previous activity.
+    """
+    with path.open("r+b") as file:
+        file.seek(segment.end)
+        _write_block(file, columns)
+        file.truncate()
+        file.seek(0)
+        file.write(
+            _pack_header(
+                segment.count + len(columns),
+                min(segment.earliest, *columns.timestamps),
+                max(segment.latest, *columns.timestamps),
+            )
+        )
+
+
+def _write_segment(path: Path, columns: ActivityColumns) -> None:
+    timestamps = columns.timestamps
+    tmp_path = path.with_suffix(".tmp")
+
+    with tmp_path.open("wb") as file:
+        file.write(_pack_header(len(timestamps), min(timestamps), max(timestamps)))
+        _write_block(file, columns)
+
+    tmp_path.replace(path)
+
+
+def _write_block(file: IO[bytes], columns: ActivityColumns) -> None:
+    timestamps = columns.timestamps
+    base = timestamps[0]
+    deltas = array("i", map(int.__sub__, timestamps, [base, *timestamps[:-1]]))
+
+    file.write(_BLOCK_HEADER.pack(len(timestamps), base))
+    deltas.tofile(file)
+    columns.slots.tofile(file)
+    columns.statuses.tofile(file)
+    columns.sources.tofile(file)
+
+
+def _pack_header(count: int, earliest: int, latest: int) -> bytes:
+    return _HEADER.pack(_MAGIC, _VERSION, count, earliest, latest)
+
+
+def _segments(directory: Path) -> list[Path]:
+    return sorted(directory.glob(f"*{_SEGMENT_SUFFIX}"))
+
+
+def _unpack_header(path: Path, buffer: bytes | memoryview) -> tuple[int, ...]:
+    """Unpack the header of a segment.
+
+    Returns:
+        The number of activities, and earliest & latest timestamps of the
+        segment.
+
+    Raises:
+        ArchiveSegmentError: If the segment is not a supported format.
+    """
+    if len(buffer) < _HEADER.size:
+        raise ArchiveSegmentError(path)
+
+    magic, version, *header = _HEADER.unpack_from(buffer)
+
+    if magic != _MAGIC or version != _VERSION:
+        raise ArchiveSegmentError(path)
+
+    return tuple(header)
+
+
+def _timestamp_range(path: Path) -> tuple[int, int]:
+    """Read the earliest & latest timestamps of a segment from its header.
+
+    Returns:
+        The earliest & latest timestamps.
+    """
+    with path.open("rb") as file:
+        _, earliest, latest = _unpack_header(path, file.read(_HEADER.size))
+
+    return earliest, latest
+
+
+@contextmanager
+def _mapped_segment(path: Path) -> Iterator[_MappedSegment]:
+    """Memory map the blocks of a segment.
+
+    Yields:
+        The segment with the blocks of the activities in its header.
+    """
+    with (
+        path.open("rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ExitStack() as stack,
+    ):
+        view = stack.enter_context(memoryview(mapped))
+        count, earliest, latest = _unpack_header(path, view)
+        blocks: list[_Block] = []
+        offset = _HEADER.size
+        remaining = count
+
+        def _column(fmt: str, itemsize: int, length: int) -> memoryview:
+            nonlocal offset
+            column = stack.enter_context(
+                view[offset : offset + length * itemsize].cast(fmt)
+            )
+            offset += length * itemsize
+            return column
+
+        while remaining > 0:
+            length, base = _BLOCK_HEADER.unpack_from(view, offset)
+            offset += _BLOCK_HEADER.size
+            blocks.append(
+                _Block(
+                    base,
+                    deltas=_column("i", 4, length),
+                    slots=_column("H", 2, length),
+                    statuses=_column("B", 1, length),
+                    sources=_column("B", 1, length),
+                )
+            )
+            remaining -= length
+
+        yield _MappedSegment(count, earliest, latest, offset, blocks)
+
+
+def read_activity(directory: Path, start: int, end: int) -> list[ArchivedActivity]:
+    """Read the archived activity of a lock.
+
+    Activity is archived in the order it was processed, so backlog read from a
+    lock can follow more recent live activity. It's nearly sorted, so sorting
+    it by timestamp is close to linear. Segments with no activity in the range
+    are skipped using their header rather than being mapped.
+
+    Args:
+        directory: The archive directory of the lock.
+        start: Only include activity at or after this timestamp.
+        end: Only include activity before this timestamp.
+
+    Returns:
+        The activities, oldest first.
+    """
+    activities: list[ArchivedActivity] = []
+
+    for segment in _segments(directory):
+        earliest, latest = _timestamp_range(segment)
+
+        if latest < start or earliest >= end:
+            continue
+
+        with _mapped_segment(segment) as mapped:
+            activities.extend(
+                ArchivedActivity(
+                    timestamp,
+                    _STATUSES[status],
+                    None if source == _NO_SOURCE else _SOURCES[source],
+                    None if slot == _NO_SLOT else slot,
+                )
+                for block in mapped.blocks
+                for timestamp, status, source, slot in zip(
+                    block.timestamps,
+                    block.statuses,
+                    block.sources,
+                    block.slots,
+                    strict=True,
+                )
+                if start <= timestamp < end
+            )
+
+    activities.sort(key=attrgetter("timestamp"))
+    return activities
+
+
+def summarize(
+    path: Path,
+    keys: Iterable[str] | None,
+    start: int | None,
+    end: int | None,
+    time_zone: dt.tzinfo,
+) -> ArchiveSummary:
+    """Summarize the archived activity of locks.
+
+    Activity is counted per UTC hour using the mapped columns, then each
+    distinct hour is converted to the local hour of the week, so only a few
+    thousand conversions are needed for years of activity.
+
+    Args:
+        path: The path of the archive.
+        keys: The keys of the locks to include; all locks when `None`.
+        start: Only include activity at or after this timestamp.
+        end: Only include activity before this timestamp.
+        time_zone: The time zone for the hour of the week.
+
+    Returns:
+        The summary.
+    """
+    started = time.perf_counter()
+    hours: Counter[int] = Counter()
+    slots: Counter[int] = Counter()
+    statuses: Counter[int] = Counter()
+    size = 0
+
+    directories = (
+        [path / key for key in keys]
+        if keys is not None
+        else [child for child in path.iterdir() if child.is_dir()]
+        if path.is_dir()
+        else []
+    )
+
+    for segment in (
+        segment for directory in directories for segment in _segments(directory)
+    ):
+        size += segment.stat().st_size
+
+        with _mapped_segment(segment) as mapped:
+            for block in mapped.blocks:
+                timestamps: Iterable[int] = block.timestamps
+                block_slots: Iterable[int] = block.slots
+                block_statuses: Iterable[int] = block.statuses
+
+                if start is not None or end is not None:
+                    absolute = array("q", timestamps)
+                    included = [
+                        (start is None or timestamp >= start)
+                        and (end is None or timestamp < end)
+                        for timestamp in absolute
+                    ]
+                    timestamps = compress(absolute, included)
+                    block_slots = compress(block.slots, included)
+                    block_statuses = compress(block.statuses, included)
+
+                hours.update(map(floordiv, timestamps, repeat(3600)))
+                slots.update(block_slots)
+                statuses.update(block_statuses)
+
+    heatmap = [[0] * 24 for _ in range(7)]
+
+    for hour, count in hours.items():
+        local = dt.datetime.fromtimestamp(hour * 3600, time_zone)
+        heatmap[local.weekday()][local.hour] += count
+
+    slots.pop(_NO_SLOT, None)
+
+    return ArchiveSummary(
+        activities=hours.total(),
+        heatmap=heatmap,
+        slots=dict(slots),
+        statuses={_STATUSES[code]: count for code, count in sorted(statuses.items())},
+        size=size,
+        query_time=time.perf_counter() - started,
+    )
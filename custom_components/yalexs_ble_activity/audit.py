@@ -0,0 +1,438 @@
+"""Integrity audit of recorded activity for Yale Access Bluetooth Activity.
+
+Activity is recorded by queueing it to the recorder, so a dropped recorder
+queue or a restart in the middle of a replay can leave gaps in recorded
+history without any error. The archive is the integration's own log of the
+activity it has processed, so recorded history is audited against it.
+
+For each lock, archived & recorded activity within the audit window are read
+in timestamp order and compared with a single sorted merge, one second at a
+time, rather than a query for each activity. Recorded activity is streamed
+from the database in batches by a task on the recorder thread, which runs
+after activity queued before it has been committed. Activity that was
+archived but never recorded is queued to the recorder again in bulk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+import concurrent.futures
+from dataclasses import dataclass, field
+import datetime as dt
+from itertools import groupby
+import logging
+from operator import attrgetter, itemgetter
+import time
+from typing import Any
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder.core import Recorder
+from homeassistant.components.recorder.db_schema import (
+    StateAttributes,
+    States,
+    StatesMeta,
+)
+from homeassistant.components.recorder.tasks import RecorderTask
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers import event as evt
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads_object
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .archive import ActivityArchive, ArchivedActivity, read_activity
+from .const import (
+    ATTR_SLOT,
+    ATTR_SOURCE,
+    ATTR_TIMESTAMP,
+    AUDIT_BATCH_SIZE,
+    AUDIT_INTERVAL,
+    AUDIT_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# historic activity is recorded at the time of the activity. the state of the
+# sensor is written some time after it.
+_HISTORIC_TOLERANCE = 0.001
+
+
+@dataclass(slots=True)
+class LockAudit:
+    """The outcome of auditing the recorded activity of a lock."""
+
+    archived: int = 0
+    recorded: int = 0
+    duplicates: int = 0
+    unarchived: int = 0
+    missing: list[ArchivedActivity] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The counts of the audit.
+        """
+        return {
+            "archived": self.archived,
+            "recorded": self.recorded,
+            "missing": len(self.missing),
+            "duplicates": self.duplicates,
+            "unarchived": self.unarchived,
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class AuditRun:
+    """The outcome of a single audit."""
+
+    finished: dt.datetime
+    start: dt.datetime
+    end: dt.datetime
+    locks: dict[str, LockAudit]
+    duration: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The audit.
+        """
+        return {
+            "finished": self.finished.isoformat(),
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "duration": self.duration,
+            "locks": {
+                entity_id: audit.as_dict() for entity_id, audit in self.locks.items()
+            },
+        }
+
+
+class ActivityAudit:
+    """Audit recorded activity against the archive for a config entry."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        archive: ActivityArchive,
+        archive_keys: Callable[[], dict[str, str]],
+    ) -> None:
+        """Initialize the audit."""
+        self.hass = hass
+        self.entry = entry
+        self.archive = archive
+        self.last_run: AuditRun | None = None
+        self.total_requeued = 0
+        self._archive_keys = archive_keys
+        self._running = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Schedule periodic audits.
+
+        Returns:
+            A callback to stop scheduling audits.
+        """
+        return evt.async_track_time_interval(
+            self.hass,
+            self._async_scheduled_audit,
+            AUDIT_INTERVAL,
+            name="yalexs_ble_activity audit",
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def _async_scheduled_audit(self, now: dt.datetime) -> None:  # noqa: ARG002
+        self.entry.async_create_background_task(
+            self.hass,
+            self.async_audit(),
+            f"yalexs_ble_activity audit {self.entry.title}",
+        )
+
+    async def async_audit(self) -> AuditRun | None:
+        """Audit activity recorded within the audit window.
+
+        Returns:
+            The outcome of the audit or `None` if an audit is already running.
+        """
+        if self._running:
+            return None
+
+        self._running = True
+        started = time.monotonic()
+        end = dt_util.utcnow().replace(microsecond=0)
+        start = end - AUDIT_WINDOW
+        locks: dict[str, LockAudit] = {}
+
+        try:
+            # archived activity was queued to the recorder before it was
+            # archived, so everything flushed here is queued ahead of the audit.
+            await self.archive.async_flush()
+
+            for entity_id, key in self._archive_keys().items():
+                archived = await self.hass.async_add_executor_job(
+                    read_activity,
+                    self.archive.path / key,
+                    int(start.timestamp()),
+                    int(end.timestamp()),
+                )
+                audit = locks[entity_id] = await self._async_audit_lock(
+                    entity_id, archived, start.timestamp(), end.timestamp()
+                )
+                self._async_requeue(entity_id, audit.missing)
+        finally:
+            self._running = False
+
+        self.last_run = AuditRun(
+            finished=dt_util.utcnow(),
+            start=start,
+            end=end,
+            locks=locks,
+            duration=time.monotonic() - started,
+        )
+
+        _LOGGER.debug(
+            "audited recorded activity of %s locks (%.3fs)",
+            len(locks),
+            self.last_run.duration,
+        )
+
+        return self.last_run
+
+    async def _async_audit_lock(
+        self,
+        entity_id: str,
+        archived: list[ArchivedActivity],
+        start: float,
+        end: float,
+    ) -> LockAudit:
+        future: concurrent.futures.Future[LockAudit] = concurrent.futures.Future()
+        recorder.get_instance(self.hass).queue_task(
+            _AuditLockTask(entity_id, archived, start, end, future)
+        )
+        return await asyncio.wrap_future(future)
+
+    @callback
+    def _async_requeue(self, entity_id: str, missing: list[ArchivedActivity]) -> None:
+        """Queue archived activity that was never recorded to the recorder."""
+        if not missing:
+            return
+
+        _LOGGER.warning(
+            "%s is missing %s recorded activities; recording them again",
+            entity_id,
+            len(missing),
+        )
+
+        instance = recorder.get_instance(self.hass)
+
+        for activity in missing:
+            instance.queue_task(_historic_event(entity_id, activity))
+
+        self.total_requeued += len(missing)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The audit state.
+        """
+        return {
+            "running": self._running,
+            "total_requeued": self.total_requeued,
+            "last_run": None if self.last_run is None else self.last_run.as_dict(),
+        }
+
+
+def merge_activity(
+    archived: Iterable[ArchivedActivity],
+    recorded: Iterable[tuple[int, str]],
+) -> LockAudit:
+    """Compare archived & recorded activity with a sorted merge.
+
+    Both are grouped by second and each second is compared by state, so
+    activity within the same second may be in any order.
+
+    Args:
+        archived: Archived activity, oldest first.
+        recorded: The timestamp in seconds & state of recorded activity,
+            oldest first.
+
+    Returns:
+        The outcome of the audit with archived activity that wasn't recorded
+        as missing.
+    """
+    audit = LockAudit()
+    archived_seconds = _seconds(archived, attrgetter("timestamp"))
+    recorded_seconds = _seconds(recorded, itemgetter(0))
+    archived_second = next(archived_seconds, None)
+    recorded_second = next(recorded_seconds, None)
+
+    while archived_second is not None or recorded_second is not None:
+        second = min(
+            pending[0]
+            for pending in (archived_second, recorded_second)
+            if pending is not None
+        )
+        activities: list[ArchivedActivity] = []
+        states: Counter[str] = Counter()
+
+        if archived_second is not None and archived_second[0] == second:
+            activities = archived_second[1]
+            archived_second = next(archived_seconds, None)
+
+        if recorded_second is not None and recorded_second[0] == second:
+            states.update(state for _, state in recorded_second[1])
+            recorded_second = next(recorded_seconds, None)
+
+        audit.archived += len(activities)
+        audit.recorded += states.total()
+
+        for activity in activities:
+            if states[activity.state] > 0:
+                states[activity.state] -= 1
+            else:
+                audit.missing.append(activity)
+
+        archived_states = {activity.state for activity in activities}
+
+        for state, count in states.items():
+            if state in archived_states:
+                audit.duplicates += count
+            else:
+                audit.unarchived += count
+
+    return audit
+
+
+def _seconds[T](
+    items: Iterable[T], key: Callable[[T], int]
+) -> Iterator[tuple[int, list[T]]]:
+    return ((second, list(group)) for second, group in groupby(items, key))
+
+
+def _historic_event(
+    entity_id: str, activity: ArchivedActivity
+) -> Event[EventStateChangedData]:
+    """Create the event that records archived activity as historic activity.
+
+    The archive doesn't keep the remote type of lock operations, so it's not
+    included in the attributes of the recorded activity.
+
+    Returns:
+        The state changed event.
+    """
+    timestamp = dt_util.utc_from_timestamp(activity.timestamp)
+    attributes: dict[str, Any] = {ATTR_TIMESTAMP: timestamp}
+
+    if activity.source is not None:
+        attributes[ATTR_SOURCE] = activity.source
+    if activity.slot is not None:
+        attributes[ATTR_SLOT] = activity.slot
+
+    state_changed_data: EventStateChangedData = {
+        "entity_id": entity_id,
+        "old_state": None,
+        "new_state": State(
+            entity_id,
+            activity.state,
+            attributes,
+            last_changed=timestamp,
+            last_reported=timestamp,
+            last_updated=timestamp,
+            last_updated_timestamp=activity.timestamp,
+        ),
+    }
+
+    return Event(str(EVENT_STATE_CHANGED), state_changed_data)
+
+
+@dataclass(slots=True)
+class _AuditLockTask(RecorderTask):
+    """Recorder task to audit the recorded activity of a lock."""
+
+    entity_id: str
+    archived: list[ArchivedActivity]
+    start: float
+    end: float
+    future: concurrent.futures.Future[LockAudit]
+
+    def run(self, instance: Recorder) -> None:
+        # the audit may have been cancelled (e.g. on unload) while queued.
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            audit = _audit_lock(
+                instance, self.entity_id, self.archived, self.start, self.end
+            )
+        except Exception as err:  # noqa: BLE001
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(audit)
+
+
+def _audit_lock(
+    instance: Recorder,
+    entity_id: str,
+    archived: list[ArchivedActivity],
+    start: float,
+    end: float,
+) -> LockAudit:
+    """Audit the recorded activity of a lock against its archived activity.
+
+    Returns:
+        The outcome of the audit.
+    """
+    with session_scope(session=instance.get_session(), read_only=True) as session:
+        return merge_activity(
+            archived, _recorded_activity(session, entity_id, start, end)
+        )
+
+
+def _recorded_activity(
+    session: Session,
+    entity_id: str,
+    start: float,
+    end: float,
+) -> Iterator[tuple[int, str]]:
+    """Stream the historic activity recorded for an entity.
+
+    Yields:
+        The timestamp in seconds & state of each activity, oldest first.
+    """
+    rows = session.execute(
+        select(States.last_updated_ts, States.state, StateAttributes.shared_attrs)
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .join(StateAttributes, States.attributes_id == StateAttributes.attributes_id)
+        .where(StatesMeta.entity_id == entity_id)
+        .where(States.last_updated_ts >= start)
+        .where(States.last_updated_ts < end)
+        .where(States.state.not_in((STATE_UNKNOWN, STATE_UNAVAILABLE)))
+        .order_by(States.last_updated_ts)
+        .execution_options(yield_per=AUDIT_BATCH_SIZE)
+    )
+
+    for last_updated_ts, state, shared_attrs in rows:
+        timestamp = json_loads_object(shared_attrs).get(ATTR_TIMESTAMP)
+
+        if (
+            isinstance(timestamp, str)
+            and (parsed := dt_util.parse_datetime(timestamp)) is not None
+            and abs(parsed.timestamp() - last_updated_ts) < _HISTORIC_TOLERANCE
+        ):
+            yield int(last_updated_ts), state
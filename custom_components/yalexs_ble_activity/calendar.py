@@ -0,0 +1,146 @@
+"""Support for Yale Access Bluetooth Activity calendars."""
+
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.components.yalexs_ble.entity import YALEXSBLEEntity
+from homeassistant.components.yalexs_ble.models import YaleXSBLEData
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .activity_log import ProcessedActivity
+from .const import (
+    CALENDAR_MIN_DURATION,
+    CALENDAR_ONGOING_EXTENT,
+    SIGNAL_ACTIVITY,
+    SIGNAL_ACTIVITY_HISTORY,
+)
+from .entity import async_setup_lock_entities
+from .logbook import describe_activity
+from .models import YaleXSBLEActivityConfigEntry
+from .periods import PERIOD_DOOR_OPEN, PERIOD_UNLOCKED, ActivityPeriod, LockPeriods
+
+_SUMMARIES = {
+    PERIOD_DOOR_OPEN: "Door open",
+    PERIOD_UNLOCKED: "Unlocked",
+}
+
+
+async def async_setup_entry(  # noqa: RUF029
+    hass: HomeAssistant,
+    entry: YaleXSBLEActivityConfigEntry,
+    async_add_entities: AddConfigEntryEntitiesCallback,
+) -> None:
+    """Set up Yale Access Bluetooth Activity calendars."""
+    async_setup_lock_entities(
+        hass,
+        entry,
+        async_add_entities,
+        YaleXSBLEActivityCalendar,
+    )
+
+
+class YaleXSBLEActivityCalendar(YALEXSBLEEntity, CalendarEntity):
+    """Representation of the periods a Yale Access Bluetooth lock was open.
+
+    Each period the lock was unlocked or its door was open is an event of the
+    calendar. Periods are kept in memory as activity is processed, so events
+    are found without reading recorded history. They're seeded from the
+    history that's restored for the lock at startup.
+    """
+
+    _attr_translation_key = "activity"
+    _attr_icon = "mdi:calendar-lock"
+
+    def __init__(self, data: YaleXSBLEData) -> None:
+        """Initialize the calendar."""
+        super().__init__(data)
+        self._attr_unique_id = f"{data.lock.address}calendar"
+        self._activity_signal = SIGNAL_ACTIVITY.format(address=data.lock.address)
+        self._history_signal = SIGNAL_ACTIVITY_HISTORY.format(address=data.lock.address)
+        self._periods = LockPeriods()
+
+    @callback
+    def _async_handle_activity(
+        self, value: str | None, attributes: dict[str, Any]
+    ) -> None:
+        if self._periods.process(value, attributes):
+            self.async_write_ha_state()
+
+    @callback
+    def _async_handle_history(self, activities: list[ProcessedActivity]) -> None:
+        self._periods.restore(activities)
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to activity & restored history."""
+        await super().async_added_to_hass()
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._activity_signal, self._async_handle_activity
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._history_signal, self._async_handle_history
+            )
+        )
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """The period the lock is currently unlocked or its door is open."""
+        if (period := self._periods.current) is None:
+            return None
+
+        return _calendar_event(period, dt_util.utcnow())
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,  # noqa: ARG002
+        start_date: dt.datetime,
+        end_date: dt.datetime,
+    ) -> list[CalendarEvent]:
+        """Get the periods within a range as events.
+
+        Returns:
+            The events ordered by start.
+        """
+        now = dt_util.utcnow()
+
+        return [
+            event
+            for period in self._periods.between(start_date, end_date)
+            if (event := _calendar_event(period, now)).end > start_date
+        ]
+
+
+def _calendar_event(period: ActivityPeriod, now: dt.datetime) -> CalendarEvent:
+    """Create the event of a period.
+
+    A period that has not yet ended extends a little past the current time so
+    the calendar is on until the period ends. Periods that start & end within
+    the same instant last for a moment so they can still be shown.
+
+    Returns:
+        The event.
+    """
+    start = period.start
+    end = now + CALENDAR_ONGOING_EXTENT if period.end is None else period.end
+
+    return CalendarEvent(
+        start=start,
+        end=max(end, start + CALENDAR_MIN_DURATION),
+        summary=_SUMMARIES[period.kind],
+        description=describe_activity(
+            "lock_unlocked", period.source, period.remote_type, period.slot
+        )
+        if period.kind == PERIOD_UNLOCKED
+        else None,
+        uid=f"{period.kind}_{start.timestamp()!r}",
+    )
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from typing import Any
 
+from homeassistant.components import mqtt
 from homeassistant.components.lock import DOMAIN as LOCK_DOMAIN
 from homeassistant.components.yalexs_ble.const import DOMAIN as YALEXSBLE_DOMAIN
 from homeassistant.config_entries import (
@@ -12,27 +13,199 @@ from homeassistant.config_entries import (
     ConfigFlowResult,
     OptionsFlow,
 )
-from homeassistant.core import callback
-from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig
+from homeassistant.const import CONF_NAME, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.selector import (
+    BooleanSelector,
+    EntitySelector,
+    EntitySelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 import voluptuous as vol
 
-from .const import CONF_LOCK_ENTITIES, DOMAIN
+from .const import (
+    ACTIVITY_EVENT_TYPES,
+    CONF_ARCHIVE,
+    CONF_ENTRY_WINDOW,
+    CONF_FILTER_LOCK,
+    CONF_FILTERS,
+    CONF_KINDS,
+    CONF_LOCK_ENTITIES,
+    CONF_REMOTE_TYPES,
+    CONF_RETENTION_DAYS,
+    CONF_SINK_TOPIC,
+    CONF_SINK_URL,
+    CONF_SLOTS,
+    CONF_SOURCES,
+    CONF_STATUSES,
+    DOMAIN,
+)
+from .filters import KINDS, REMOTE_TYPES, SOURCES
+
+DEFAULT_NAME = "Yale Access Bluetooth Activity"
+OPTIONAL_DATA = {CONF_RETENTION_DAYS, CONF_ENTRY_WINDOW, CONF_SINK_URL, CONF_SINK_TOPIC}
+
+
+def _data_schema() -> vol.Schema:
+    """Get the schema for the data of an entry.
+
+    Returns:
+        The schema.
+    """
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_LOCK_ENTITIES,
+            ): EntitySelector(
+                EntitySelectorConfig(
+                    integration=YALEXSBLE_DOMAIN,
+                    domain=[LOCK_DOMAIN],
+                    multiple=True,
+                ),
+            ),
+            vol.Optional(
+                CONF_RETENTION_DAYS,
+            ): vol.All(
+                NumberSelector(
+                    NumberSelectorConfig(
+                        min=1,
+                        max=3650,
+                        step=1,
+                        unit_of_measurement=UnitOfTime.DAYS,
+                        mode=NumberSelectorMode.BOX,
+                    ),
+                ),
+                vol.Coerce(int),
+            ),
+            vol.Optional(
+                CONF_ARCHIVE,
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_ENTRY_WINDOW,
+            ): vol.All(
+                NumberSelector(
+                    NumberSelectorConfig(
+                        min=1,
+                        max=3600,
+                        step=1,
+                        unit_of_measurement=UnitOfTime.SECONDS,
+                        mode=NumberSelectorMode.BOX,
+                    ),
+                ),
+                vol.Coerce(int),
+            ),
+            vol.Optional(
+                CONF_SINK_URL,
+            ): vol.All(
+                TextSelector(TextSelectorConfig(type=TextSelectorType.URL)),
+                vol.Url(),
+            ),
+            vol.Optional(
+                CONF_SINK_TOPIC,
+            ): vol.All(TextSelector(), mqtt.valid_publish_topic),
+        }
+    )
+
 
-STEP_USER_DATA_SCHEMA = vol.Schema(
+FILTERS_SCHEMA = vol.Schema(
     {
-        vol.Required(
-            CONF_LOCK_ENTITIES,
-        ): EntitySelector(
-            EntitySelectorConfig(
-                integration=YALEXSBLE_DOMAIN,
-                domain=[LOCK_DOMAIN],
+        vol.Optional(CONF_KINDS): SelectSelector(
+            SelectSelectorConfig(options=KINDS, multiple=True, translation_key="kinds")
+        ),
+        vol.Optional(CONF_STATUSES): SelectSelector(
+            SelectSelectorConfig(
+                options=ACTIVITY_EVENT_TYPES,
                 multiple=True,
+                translation_key="statuses",
+            )
+        ),
+        vol.Optional(CONF_SOURCES): SelectSelector(
+            SelectSelectorConfig(options=SOURCES, multiple=True)
+        ),
+        vol.Optional(CONF_REMOTE_TYPES): SelectSelector(
+            SelectSelectorConfig(options=REMOTE_TYPES, multiple=True)
+        ),
+        vol.Optional(CONF_SLOTS): vol.All(
+            SelectSelector(
+                SelectSelectorConfig(options=[], multiple=True, custom_value=True)
             ),
+            [vol.All(vol.Coerce(int), vol.Range(min=0))],
         ),
     }
 )
 
 
+def _options_schema(lock_entities: list[str]) -> vol.Schema:
+    """Get the schema for the options of an entry.
+
+    Returns:
+        The schema.
+    """
+    return _data_schema().extend(
+        {
+            vol.Optional(
+                CONF_FILTER_LOCK,
+            ): EntitySelector(
+                EntitySelectorConfig(
+                    integration=YALEXSBLE_DOMAIN,
+                    domain=[LOCK_DOMAIN],
+                    include_entities=lock_entities,
+                ),
+            ),
+        }
+    )
+
+
+def _other_lock_entities(hass: HomeAssistant, entry_id: str | None) -> list[str]:
+    """Get the locks that belong to entries other than the given one.
+
+    Returns:
+        The lock entity IDs.
+    """
+    return [
+        lock_entity_id
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id != entry_id
+        for lock_entity_id in entry.data[CONF_LOCK_ENTITIES]
+    ]
+
+
+def _validate_lock_entities(
+    user_input: dict[str, Any],
+    other_lock_entities: list[str],
+) -> dict[str, str]:
+    """Validate that none of the selected locks belong to another entry.
+
+    Returns:
+        The errors for the form.
+    """
+    if not set(user_input[CONF_LOCK_ENTITIES]).isdisjoint(other_lock_entities):
+        return {CONF_LOCK_ENTITIES: "lock_already_configured"}
+
+    return {}
+
+
+def _validate_filter_lock(user_input: dict[str, Any]) -> dict[str, str]:
+    """Validate that the lock to filter is one of the selected locks.
+
+    Returns:
+        The errors for the form.
+    """
+    if (filter_lock := user_input.get(CONF_FILTER_LOCK)) is not None and (
+        filter_lock not in user_input[CONF_LOCK_ENTITIES]
+    ):
+        return {CONF_FILTER_LOCK: "filter_lock_not_selected"}
+
+    return {}
+
+
 class YaleXSBLEActivityConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
     """Handle a Yale Access Bluetooth Activity config flow."""
 
@@ -59,22 +232,35 @@ class YaleXSBLEActivityConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[ca
         Returns:
             The config flow result.
         """
-        if user_input is not None:
-            return self.async_create_entry(
-                title="Yale Access Bluetooth Activity", data=user_input
-            )
+        other_lock_entities = _other_lock_entities(self.hass, None)
+        errors: dict[str, str] = {}
+
+        if user_input is not None and not (
+            errors := _validate_lock_entities(user_input, other_lock_entities)
+        ):
+            data = dict(user_input)
+            title = data.pop(CONF_NAME)
+
+            return self.async_create_entry(title=title, data=data)
 
         return self.async_show_form(
             step_id="user",
             data_schema=self.add_suggested_values_to_schema(
-                STEP_USER_DATA_SCHEMA, user_input
+                vol.Schema({vol.Required(CONF_NAME, default=DEFAULT_NAME): str}).extend(
+                    _data_schema().schema
+                ),
+                user_input,
             ),
+            errors=errors,
         )
 
 
 class YaleXSBLEActivityOptionsFlow(OptionsFlow):
     """Handle a option flow."""
 
+    _data: dict[str, Any]
+    _filter_lock: str
+
     async def async_step_init(
         self,
         user_input: dict[str, Any] | None = None,
@@ -84,17 +270,88 @@ class YaleXSBLEActivityOptionsFlow(OptionsFlow):
         Returns:
             The config flow result.
         """
-        if user_input is not None:
+        other_lock_entities = _other_lock_entities(
+            self.hass, self.config_entry.entry_id
+        )
+        errors: dict[str, str] = {}
+
+        if user_input is not None and not (
+            errors := _validate_lock_entities(user_input, other_lock_entities)
+            or _validate_filter_lock(user_input)
+        ):
+            data = dict(user_input)
+            filter_lock = data.pop(CONF_FILTER_LOCK, None)
+            lock_entities = data[CONF_LOCK_ENTITIES]
+
+            # optional values that were cleared are absent from the input and
+            # must be removed rather than merged with the existing data.
+            self._data = {
+                **{
+                    key: value
+                    for key, value in self.config_entry.data.items()
+                    if key not in OPTIONAL_DATA
+                },
+                **data,
+            }
+
+            # filters of removed locks are removed with them.
+            if filters := self._data.get(CONF_FILTERS):
+                self._data[CONF_FILTERS] = {
+                    lock_entity_id: rules
+                    for lock_entity_id, rules in filters.items()
+                    if lock_entity_id in lock_entities
+                }
+
+            if filter_lock is not None:
+                self._filter_lock = filter_lock
+                return await self.async_step_filters()
+
             self.hass.config_entries.async_update_entry(
-                self.config_entry,
-                data={**self.config_entry.data, **user_input},
+                self.config_entry, data=self._data
             )
             return self.async_create_entry(data={})
 
         return self.async_show_form(
             step_id="init",
             data_schema=self.add_suggested_values_to_schema(
-                STEP_USER_DATA_SCHEMA,
+                _options_schema(self.config_entry.data[CONF_LOCK_ENTITIES]),
                 self.config_entry.data if user_input is None else user_input,
             ),
+            errors=errors,
+        )
+
+    async def async_step_filters(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> ConfigFlowResult:
+        """Handle the activity filters of a lock.
+
+        Returns:
+            The config flow result.
+        """
+        filters: dict[str, dict[str, Any]] = dict(self._data.get(CONF_FILTERS, {}))
+
+        if user_input is not None:
+            if rules := {key: value for key, value in user_input.items() if value}:
+                filters[self._filter_lock] = rules
+            else:
+                filters.pop(self._filter_lock, None)
+
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, data={**self._data, CONF_FILTERS: filters}
+            )
+            return self.async_create_entry(data={})
+
+        rules = filters.get(self._filter_lock, {})
+
+        return self.async_show_form(
+            step_id="filters",
+            data_schema=self.add_suggested_values_to_schema(
+                FILTERS_SCHEMA,
+                {
+                    **rules,
+                    CONF_SLOTS: [str(slot) for slot in rules.get(CONF_SLOTS, [])],
+                },
+            ),
+            description_placeholders={"entity_id": self._filter_lock},
         )
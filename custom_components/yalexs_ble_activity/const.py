@@ -1,19 +1,105 @@
 """Constants for the Yale Access Bluetooth Activity integration."""
 
+import datetime as dt
 from typing import Final
 
+from yalexs_ble.const import DoorStatus, LockStatus
+
 DOMAIN: Final = "yalexs_ble_activity"
 YALEXSBLE_PATCH_URL = (
     "git+https://github.com/wbyoung/yalexs-ble@yalexs-ble-{version}-patches"
 )
+YALEXSBLE_WHEEL_PATTERN = "yalexs_ble-{version}+patches*.whl"
 
 ATTR_REMOTE_TYPE: Final = "remote_type"
 ATTR_SLOT: Final = "slot"
 ATTR_SOURCE: Final = "source"
+ATTR_SUPPRESSED: Final = "suppressed"
+ATTR_SUPPRESSED_SINCE: Final = "suppressed_since"
 ATTR_TIMESTAMP: Final = "timestamp"
 
+EVENT_ACTIVITY: Final = "yalexs_ble_activity"
+EVENT_ENTRY: Final = "yalexs_ble_activity_entry"
+
+CONF_ARCHIVE: Final = "archive"
+CONF_ENTRY_WINDOW: Final = "entry_window"
+CONF_FILTER_LOCK: Final = "filter_lock"
+CONF_FILTERS: Final = "filters"
+CONF_KINDS: Final = "kinds"
 CONF_LOCK_ENTITIES: Final = "lock_entities"
+CONF_REMOTE_TYPES: Final = "remote_types"
+CONF_RETENTION_DAYS: Final = "retention_days"
+CONF_SINK_TOPIC: Final = "sink_topic"
+CONF_SINK_URL: Final = "sink_url"
+CONF_SLOTS: Final = "slots"
+CONF_SOURCES: Final = "sources"
+CONF_STATUSES: Final = "statuses"
 
 OPERATION_SENSOR_WRITE_DELAY: Final = 2
 
+ACTIVITY_HISTORY_SIZE: Final = 100
+
+ACTIVITY_RATE_LIMIT_BURST: Final = 500
+ACTIVITY_RATE_LIMIT_RATE: Final = 1.0
+ACTIVITY_STORM_SUMMARY_INTERVAL: Final = 60
+
+DIAGNOSTICS_RECENT_ACTIVITY_COUNT: Final = 10
+
+ENTRY_HISTORY_SIZE: Final = 100
+ENTRY_WINDOW_DEFAULT: Final = 60
+
+ARCHIVE_FLUSH_INTERVAL: Final = dt.timedelta(minutes=5)
+ARCHIVE_SEGMENT_SIZE: Final = 65_536
+
+AUDIT_BATCH_SIZE: Final = 1000
+AUDIT_INTERVAL: Final = dt.timedelta(hours=6)
+AUDIT_WINDOW: Final = dt.timedelta(days=1)
+
+CALENDAR_HISTORY_SIZE: Final = 5000
+CALENDAR_MIN_DURATION: Final = dt.timedelta(seconds=1)
+CALENDAR_ONGOING_EXTENT: Final = dt.timedelta(minutes=1)
+
+JOURNAL_COMPACT_SIZE: Final = 1000
+
+PATCH_UNAVAILABLE_RETRY: Final = dt.timedelta(days=1)
+
+DRAIN_BACKLOG_BATCH_SIZE: Final = 25
+DRAIN_IDLE_TIMEOUT: Final = 5
+DRAIN_LIVE_TOLERANCE: Final = dt.timedelta(seconds=30)
+DRAIN_MAX_CONCURRENT: Final = 2
+DRAIN_TIMEOUT: Final = 60
+
+PIPELINE_BATCH_SIZE: Final = 500
+PIPELINE_DISPATCH_BATCH_SIZE: Final = 50
+
+PROFILE_DEFAULT_DURATION: Final = 60
+PROFILE_DEFAULT_TOP: Final = 20
+PROFILE_POLL_INTERVAL: Final = dt.timedelta(milliseconds=100)
+
+SINK_BATCH_DELAY: Final = 1
+SINK_BATCH_SIZE: Final = 100
+SINK_BUFFER_SIZE: Final = 1000
+SINK_RETRY_MAX: Final = 300
+SINK_RETRY_MIN: Final = 5
+SINK_SPILL_SEGMENTS: Final = 1000
+SINK_TIMEOUT: Final = 10
+
+TIMELINE_HISTORY_SIZE: Final = 500
+TIMELINE_PAGE_MAX: Final = 500
+TIMELINE_PAGE_SIZE: Final = 50
+
+RETENTION_PURGE_CHUNK_SIZE: Final = 1000
+RETENTION_PURGE_INTERVAL: Final = dt.timedelta(hours=1)
+
+SIGNAL_ACTIVITY: Final = f"{DOMAIN}_activity_{{address}}"
+SIGNAL_ACTIVITY_HISTORY: Final = f"{DOMAIN}_activity_history_{{address}}"
+SIGNAL_ACTIVITY_PAYLOAD: Final = f"{DOMAIN}_activity_payload"
+SIGNAL_LOCK_ENTITIES_UPDATED: Final = f"{DOMAIN}_lock_entities_updated_{{entry_id}}"
+
+# every status of door & lock activity, named like the operation sensor states.
+ACTIVITY_EVENT_TYPES: Final = [
+    *(f"door_{status.name.lower()}" for status in DoorStatus),
+    *(f"lock_{status.name.lower()}" for status in LockStatus),
+]
+
 TRACE: Final = 5
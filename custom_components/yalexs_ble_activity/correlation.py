@@ -0,0 +1,147 @@
+"""Lock & door activity correlation for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+import datetime as dt
+from typing import Any
+
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import DoorStatus, LockStatus
+
+from .const import ENTRY_HISTORY_SIZE
+
+
+@dataclass(slots=True, frozen=True)
+class ActivityEntry:
+    """An unlock followed by the door opening & closing."""
+
+    unlocked_at: dt.datetime
+    source: str
+    remote_type: str | None
+    slot: int | None
+    door_opened_at: dt.datetime
+    door_closed_at: dt.datetime
+
+    @property
+    def door_open_duration(self) -> float:
+        """The number of seconds the door was open."""
+        return (self.door_closed_at - self.door_opened_at).total_seconds()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for event data.
+
+        Returns:
+            The entry.
+        """
+        return {
+            "unlocked_at": self.unlocked_at.isoformat(),
+            "source": self.source,
+            "remote_type": self.remote_type,
+            "slot": self.slot,
+            "door_opened_at": self.door_opened_at.isoformat(),
+            "door_closed_at": self.door_closed_at.isoformat(),
+            "door_open_duration": self.door_open_duration,
+        }
+
+
+class EntryCorrelator:
+    """Correlate the activity of a single lock into entries.
+
+    An entry is an unlock followed by the door opening within the window &
+    then closing. Only the pending unlock & door opening are kept, so each
+    activity is handled in constant time.
+
+    Correlation follows the timestamps of activity rather than when it was
+    received. Live activity is processed before the backlog of a draining
+    lock, so activity that predates activity that was already correlated is
+    correlated separately as a backfilled window, & a new window starts each
+    time the backlog steps back in time. An entry is only produced once for
+    each unlock, so replaying a backlog never produces duplicate entries.
+    """
+
+    def __init__(self, window: dt.timedelta) -> None:
+        """Initialize the correlator.
+
+        Args:
+            window: The maximum time between the unlock & the door opening.
+        """
+        self.window = window
+        self._live = _Correlation(window)
+        self._backfill: _Correlation | None = None
+        self._unlocks: deque[dt.datetime] = deque(maxlen=ENTRY_HISTORY_SIZE)
+
+    def process(self, activity: DoorActivity | LockActivity) -> ActivityEntry | None:
+        """Process an activity of the lock.
+
+        Returns:
+            The entry completed by the activity, if any.
+        """
+        timestamp = activity.timestamp
+        correlation = self._live
+
+        if timestamp < correlation.latest:
+            if (backfill := self._backfill) is None or timestamp < backfill.latest:
+                backfill = self._backfill = _Correlation(self.window)
+            correlation = backfill
+
+        if (entry := correlation.process(activity)) is None:
+            return None
+
+        if entry.unlocked_at in self._unlocks:
+            return None
+
+        self._unlocks.append(entry.unlocked_at)
+        return entry
+
+
+class _Correlation:
+    """The pending entry of activity that's processed in timestamp order."""
+
+    __slots__ = ("_door_opened_at", "_unlock", "latest", "window")
+
+    def __init__(self, window: dt.timedelta) -> None:
+        self.window = window
+        self.latest = dt.datetime.min.replace(tzinfo=dt.UTC)
+        self._unlock: LockActivity | None = None
+        self._door_opened_at: dt.datetime | None = None
+
+    def process(self, activity: DoorActivity | LockActivity) -> ActivityEntry | None:
+        timestamp = self.latest = activity.timestamp
+
+        if isinstance(activity, LockActivity):
+            self._door_opened_at = None
+            self._unlock = activity if activity.status is LockStatus.UNLOCKED else None
+            return None
+
+        if not isinstance(activity, DoorActivity) or (unlock := self._unlock) is None:
+            return None
+
+        if (opened_at := self._door_opened_at) is None:
+            if activity.status is not DoorStatus.OPENED:
+                return None
+
+            if timestamp - unlock.timestamp > self.window:
+                self._unlock = None
+                return None
+
+            self._door_opened_at = timestamp
+            return None
+
+        if activity.status is not DoorStatus.CLOSED:
+            return None
+
+        self._unlock = None
+        self._door_opened_at = None
+
+        return ActivityEntry(
+            unlocked_at=unlock.timestamp,
+            source=unlock.source.name.lower(),
+            remote_type=None
+            if unlock.remote_type is None
+            else unlock.remote_type.name.lower(),
+            slot=unlock.slot,
+            door_opened_at=opened_at,
+            door_closed_at=timestamp,
+        )
@@ -3,16 +3,44 @@
 from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-TO_REDACT: set[str] = set()
+from .const import CONF_SINK_TOPIC, CONF_SINK_URL
+from .installer import DATA_PATCH_INSTALLER
+from .models import YaleXSBLEActivityConfigEntry
+
+TO_REDACT = {CONF_SINK_TOPIC, CONF_SINK_URL}
 
 
 async def async_get_config_entry_diagnostics(  # noqa: RUF029
-    hass: HomeAssistant,  # noqa: ARG001
-    entry: ConfigEntry,
+    hass: HomeAssistant,
+    entry: YaleXSBLEActivityConfigEntry,
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
-    result: dict[str, Any] = async_redact_data(entry.as_dict(), TO_REDACT)
+    runtime_data = entry.runtime_data
+    retention = runtime_data.retention
+    archive = runtime_data.archive
+    audit = runtime_data.audit
+
+    result: dict[str, Any] = async_redact_data(
+        {
+            "entry": entry.as_dict(),
+            "drain": runtime_data.drain.as_dict(),
+            "pipeline": runtime_data.pipeline.as_dict(),
+            "retention": None if retention is None else retention.as_dict(),
+            "archive": None if archive is None else archive.as_dict(),
+            "audit": None if audit is None else audit.as_dict(),
+            "journal": runtime_data.journal.as_dict(),
+            "sinks": {
+                forwarder.sink.name: forwarder.as_dict()
+                for forwarder in runtime_data.sinks
+            },
+            "locks": {
+                entity_id: log.as_dict()
+                for entity_id, log in runtime_data.locks.items()
+            },
+            "patches": hass.data[DATA_PATCH_INSTALLER].as_dict(),
+        },
+        TO_REDACT,
+    )
     return result
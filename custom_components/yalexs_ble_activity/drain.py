@@ -0,0 +1,283 @@
+"""Startup activity drain coordination for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import datetime as dt
+from functools import partial
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers import event as evt
+from homeassistant.util import dt as dt_util
+from yalexs_ble import DoorActivity, LockActivity
+
+from .const import (
+    DRAIN_BACKLOG_BATCH_SIZE,
+    DRAIN_IDLE_TIMEOUT,
+    DRAIN_LIVE_TOLERANCE,
+    DRAIN_MAX_CONCURRENT,
+    DRAIN_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class LockDrain:
+    """The state of the activity drain of a single lock."""
+
+    queued: float
+    started: float | None = None
+    started_at: dt.datetime | None = None
+    finished: float | None = None
+    activities: int = 0
+    backlog: int = 0
+    unsubscribe: CALLBACK_TYPE | None = None
+    cancel_timer: CALLBACK_TYPE | None = None
+
+    @property
+    def draining(self) -> bool:
+        """Whether the drain is in progress."""
+        return self.started is not None and self.finished is None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The drain state.
+        """
+        started = self.started
+
+        return {
+            "state": "queued" if started is None else "draining",
+            "wait_time": None if started is None else started - self.queued,
+            "activities": self.activities,
+            "backlog": self.backlog,
+        }
+
+
+class ActivityDrainCoordinator:
+    """Coordinate the activity drains of the locks of a config entry.
+
+    Every lock is subscribed to activity right away, but only a limited
+    number of locks are asked for their activity backlog at once. While a
+    lock is draining, activity that predates the drain is queued and
+    processed in batches that yield to the event loop, so live activity from
+    any lock is always handled first. Locks are only tracked until their
+    drain finishes or is cancelled.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.entry = entry
+        self.max_concurrent = DRAIN_MAX_CONCURRENT
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._drains: dict[str, LockDrain] = {}
+        self._backlog: deque[tuple[str, Callable[[], None]]] = deque()
+        self._backlog_task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_schedule(
+        self,
+        key: str,
+        subscribe: Callable[..., CALLBACK_TYPE],
+    ) -> CALLBACK_TYPE:
+        """Subscribe to the activity of a lock & schedule its drain.
+
+        Args:
+            key: The address of the lock.
+            subscribe: Subscribes to activity of the lock, requesting its
+                backlog if `request_update` is `True`, and returns a callback
+                to stop receiving activity. The lock is subscribed again to
+                request its backlog once the drain starts.
+
+        Returns:
+            A callback to cancel the drain & stop receiving activity.
+        """
+        drain = self._drains[key] = LockDrain(queued=time.monotonic())
+        drain.unsubscribe = subscribe(request_update=False)
+        task = self.entry.async_create_background_task(
+            self.hass,
+            self._async_drain(key, drain, subscribe),
+            f"yalexs_ble_activity drain {key}",
+        )
+
+        @callback
+        def _async_cancel() -> None:
+            task.cancel()
+            self._async_finish(key, drain)
+            self._async_remove(key, drain)
+            self._backlog = deque(item for item in self._backlog if item[0] != key)
+
+            if drain.unsubscribe is not None:
+                drain.unsubscribe()
+
+        return _async_cancel
+
+    async def _async_drain(
+        self,
+        key: str,
+        drain: LockDrain,
+        subscribe: Callable[..., CALLBACK_TYPE],
+    ) -> None:
+        await self._semaphore.acquire()
+
+        _LOGGER.debug("starting activity drain for %s", key)
+
+        assert drain.unsubscribe is not None
+
+        drain.started = time.monotonic()
+        drain.started_at = dt_util.utcnow()
+        drain.unsubscribe()
+        drain.unsubscribe = subscribe(request_update=True)
+        self._async_schedule_timeout(key, drain, DRAIN_TIMEOUT)
+
+    @callback
+    def _async_schedule_timeout(self, key: str, drain: LockDrain, delay: float) -> None:
+        assert drain.started is not None
+
+        if drain.cancel_timer is not None:
+            drain.cancel_timer()
+
+        remaining = drain.started + DRAIN_TIMEOUT - time.monotonic()
+        drain.cancel_timer = evt.async_call_later(
+            self.hass,
+            max(min(delay, remaining), 0),
+            HassJob(
+                partial(self._async_drain_timeout, key, drain),
+                f"yalexs_ble_activity drain timeout {key}",
+                cancel_on_shutdown=True,
+            ),
+        )
+
+    @callback
+    def _async_drain_timeout(
+        self,
+        key: str,
+        drain: LockDrain,
+        now: dt.datetime,  # noqa: ARG002
+    ) -> None:
+        drain.cancel_timer = None
+        self._async_finish(key, drain)
+        self._async_remove(key, drain)
+
+    @callback
+    def _async_finish(self, key: str, drain: LockDrain) -> None:
+        if not drain.draining:
+            return
+
+        assert drain.started is not None
+
+        drain.finished = time.monotonic()
+        self._semaphore.release()
+
+        if drain.cancel_timer is not None:
+            drain.cancel_timer()
+            drain.cancel_timer = None
+
+        _LOGGER.debug(
+            "finished activity drain for %s: %s activities, %s backlog (%.3fs)",
+            key,
+            drain.activities,
+            drain.backlog,
+            drain.finished - drain.started,
+        )
+
+    @callback
+    def _async_remove(self, key: str, drain: LockDrain) -> None:
+        # a lock that is added again schedules a new drain under the same key.
+        if self._drains.get(key) is drain:
+            del self._drains[key]
+
+    @callback
+    def async_is_backlog(
+        self,
+        key: str,
+        activity: DoorActivity | LockActivity,
+    ) -> bool:
+        """Check if activity of a lock is backlog deferred by its drain.
+
+        Returns:
+            If the lock is draining & the activity predates the drain.
+        """
+        return (drain := self._drains.get(key)) is not None and _is_backlog(
+            drain, activity
+        )
+
+    @callback
+    def async_process(
+        self,
+        key: str,
+        activity: DoorActivity | LockActivity,
+        process: Callable[[], None],
+    ) -> None:
+        """Process activity for a lock, deferring backlog while it drains.
+
+        Args:
+            key: The address of the lock.
+            activity: The activity received.
+            process: Processes the activity.
+        """
+        drain = self._drains.get(key)
+
+        if drain is None or not drain.draining:
+            process()
+            return
+
+        drain.activities += 1
+        self._async_schedule_timeout(key, drain, DRAIN_IDLE_TIMEOUT)
+
+        if not _is_backlog(drain, activity):
+            process()
+            return
+
+        drain.backlog += 1
+        self._backlog.append((key, process))
+
+        if self._backlog_task is None:
+            self._backlog_task = self.entry.async_create_task(
+                self.hass,
+                self._async_process_backlog(),
+                "yalexs_ble_activity drain backlog",
+                eager_start=False,
+            )
+
+    async def _async_process_backlog(self) -> None:
+        try:
+            while self._backlog:
+                for _ in range(min(len(self._backlog), DRAIN_BACKLOG_BATCH_SIZE)):
+                    _key, process = self._backlog.popleft()
+                    process()
+
+                await asyncio.sleep(0)
+        finally:
+            self._backlog_task = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The drain coordinator state.
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "backlog": len(self._backlog),
+            "locks": {key: drain.as_dict() for key, drain in self._drains.items()},
+        }
+
+
+def _is_backlog(drain: LockDrain, activity: DoorActivity | LockActivity) -> bool:
+    if not drain.draining:
+        return False
+
+    assert drain.started_at is not None
+
+    return activity.timestamp < drain.started_at - DRAIN_LIVE_TOLERANCE
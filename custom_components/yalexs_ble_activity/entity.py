@@ -0,0 +1,137 @@
+"""Shared entity setup for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from homeassistant.components.yalexs_ble.entity import YALEXSBLEEntity
+from homeassistant.components.yalexs_ble.models import YaleXSBLEData
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+
+from .const import CONF_LOCK_ENTITIES, SIGNAL_LOCK_ENTITIES_UPDATED
+from .models import YaleXSBLEActivityConfigEntry
+
+
+@callback
+def async_setup_lock_entities(
+    hass: HomeAssistant,
+    entry: YaleXSBLEActivityConfigEntry,
+    async_add_entities: AddConfigEntryEntitiesCallback,
+    entity_factory: Callable[[YaleXSBLEData], YALEXSBLEEntity],
+) -> None:
+    """Set up one entity per lock of an entry.
+
+    Entities are reconciled with the locks of the entry as they change, so
+    only the entities of added or removed locks are created or removed.
+    """
+    entities: dict[str, YALEXSBLEEntity] = {}
+
+    @callback
+    def _async_reconcile() -> None:
+        lock_data = _async_lock_data(hass, entry)
+
+        for address in entities.keys() - lock_data.keys():
+            _async_remove_entity(hass, entry, entities.pop(address))
+
+        added = {
+            address: entity_factory(data)
+            for address, data in lock_data.items()
+            if address not in entities
+        }
+        entities.update(added)
+        async_add_entities(added.values())
+
+    _async_reconcile()
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_LOCK_ENTITIES_UPDATED.format(entry_id=entry.entry_id),
+            _async_reconcile,
+        )
+    )
+
+
+@callback
+def async_lock_addresses(
+    hass: HomeAssistant,
+    lock_entity_ids: list[str],
+) -> dict[str, str]:
+    """Get the addresses of locks keyed by lock entity ID.
+
+    Returns:
+        The address of each lock that is loaded.
+    """
+    return {
+        lock_entity_id: data.lock.address
+        for lock_entity_id in lock_entity_ids
+        if (data := _async_core_data(hass, lock_entity_id))
+    }
+
+
+@callback
+def _async_lock_data(
+    hass: HomeAssistant,
+    entry: YaleXSBLEActivityConfigEntry,
+) -> dict[str, YaleXSBLEData]:
+    """Get the core data of the locks of an entry keyed by lock address.
+
+    Returns:
+        The data of each lock that is loaded.
+    """
+    return {
+        data.lock.address: data
+        for lock_entity_id in entry.data[CONF_LOCK_ENTITIES]
+        if (data := _async_core_data(hass, lock_entity_id))
+    }
+
+
+@callback
+def _async_core_data(hass: HomeAssistant, lock_entity_id: str) -> YaleXSBLEData | None:
+    """Get the core data of a lock.
+
+    Returns:
+        The data of the lock if it is loaded.
+    """
+    if (
+        (lock_entry := er.async_get(hass).async_get(lock_entity_id))
+        and (core_entry_id := lock_entry.config_entry_id)
+        and (core_entry := hass.config_entries.async_get_known_entry(core_entry_id))
+    ):
+        return core_entry.runtime_data
+
+    return None
+
+
+@callback
+def _async_remove_entity(
+    hass: HomeAssistant,
+    entry: YaleXSBLEActivityConfigEntry,
+    entity: YALEXSBLEEntity,
+) -> None:
+    """Remove the entity of a lock that is no longer part of an entry.
+
+    The entry is also removed from the lock's device so the device no longer
+    shows a connection to this integration. Each platform removes its own
+    entity, so the device may already have been detached.
+    """
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+
+    if (registry_entry := entity.registry_entry) is None:
+        return
+
+    if entity_registry.async_get(registry_entry.entity_id):
+        entity_registry.async_remove(registry_entry.entity_id)
+
+    if (
+        registry_entry.device_id is not None
+        and (device := device_registry.async_get(registry_entry.device_id))
+        and entry.entry_id in device.config_entries
+    ):
+        device_registry.async_update_device(
+            device.id, remove_config_entry_id=entry.entry_id
+        )
@@ -0,0 +1,68 @@
+"""Support for Yale Access Bluetooth Activity events."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.event import EventEntity
+from homeassistant.components.yalexs_ble.entity import YALEXSBLEEntity
+from homeassistant.components.yalexs_ble.models import YaleXSBLEData
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+
+from .const import ACTIVITY_EVENT_TYPES, SIGNAL_ACTIVITY
+from .entity import async_setup_lock_entities
+from .models import YaleXSBLEActivityConfigEntry
+
+
+async def async_setup_entry(  # noqa: RUF029
+    hass: HomeAssistant,
+    entry: YaleXSBLEActivityConfigEntry,
+    async_add_entities: AddConfigEntryEntitiesCallback,
+) -> None:
+    """Set up Yale Access Bluetooth Activity events."""
+    async_setup_lock_entities(
+        hass,
+        entry,
+        async_add_entities,
+        YaleXSBLEActivityEvent,
+    )
+
+
+class YaleXSBLEActivityEvent(YALEXSBLEEntity, EventEntity):
+    """Representation of the activity of a Yale Access Bluetooth lock.
+
+    Each processed activity is fired as an event of this entity, so listeners
+    can target the activity of a single lock.
+    """
+
+    _attr_translation_key = "activity"
+    _attr_icon = "mdi:history"
+    _attr_event_types = ACTIVITY_EVENT_TYPES
+
+    def __init__(self, data: YaleXSBLEData) -> None:
+        """Initialize the event."""
+        super().__init__(data)
+        self._attr_unique_id = f"{data.lock.address}activity"
+        self._activity_signal = SIGNAL_ACTIVITY.format(address=data.lock.address)
+
+    @callback
+    def _async_handle_activity(
+        self, value: str | None, attributes: dict[str, Any]
+    ) -> None:
+        if value not in ACTIVITY_EVENT_TYPES:
+            return
+
+        self._trigger_event(value, attributes)
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to activity."""
+        await super().async_added_to_hass()
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._activity_signal, self._async_handle_activity
+            )
+        )
@@ -0,0 +1,94 @@
+"""Activity filtering for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from .const import (
+    CONF_KINDS,
+    CONF_REMOTE_TYPES,
+    CONF_SLOTS,
+    CONF_SOURCES,
+    CONF_STATUSES,
+)
+
+ActivityFilter = Callable[[DoorActivity | LockActivity], bool]
+
+KIND_DOOR = "door"
+KIND_LOCK = "lock"
+
+KINDS = [KIND_DOOR, KIND_LOCK]
+SOURCES = [source.name.lower() for source in LockOperationSource]
+REMOTE_TYPES = [remote_type.name.lower() for remote_type in LockOperationRemoteType]
+
+
+def compile_activity_filter(rules: Mapping[str, Any]) -> ActivityFilter | None:
+    """Compile filter rules into a predicate.
+
+    Rule values are resolved to the enum members of the activity ahead of
+    time, so the predicate only compares attributes & checks membership in
+    sets.
+
+    Returns:
+        A predicate that is true for activity that should be filtered out, or
+        `None` if nothing is filtered.
+    """
+    kinds = frozenset(rules.get(CONF_KINDS, ()))
+    statuses: list[str] = rules.get(CONF_STATUSES, [])
+    exclude_doors = KIND_DOOR in kinds
+    exclude_locks = KIND_LOCK in kinds
+    door_statuses = frozenset(
+        DoorStatus[status.removeprefix("door_").upper()]
+        for status in statuses
+        if status.startswith("door_")
+    )
+    lock_statuses = frozenset(
+        LockStatus[status.removeprefix("lock_").upper()]
+        for status in statuses
+        if status.startswith("lock_")
+    )
+    sources = frozenset(
+        LockOperationSource[source.upper()] for source in rules.get(CONF_SOURCES, ())
+    )
+    remote_types = frozenset(
+        LockOperationRemoteType[remote_type.upper()]
+        for remote_type in rules.get(CONF_REMOTE_TYPES, ())
+    )
+    slots = frozenset(rules.get(CONF_SLOTS, ()))
+
+    if not (
+        exclude_doors
+        or exclude_locks
+        or door_statuses
+        or lock_statuses
+        or sources
+        or remote_types
+        or slots
+    ):
+        return None
+
+    def _filtered(activity: DoorActivity | LockActivity) -> bool:
+        if isinstance(activity, LockActivity):
+            return (
+                exclude_locks
+                or activity.status in lock_statuses
+                or activity.source in sources
+                or activity.remote_type in remote_types
+                or activity.slot in slots
+            )
+
+        if isinstance(activity, DoorActivity):
+            return exclude_doors or activity.status in door_statuses
+
+        return False
+
+    return _filtered
@@ -0,0 +1,141 @@
+"""Activity history warm-up for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+import logging
+import time
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder.core import Recorder
+from homeassistant.components.recorder.db_schema import (
+    StateAttributes,
+    States,
+    StatesMeta,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads_object
+from sqlalchemy import func, select
+
+from .activity_log import LockActivityLog, ProcessedActivity
+from .const import (
+    ATTR_REMOTE_TYPE,
+    ATTR_SLOT,
+    ATTR_SOURCE,
+    ATTR_TIMESTAMP,
+    CALENDAR_HISTORY_SIZE,
+    SIGNAL_ACTIVITY_HISTORY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_warm_history(
+    hass: HomeAssistant,
+    logs: dict[str, LockActivityLog],
+) -> None:
+    """Restore the recent activity of locks from the recorder.
+
+    The history of all locks is loaded with a single query in the recorder's
+    executor rather than one query for each lock. Enough history is loaded to
+    also seed the periods of the calendar of each lock, which only keeps the
+    periods in memory.
+    """
+    if not logs or recorder.DOMAIN not in hass.config.components:
+        return
+
+    started = time.perf_counter()
+    instance = recorder.get_instance(hass)
+    history = await instance.async_add_executor_job(
+        load_history, instance, list(logs), CALENDAR_HISTORY_SIZE
+    )
+
+    # locks may have been removed while history was loading.
+    for entity_id, log in logs.items():
+        if (activities := history.get(entity_id)) is not None:
+            log.restore(activities)
+            async_dispatcher_send(
+                hass, SIGNAL_ACTIVITY_HISTORY.format(address=log.address), activities
+            )
+
+    _LOGGER.debug(
+        "restored %s activities for %s locks in %.3fs",
+        sum(map(len, history.values())),
+        len(history),
+        time.perf_counter() - started,
+    )
+
+
+def load_history(
+    instance: Recorder,
+    entity_ids: list[str],
+    count: int,
+) -> dict[str, list[ProcessedActivity]]:
+    """Load the most recent activity of entities; this runs in the executor.
+
+    Each activity is usually recorded twice; once as historic activity & once
+    when the state of the sensor is written. Rows are ranked within each
+    entity so that only enough of them to find the most recent activity are
+    returned from the database.
+
+    Returns:
+        The activities of each entity, oldest first.
+    """
+    ranked = (
+        select(
+            StatesMeta.entity_id,
+            States.state,
+            StateAttributes.shared_attrs,
+            func.row_number()
+            .over(
+                partition_by=States.metadata_id,
+                order_by=States.last_updated_ts.desc(),
+            )
+            .label("rank"),
+        )
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .join(StateAttributes, States.attributes_id == StateAttributes.attributes_id)
+        .where(StatesMeta.entity_id.in_(entity_ids))
+        .where(States.state.not_in((STATE_UNKNOWN, STATE_UNAVAILABLE)))
+        .subquery()
+    )
+
+    with session_scope(session=instance.get_session(), read_only=True) as session:
+        rows = session.execute(
+            select(ranked.c.entity_id, ranked.c.state, ranked.c.shared_attrs).where(
+                ranked.c.rank <= count * 2
+            )
+        ).all()
+
+    activities: defaultdict[str, dict[tuple[str, str], ProcessedActivity]] = (
+        defaultdict(dict)
+    )
+
+    for entity_id, state, shared_attrs in rows:
+        attributes = json_loads_object(shared_attrs)
+
+        if (
+            not isinstance(timestamp := attributes.get(ATTR_TIMESTAMP), str)
+            or (parsed := dt_util.parse_datetime(timestamp)) is None
+        ):
+            continue
+
+        activities[entity_id][timestamp, state] = ProcessedActivity(
+            processed_at=None,
+            timestamp=parsed,
+            state=state,
+            source=attributes.get(ATTR_SOURCE),  # type: ignore[arg-type]
+            remote_type=attributes.get(ATTR_REMOTE_TYPE),  # type: ignore[arg-type]
+            slot=attributes.get(ATTR_SLOT),  # type: ignore[arg-type]
+        )
+
+    return {
+        entity_id: sorted(by_key.values(), key=lambda activity: activity.timestamp)[
+            -count:
+        ]
+        for entity_id, by_key in activities.items()
+    }
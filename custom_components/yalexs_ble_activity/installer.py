@@ -0,0 +1,185 @@
+"""Patched yalexs-ble installation for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+import asyncio
+from enum import StrEnum
+import logging
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, package as pkg_util
+from homeassistant.util.hass_dict import HassKey
+from packaging.utils import InvalidWheelFilename, parse_wheel_filename
+from packaging.version import Version
+
+from .const import (
+    DOMAIN,
+    PATCH_UNAVAILABLE_RETRY,
+    YALEXSBLE_PATCH_URL,
+    YALEXSBLE_WHEEL_PATTERN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.patches"
+STORAGE_VERSION = 1
+
+DATA_PATCH_INSTALLER: HassKey[PatchInstaller] = HassKey(f"{DOMAIN}_patch_installer")
+
+
+class PatchStatus(StrEnum):
+    """The status of the patched package for a version of yalexs-ble."""
+
+    INSTALLING = "installing"
+    INSTALLED = "installed"
+    UNAVAILABLE = "unavailable"
+
+
+class PatchInstaller:
+    """Install the patched yalexs-ble package in the background.
+
+    The outcome of installing patches for each version of yalexs-ble is
+    cached, so the slow, network bound install only happens once for each
+    version. Wheels in the local wheel directory are preferred over building
+    the patches from source, so they can be prepared ahead of time.
+
+    Installed patches are only imported after a restart. A version cached as
+    installed by an earlier run that is still unpatched has since been
+    reinstalled without the patches, i.e. by upgrading a container, so the
+    patches are installed again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the installer."""
+        self.hass = hass
+        self.wheel_dir = Path(hass.config.path(DOMAIN, "wheels"))
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._versions: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._installed: set[str] = set()
+
+    async def async_load(self) -> None:
+        """Load the cached install results."""
+        data = await self._store.async_load() or {}
+        self._versions = data.get("versions", {})
+
+    @callback
+    def async_ensure(self, version: str) -> PatchStatus:
+        """Get the status of the patches for a version, installing if needed.
+
+        This is only called while the version is unpatched, so patches cached
+        as installed are only current if they were installed since startup.
+        Versions for which no patches were available are retried periodically
+        in case patches have been created since.
+
+        Returns:
+            The status of the patches.
+        """
+        if (result := self._versions.get(version)) is not None and (
+            version in self._installed
+            if result["status"] == PatchStatus.INSTALLED
+            else dt_util.parse_datetime(result["checked"], raise_on_error=True)
+            + PATCH_UNAVAILABLE_RETRY
+            > dt_util.utcnow()
+        ):
+            return PatchStatus(result["status"])
+
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_install(version),
+                f"yalexs_ble_activity install patches {version}",
+            )
+
+        return PatchStatus.INSTALLING
+
+    async def _async_install(self, version: str) -> None:
+        started = time.perf_counter()
+
+        try:
+            requirement = await self.hass.async_add_executor_job(self._install, version)
+        finally:
+            self._task = None
+
+        duration = time.perf_counter() - started
+        status = (
+            PatchStatus.UNAVAILABLE if requirement is None else PatchStatus.INSTALLED
+        )
+
+        if status is PatchStatus.INSTALLED:
+            self._installed.add(version)
+
+        _LOGGER.info(
+            "patches for yalexs_ble==%s %s in %.1fs from %s",
+            version,
+            status,
+            duration,
+            requirement,
+        )
+
+        self._versions[version] = {
+            "status": status,
+            "requirement": requirement,
+            "checked": dt_util.utcnow().isoformat(),
+            "install_time": duration,
+        }
+        await self._store.async_save({"versions": self._versions})
+
+        # entries waiting on the install report the outcome right away rather
+        # than on their next scheduled retry.
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if entry.state is ConfigEntryState.SETUP_RETRY:
+                self.hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    def _install(self, version: str) -> str | None:
+        """Install the patches for a version; this runs in a worker thread.
+
+        Returns:
+            The requirement that was installed, if any.
+        """
+        for requirement in (
+            *self._local_wheels(version),
+            YALEXSBLE_PATCH_URL.format(version=version),
+        ):
+            if pkg_util.install_package(requirement):
+                return requirement
+
+        return None
+
+    def _local_wheels(self, version: str) -> list[str]:
+        """Find patched wheels for a version in the local wheel directory.
+
+        Only wheels with a `+patches` local version are patched builds.
+
+        Returns:
+            The paths of the wheels, newest builds first.
+        """
+        wheels: list[tuple[Version, str]] = []
+
+        for path in self.wheel_dir.glob(
+            YALEXSBLE_WHEEL_PATTERN.format(version=version)
+        ):
+            try:
+                _, wheel_version, _, _ = parse_wheel_filename(path.name)
+            except InvalidWheelFilename:
+                _LOGGER.debug("ignoring invalid wheel: %s", path)
+                continue
+
+            wheels.append((wheel_version, str(path)))
+
+        return [path for _, path in sorted(wheels, reverse=True)]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The cached install results.
+        """
+        return {
+            "installing": self._task is not None,
+            "versions": self._versions,
+        }
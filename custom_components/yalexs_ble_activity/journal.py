@@ -0,0 +1,272 @@
+"""Write-ahead journal of pending activity for Yale Access Bluetooth Activity.
+
+Operation sensors delay writing their state so that bursts of activity are
+coalesced into a single state change. Activity that's pending when Home
+Assistant stops or the entry reloads would otherwise be lost from the state of
+the sensor.
+
+The journal is an append-only file of JSON lines per config entry. A line is
+appended when activity becomes pending for a lock and again, without the
+activity, once it has been written as the state of the sensor. Lines are
+written & fsynced in batches in the executor, one batch at a time. On startup
+the journal is replayed to find the activity that was still pending for each
+lock, and is compacted to only that activity.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import datetime as dt
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from .const import DOMAIN, JOURNAL_COMPACT_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UnsupportedActivityError(ValueError):
+    """An activity is not a supported type."""
+
+
+def activity_from_dict(data: dict[str, Any]) -> DoorActivity | LockActivity:
+    """Create an activity from its JSON representation.
+
+    Returns:
+        The activity.
+
+    Raises:
+        UnsupportedActivityError: If the activity type is unknown.
+    """
+    timestamp = dt.datetime.fromisoformat(data["timestamp"])
+
+    if data["type"] == "door":
+        return DoorActivity(
+            timestamp=timestamp,
+            status=DoorStatus[data["status"].upper()],
+        )
+
+    if data["type"] == "lock":
+        remote_type = data.get("remote_type")
+        return LockActivity(
+            timestamp=timestamp,
+            status=LockStatus[data["status"].upper()],
+            source=LockOperationSource[data["source"].upper()],
+            remote_type=None
+            if remote_type is None
+            else LockOperationRemoteType[remote_type.upper()],
+            slot=data.get("slot"),
+        )
+
+    raise UnsupportedActivityError(data["type"])
+
+
+def activity_as_dict(activity: DoorActivity | LockActivity) -> dict[str, Any]:
+    """Create the JSON representation of an activity.
+
+    Returns:
+        The JSON representation.
+    """
+    if isinstance(activity, DoorActivity):
+        return {
+            "type": "door",
+            "timestamp": activity.timestamp.isoformat(),
+            "status": activity.status.name.lower(),
+        }
+
+    return {
+        "type": "lock",
+        "timestamp": activity.timestamp.isoformat(),
+        "status": activity.status.name.lower(),
+        "source": activity.source.name.lower(),
+        "remote_type": None
+        if activity.remote_type is None
+        else activity.remote_type.name.lower(),
+        "slot": activity.slot,
+    }
+
+
+class ActivityJournal:
+    """Journal the pending activity of the locks of a config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the journal."""
+        self.hass = hass
+        self.entry = entry
+        self.path = Path(hass.config.path(DOMAIN, "journal", f"{entry.entry_id}.jsonl"))
+        self.appended = 0
+        self.syncs = 0
+        self.compactions = 0
+        self.replayed = 0
+        self._lines = 0
+        self._buffer: list[bytes] = []
+        self._pending: dict[str, bytes] = {}
+        self._restored: dict[str, DoorActivity | LockActivity] = {}
+        self._sync_task: asyncio.Task[None] | None = None
+
+    async def async_load(self) -> None:
+        """Replay the journal to find activity that was still pending."""
+        pending = await self.hass.async_add_executor_job(_load_journal, self.path)
+
+        self._pending = {key: line for key, (line, _) in pending.items()}
+        self._restored = {key: activity for key, (_, activity) in pending.items()}
+        self._lines = len(pending)
+
+        _LOGGER.debug("restored %s pending activities from journal", len(pending))
+
+    @callback
+    def async_take_restored(self, key: str) -> DoorActivity | LockActivity | None:
+        """Take the activity that was pending for a lock at startup.
+
+        Returns:
+            The activity, if any.
+        """
+        if (activity := self._restored.pop(key, None)) is not None:
+            self.replayed += 1
+
+        return activity
+
+    @callback
+    def async_discard_restored(self) -> None:
+        """Discard restored activity of locks that no longer exist."""
+        for key in self._restored:
+            self.async_append(key, None)
+
+        self._restored.clear()
+
+    @callback
+    def async_append(
+        self,
+        key: str,
+        activity: DoorActivity | LockActivity | None,
+    ) -> None:
+        """Journal the pending activity of a lock.
+
+        Args:
+            key: The key of the lock.
+            activity: The pending activity, or `None` once no activity is
+                pending for the lock.
+        """
+        supported = isinstance(activity, (DoorActivity, LockActivity))
+        line = json_bytes(
+            {"key": key, "activity": activity_as_dict(activity) if supported else None}
+        )
+        line += b"\n"
+
+        if supported:
+            self._pending[key] = line
+        else:
+            self._pending.pop(key, None)
+
+        self._buffer.append(line)
+        self.appended += 1
+
+        if self._sync_task is None:
+            self._sync_task = self.entry.async_create_task(
+                self.hass, self._async_sync(), "yalexs_ble_activity journal sync"
+            )
+
+    async def _async_sync(self) -> None:
+        try:
+            while self._buffer:
+                buffer, self._buffer = self._buffer, []
+                compact = self._lines + len(buffer) > JOURNAL_COMPACT_SIZE
+                lines = list(self._pending.values()) if compact else buffer
+
+                await self.hass.async_add_executor_job(
+                    _write_journal, self.path, lines, compact
+                )
+
+                self.syncs += 1
+                self.compactions += compact
+                self._lines = len(lines) if compact else self._lines + len(lines)
+        finally:
+            self._sync_task = None
+
+    async def async_sync(self) -> None:
+        """Wait for journaled activity to be written to disk."""
+        if self._sync_task is not None:
+            await self._sync_task
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The journal state.
+        """
+        return {
+            "pending": len(self._pending),
+            "buffered": len(self._buffer),
+            "appended": self.appended,
+            "syncs": self.syncs,
+            "compactions": self.compactions,
+            "replayed": self.replayed,
+        }
+
+
+def _load_journal(
+    path: Path,
+) -> dict[str, tuple[bytes, DoorActivity | LockActivity]]:
+    """Replay a journal & compact it to the activity that's still pending.
+
+    Lines that can't be read, i.e. a partial line from an interrupted write,
+    are skipped.
+
+    Returns:
+        The pending activity & its journal line keyed by lock.
+    """
+    pending: dict[str, tuple[bytes, DoorActivity | LockActivity]] = {}
+
+    try:
+        with path.open("rb") as file:
+            for line in file:
+                try:
+                    record = json_loads(line)
+                    key = record["key"]
+                    data = record["activity"]
+                    activity = None if data is None else activity_from_dict(data)
+                except (KeyError, TypeError, ValueError):
+                    _LOGGER.debug("skipping unreadable journal line: %r", line)
+                    continue
+
+                if activity is None:
+                    pending.pop(key, None)
+                else:
+                    pending[key] = (line.rstrip(b"\n") + b"\n", activity)
+    except FileNotFoundError:
+        return {}
+
+    _write_journal(path, [line for line, _ in pending.values()], compact=True)
+    return pending
+
+
+def _write_journal(path: Path, lines: Iterable[bytes], compact: bool) -> None:  # noqa: FBT001
+    """Append lines to a journal, or replace it when compacting.
+
+    Written lines are fsynced before returning.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    target = path.with_name(f"{path.name}.tmp") if compact else path
+
+    with target.open("wb" if compact else "ab") as file:
+        file.writelines(lines)
+        file.flush()
+        os.fsync(file.fileno())
+
+    if compact:
+        target.replace(path)
@@ -0,0 +1,113 @@
+"""Describe Yale Access Bluetooth Activity logbook events."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+
+from homeassistant.components.logbook import (
+    LOGBOOK_ENTRY_ENTITY_ID,
+    LOGBOOK_ENTRY_MESSAGE,
+    LOGBOOK_ENTRY_NAME,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import (
+    ATTR_REMOTE_TYPE,
+    ATTR_SLOT,
+    ATTR_SOURCE,
+    DOMAIN,
+    EVENT_ACTIVITY,
+    EVENT_ENTRY,
+)
+
+_SOURCE_DESCRIPTIONS = {
+    "auto_lock": "by auto-lock",
+    "manual": "manually",
+    "pin": "via keypad",
+    "remote": "remotely",
+}
+
+
+@callback
+def async_describe_events(
+    hass: HomeAssistant,
+    async_describe_event: Callable[[str, str, Callable[[Event], dict[str, str]]], None],
+) -> None:
+    """Describe logbook events."""
+
+    @callback
+    def async_describe_activity_event(event: Event) -> dict[str, str]:
+        data = event.data
+        entity_id = data["entity_id"]
+        attributes = data["attributes"]
+        state = hass.states.get(entity_id)
+
+        return {
+            LOGBOOK_ENTRY_NAME: state.name if state else entity_id,
+            LOGBOOK_ENTRY_MESSAGE: describe_activity(
+                data["state"],
+                attributes.get(ATTR_SOURCE),
+                attributes.get(ATTR_REMOTE_TYPE),
+                attributes.get(ATTR_SLOT),
+            ),
+            LOGBOOK_ENTRY_ENTITY_ID: entity_id,
+        }
+
+    @callback
+    def async_describe_entry_event(event: Event) -> dict[str, str]:
+        data = event.data
+        entity_id = data["entity_id"]
+        state = hass.states.get(entity_id)
+        unlocked = describe_activity(
+            "lock_unlocked", data["source"], data["remote_type"], data["slot"]
+        )
+
+        return {
+            LOGBOOK_ENTRY_NAME: state.name if state else entity_id,
+            LOGBOOK_ENTRY_MESSAGE: (
+                f"entry {unlocked}, door open for"
+                f" {round(data['door_open_duration'])} seconds"
+            ),
+            LOGBOOK_ENTRY_ENTITY_ID: entity_id,
+        }
+
+    async_describe_event(DOMAIN, EVENT_ACTIVITY, async_describe_activity_event)
+    async_describe_event(DOMAIN, EVENT_ENTRY, async_describe_entry_event)
+
+
+@lru_cache(maxsize=1024)
+def describe_activity(
+    state: str | None,
+    source: str | None,
+    remote_type: str | None,
+    slot: int | None,
+) -> str:
+    """Describe an activity, i.e. `unlocked via keypad slot 3`.
+
+    Descriptions are cached since there are few distinct combinations of
+    values, but many activities to describe when rendering the logbook.
+
+    Returns:
+        The description.
+    """
+    if state is None:
+        return "unsupported activity"
+
+    kind, _, status = state.partition("_")
+    description = (
+        status if kind == "lock" and status != "unknown" else f"{kind} {status}"
+    )
+
+    if source is not None and source != "unknown":
+        description += " " + _SOURCE_DESCRIPTIONS.get(
+            source, f"via {source.replace('_', ' ')}"
+        )
+
+    if remote_type is not None and remote_type != "unknown":
+        description += f" ({remote_type.replace('_', ' ')})"
+
+    if slot is not None:
+        description += f" slot {slot}"
+
+    return description
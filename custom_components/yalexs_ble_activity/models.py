@@ -0,0 +1,37 @@
+"""The Yale Access Bluetooth Activity integration models."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+
+from .activity_log import LockActivityLog
+from .archive import ActivityArchive
+from .audit import ActivityAudit
+from .drain import ActivityDrainCoordinator
+from .filters import ActivityFilter
+from .journal import ActivityJournal
+from .pipeline import ActivityPipeline
+from .retention import ActivityRetention
+from .sink import ActivityForwarder
+
+
+@dataclass
+class YaleXSBLEActivityData:
+    """Data for the Yale Access Bluetooth Activity integration."""
+
+    data: dict[str, Any]
+    drain: ActivityDrainCoordinator
+    pipeline: ActivityPipeline
+    journal: ActivityJournal
+    retention: ActivityRetention | None = None
+    archive: ActivityArchive | None = None
+    audit: ActivityAudit | None = None
+    sinks: list[ActivityForwarder] = field(default_factory=list)
+    locks: dict[str, LockActivityLog] = field(default_factory=dict)
+    filters: dict[str, ActivityFilter] = field(default_factory=dict)
+
+
+YaleXSBLEActivityConfigEntry = ConfigEntry[YaleXSBLEActivityData]
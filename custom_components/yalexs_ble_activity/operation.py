@@ -0,0 +1,161 @@
+"""Compact operation sensor state for Yale Access Bluetooth Activity.
+
+Sites can have hundreds of operation sensors, so each sensor keeps its state
+as a single slotted record rather than an attributes dictionary. The strings
+of states, sources & remote types are created once per value & shared by all
+sensors. Attributes & restore data are only built when Home Assistant asks
+for them & are kept by the sensor until its operation changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime as dt
+import sys
+from typing import Any
+
+from homeassistant.helpers.restore_state import ExtraStoredData
+from homeassistant.util import dt as dt_util
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from .activity_log import ProcessedActivity
+from .const import ATTR_REMOTE_TYPE, ATTR_SLOT, ATTR_SOURCE, ATTR_TIMESTAMP
+
+_DOOR_STATES = {
+    status: sys.intern(f"door_{status.name.lower()}") for status in DoorStatus
+}
+_LOCK_STATES = {
+    status: sys.intern(f"lock_{status.name.lower()}") for status in LockStatus
+}
+_SOURCES = {source: sys.intern(source.name.lower()) for source in LockOperationSource}
+_REMOTE_TYPES = {
+    remote_type: sys.intern(remote_type.name.lower())
+    for remote_type in LockOperationRemoteType
+}
+
+
+@dataclass(slots=True, frozen=True)
+class OperationState:
+    """The state of an operation sensor."""
+
+    value: str | None
+    timestamp: dt.datetime | None = None
+    source: str | None = None
+    remote_type: str | None = None
+    slot: int | None = None
+
+    @classmethod
+    def from_activity(cls, activity: DoorActivity | LockActivity) -> OperationState:
+        """Create the state for an activity.
+
+        Returns:
+            The state.
+        """
+        if isinstance(activity, DoorActivity):
+            return cls(_DOOR_STATES[activity.status], activity.timestamp)
+
+        if isinstance(activity, LockActivity):
+            return cls(
+                _LOCK_STATES[activity.status],
+                activity.timestamp,
+                _SOURCES[activity.source],
+                None
+                if activity.remote_type is None
+                else _REMOTE_TYPES[activity.remote_type],
+                activity.slot,
+            )
+
+        return cls(None)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> OperationState | None:
+        """Create the state from restore data.
+
+        Returns:
+            The state, if the sensor had a value.
+        """
+        if (value := data["value"]) is None:
+            return None
+
+        attributes = data["attributes"] or {}
+        timestamp = attributes.get(ATTR_TIMESTAMP)
+        source = attributes.get(ATTR_SOURCE)
+        remote_type = attributes.get(ATTR_REMOTE_TYPE)
+
+        return cls(
+            sys.intern(value),
+            dt_util.parse_datetime(timestamp)
+            if isinstance(timestamp, str)
+            else timestamp,
+            None if source is None else sys.intern(source),
+            None if remote_type is None else sys.intern(remote_type),
+            attributes.get(ATTR_SLOT),
+        )
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """The state attributes of the sensor."""
+        attributes: dict[str, Any] = {}
+
+        if self.timestamp is not None:
+            attributes[ATTR_TIMESTAMP] = self.timestamp
+        if self.source is not None:
+            attributes[ATTR_SOURCE] = self.source
+        if self.remote_type is not None:
+            attributes[ATTR_REMOTE_TYPE] = self.remote_type
+        if self.slot is not None:
+            attributes[ATTR_SLOT] = self.slot
+
+        return attributes
+
+    def processed(self, processed_at: dt.datetime) -> ProcessedActivity:
+        """Get the processed activity of the state.
+
+        Returns:
+            The processed activity.
+        """
+        assert self.timestamp is not None
+
+        return ProcessedActivity(
+            processed_at=processed_at,
+            timestamp=self.timestamp,
+            state=self.value,
+            source=self.source,
+            remote_type=self.remote_type,
+            slot=self.slot,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for restore data.
+
+        Returns:
+            The value & attributes of the sensor.
+        """
+        return {"value": self.value, "attributes": self.attributes}
+
+
+class OperationExtraData(ExtraStoredData):
+    """Restore data of an operation sensor, built when the state is saved."""
+
+    __slots__ = ("operation",)
+
+    def __init__(self, operation: OperationState | None) -> None:
+        """Initialize the restore data."""
+        self.operation = operation
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation of the restore data.
+
+        Returns:
+            The value & attributes of the sensor.
+        """
+        if self.operation is None:
+            return {"value": None, "attributes": None}
+
+        return self.operation.as_dict()
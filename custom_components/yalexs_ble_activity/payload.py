@@ -0,0 +1,53 @@
+"""Pre-serialized activity payloads for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime as dt
+from typing import Any
+
+from homeassistant.helpers.json import json_bytes
+
+
+@dataclass(slots=True, frozen=True)
+class ActivityPayload:
+    """The JSON-ready payload of an activity.
+
+    Payloads are built & serialized once in a worker thread. The same data is
+    fired as the activity event & the same bytes are sent to every websocket
+    subscriber.
+    """
+
+    data: dict[str, Any]
+    serialized: bytes
+
+    @classmethod
+    def build(
+        cls,
+        entity_id: str,
+        state: str | None,
+        attributes: dict[str, Any],
+    ) -> ActivityPayload:
+        """Build the payload of an activity.
+
+        Returns:
+            The payload.
+        """
+        data = {
+            "entity_id": entity_id,
+            "state": state,
+            "attributes": {
+                key: value.isoformat() if isinstance(value, dt.datetime) else value
+                for key, value in attributes.items()
+            },
+        }
+
+        return cls(data, json_bytes(data))
+
+    def event_message(self, msg_id: int) -> bytes:
+        """Get a websocket event message for a subscription.
+
+        Returns:
+            The serialized message.
+        """
+        return b'{"id":%d,"type":"event","event":%s}' % (msg_id, self.serialized)
@@ -0,0 +1,339 @@
+"""Time-indexed activity periods for Yale Access Bluetooth Activity.
+
+A period is the time a lock was unlocked or its door was open, built by
+pairing the activity that opens it with the activity that closes it. Periods
+of the same kind never overlap, so both their starts & ends are in order and
+the periods within a range are found with two binary searches rather than by
+scanning the activity of the lock.
+
+Activity is usually processed in order & extends the latest period in
+constant time. Backfilled activity is inserted in place and only the periods
+from it onward are paired again, since the drain delivers a backlog in order
+just before the live activity. History restored at startup is merged with the
+kept activity & paired once.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+import datetime as dt
+import heapq
+from itertools import islice
+from operator import attrgetter
+from typing import Any
+
+from .activity_log import ProcessedActivity
+from .const import (
+    ATTR_REMOTE_TYPE,
+    ATTR_SLOT,
+    ATTR_SOURCE,
+    ATTR_TIMESTAMP,
+    CALENDAR_HISTORY_SIZE,
+)
+
+PERIOD_DOOR_OPEN = "door_open"
+PERIOD_UNLOCKED = "unlocked"
+
+# the kind of period each state opens or closes & whether it opens it.
+_TRANSITIONS: dict[str, tuple[str, bool]] = {
+    "door_ajar": (PERIOD_DOOR_OPEN, True),
+    "door_opened": (PERIOD_DOOR_OPEN, True),
+    "door_closed": (PERIOD_DOOR_OPEN, False),
+    "lock_unlocked": (PERIOD_UNLOCKED, True),
+    "lock_locked": (PERIOD_UNLOCKED, False),
+}
+
+
+@dataclass(slots=True, frozen=True)
+class ActivityPeriod:
+    """A period a lock was unlocked or its door was open."""
+
+    kind: str
+    start: dt.datetime
+    end: dt.datetime | None
+    source: str | None = None
+    remote_type: str | None = None
+    slot: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class _Transition:
+    timestamp: dt.datetime
+    opening: bool
+    source: str | None
+    remote_type: str | None
+    slot: int | None
+
+
+class PeriodIndex:
+    """The periods of a single kind, ordered by time.
+
+    The most recent activity is kept, up to the size of the index, so the
+    periods can be paired again when activity is backfilled. Periods that
+    start before the oldest kept activity are dropped with it.
+    """
+
+    __slots__ = (
+        "_ends",
+        "_open",
+        "_periods",
+        "_size",
+        "_starts",
+        "_times",
+        "_transitions",
+        "kind",
+    )
+
+    def __init__(self, kind: str, size: int = CALENDAR_HISTORY_SIZE) -> None:
+        """Initialize the index.
+
+        Args:
+            kind: The kind of the periods.
+            size: The maximum number of activities to keep.
+        """
+        self.kind = kind
+        self._size = size
+        self._times: list[float] = []
+        self._transitions: list[_Transition] = []
+        self._starts: list[float] = []
+        self._ends: list[float] = []
+        self._periods: list[ActivityPeriod] = []
+        self._open: _Transition | None = None
+
+    def __len__(self) -> int:
+        """Get the number of completed periods.
+
+        Returns:
+            The number of completed periods.
+        """
+        return len(self._periods)
+
+    @property
+    def current(self) -> ActivityPeriod | None:
+        """The period that has not yet ended, if any."""
+        return None if self._open is None else self._period(self._open, None)
+
+    def add(
+        self,
+        timestamp: dt.datetime,
+        *,
+        opening: bool,
+        source: str | None = None,
+        remote_type: str | None = None,
+        slot: int | None = None,
+    ) -> None:
+        """Add activity that opens or closes a period."""
+        transition = _Transition(timestamp, opening, source, remote_type, slot)
+        key = timestamp.timestamp()
+
+        if not self._times or key >= self._times[-1]:
+            self._times.append(key)
+            self._transitions.append(transition)
+            self._apply(transition)
+        else:
+            index = bisect_right(self._times, key)
+            self._times.insert(index, key)
+            self._transitions.insert(index, transition)
+            self._repair(index, key)
+
+        if len(self._times) > self._size:
+            self._trim()
+
+    def restore(self, transitions: Iterable[_Transition]) -> None:
+        """Restore activity that predates activity added since startup.
+
+        The activity is merged with the kept activity & all of it is paired at
+        once rather than inserting each activity in place.
+        """
+        self._transitions = sorted(
+            (*self._transitions, *transitions), key=attrgetter("timestamp")
+        )[-self._size :]
+        self._times = [
+            transition.timestamp.timestamp() for transition in self._transitions
+        ]
+        self._pair()
+
+    def between(self, start: dt.datetime, end: dt.datetime) -> Iterator[ActivityPeriod]:
+        """Get the periods that overlap a range, including the current period.
+
+        Args:
+            start: The start of the range.
+            end: The end of the range, exclusive.
+
+        Yields:
+            Each period ordered by start. The current period has no end.
+        """
+        first = bisect_right(self._ends, start.timestamp())
+        last = bisect_left(self._starts, end.timestamp())
+
+        yield from islice(self._periods, first, last)
+
+        if (opened := self._open) is not None and opened.timestamp < end:
+            yield self._period(opened, None)
+
+    def _apply(self, transition: _Transition) -> None:
+        if transition.opening:
+            if self._open is None:
+                self._open = transition
+            return
+
+        if (opened := self._open) is None:
+            return
+
+        self._open = None
+        self._starts.append(opened.timestamp.timestamp())
+        self._ends.append(transition.timestamp.timestamp())
+        self._periods.append(self._period(opened, transition.timestamp))
+
+    def _pair(self) -> None:
+        """Pair all kept activity into periods again."""
+        self._starts.clear()
+        self._ends.clear()
+        self._periods.clear()
+        self._open = None
+
+        for transition in self._transitions:
+            self._apply(transition)
+
+    def _repair(self, index: int, key: float) -> None:
+        """Pair the activity from an index onward into periods again.
+
+        Periods that end by the time of the activity at the index are paired
+        from the activity before it & are kept. The period open at that time
+        is either the first period that ends after it or the current period.
+        """
+        count = bisect_right(self._ends, key)
+        opened = self._open
+
+        if count < len(self._periods):
+            period = self._periods[count]
+            opened = _Transition(
+                period.start,
+                opening=True,
+                source=period.source,
+                remote_type=period.remote_type,
+                slot=period.slot,
+            )
+
+        del self._starts[count:]
+        del self._ends[count:]
+        del self._periods[count:]
+        self._open = (
+            opened
+            if opened is not None and opened.timestamp.timestamp() <= key
+            else None
+        )
+
+        for transition in islice(self._transitions, index, None):
+            self._apply(transition)
+
+    def _trim(self) -> None:
+        del self._times[0]
+        del self._transitions[0]
+
+        count = bisect_left(self._starts, self._times[0])
+        del self._starts[:count]
+        del self._ends[:count]
+        del self._periods[:count]
+
+    def _period(self, opened: _Transition, end: dt.datetime | None) -> ActivityPeriod:
+        return ActivityPeriod(
+            self.kind,
+            opened.timestamp,
+            end,
+            opened.source,
+            opened.remote_type,
+            opened.slot,
+        )
+
+
+class LockPeriods:
+    """The periods of a single lock, kept up to date from its activity."""
+
+    __slots__ = ("_indexes",)
+
+    def __init__(self, size: int = CALENDAR_HISTORY_SIZE) -> None:
+        """Initialize the periods.
+
+        Args:
+            size: The maximum number of activities to keep for each kind.
+        """
+        self._indexes = {
+            kind: PeriodIndex(kind, size)
+            for kind in (PERIOD_UNLOCKED, PERIOD_DOOR_OPEN)
+        }
+
+    def process(self, value: str | None, attributes: dict[str, Any]) -> bool:
+        """Process an activity of the lock.
+
+        Returns:
+            Whether the activity opens or closes a period.
+        """
+        if value is None or (transition := _TRANSITIONS.get(value)) is None:
+            return False
+
+        kind, opening = transition
+        self._indexes[kind].add(
+            attributes[ATTR_TIMESTAMP],
+            opening=opening,
+            source=attributes.get(ATTR_SOURCE),
+            remote_type=attributes.get(ATTR_REMOTE_TYPE),
+            slot=attributes.get(ATTR_SLOT),
+        )
+        return True
+
+    def restore(self, activities: Iterable[ProcessedActivity]) -> None:
+        """Restore history that predates activity processed since startup.
+
+        Args:
+            activities: The activities to restore.
+        """
+        transitions: defaultdict[str, list[_Transition]] = defaultdict(list)
+
+        for activity in activities:
+            if (
+                activity.state is None
+                or (transition := _TRANSITIONS.get(activity.state)) is None
+            ):
+                continue
+
+            kind, opening = transition
+            transitions[kind].append(
+                _Transition(
+                    activity.timestamp,
+                    opening,
+                    activity.source,
+                    activity.remote_type,
+                    activity.slot,
+                )
+            )
+
+        for kind, index in self._indexes.items():
+            index.restore(transitions[kind])
+
+    @property
+    def current(self) -> ActivityPeriod | None:
+        """The most recently started period that has not yet ended, if any."""
+        return max(
+            (
+                period
+                for index in self._indexes.values()
+                if (period := index.current) is not None
+            ),
+            key=attrgetter("start"),
+            default=None,
+        )
+
+    def between(self, start: dt.datetime, end: dt.datetime) -> Iterator[ActivityPeriod]:
+        """Get the periods of all kinds that overlap a range.
+
+        Returns:
+            An iterator of the periods ordered by start.
+        """
+        return heapq.merge(
+            *(index.between(start, end) for index in self._indexes.values()),
+            key=attrgetter("start"),
+        )
@@ -0,0 +1,168 @@
+"""Activity processing pipeline for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import PIPELINE_BATCH_SIZE, PIPELINE_DISPATCH_BATCH_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+_PipelineItem = tuple[Callable[[], Any], Callable[[Any], None]]
+
+_FAILED = object()
+
+
+@dataclass(slots=True)
+class PipelineStats:
+    """Statistics about the work performed by the pipeline."""
+
+    enqueued: int = 0
+    processed: int = 0
+    failed: int = 0
+    batches: int = 0
+    max_batch_size: int = 0
+    executor_time: float = 0.0
+    loop_time: float = 0.0
+    max_loop_time: float = 0.0
+
+    def add_loop_time(self, duration: float) -> None:
+        """Account for time spent on the event loop."""
+        self.loop_time += duration
+        self.max_loop_time = max(self.max_loop_time, duration)
+
+
+class ActivityPipeline:
+    """Prepare activity in a worker thread & dispatch results on the loop.
+
+    The event loop only enqueues work. Items are prepared in batches in the
+    executor, one batch at a time so results are dispatched in the order that
+    they were enqueued. Results are dispatched in slices that yield to the
+    event loop between them.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the pipeline."""
+        self.hass = hass
+        self.entry = entry
+        self.stats = PipelineStats()
+        self._queue: list[_PipelineItem] = []
+        self._task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_enqueue(
+        self,
+        prepare: Callable[[], Any],
+        dispatch: Callable[[Any], None],
+    ) -> None:
+        """Enqueue work for the pipeline.
+
+        Args:
+            prepare: Prepares a result; this is called in a worker thread.
+            dispatch: Dispatches the result; this is called on the event loop.
+        """
+        started = time.perf_counter()
+
+        self._queue.append((prepare, dispatch))
+        self.stats.enqueued += 1
+
+        if self._task is None:
+            self._task = self.entry.async_create_task(
+                self.hass,
+                self._async_process(),
+                "yalexs_ble_activity pipeline",
+                eager_start=False,
+            )
+
+        self.stats.add_loop_time(time.perf_counter() - started)
+
+    async def _async_process(self) -> None:
+        stats = self.stats
+
+        try:
+            while self._queue:
+                batch = self._queue[:PIPELINE_BATCH_SIZE]
+                del self._queue[:PIPELINE_BATCH_SIZE]
+
+                results, duration = await self.hass.async_add_executor_job(
+                    _prepare_batch, batch
+                )
+
+                stats.batches += 1
+                stats.max_batch_size = max(stats.max_batch_size, len(batch))
+                stats.executor_time += duration
+
+                for index in range(0, len(batch), PIPELINE_DISPATCH_BATCH_SIZE):
+                    self._dispatch(
+                        batch[index : index + PIPELINE_DISPATCH_BATCH_SIZE],
+                        results[index : index + PIPELINE_DISPATCH_BATCH_SIZE],
+                    )
+                    await asyncio.sleep(0)
+        finally:
+            self._task = None
+
+    def _dispatch(self, batch: list[_PipelineItem], results: list[Any]) -> None:
+        started = time.perf_counter()
+
+        for (_prepare, dispatch), result in zip(batch, results, strict=True):
+            if result is _FAILED:
+                self.stats.failed += 1
+                continue
+
+            try:
+                dispatch(result)
+            except Exception:
+                _LOGGER.exception("failed to dispatch activity")
+                self.stats.failed += 1
+                continue
+
+            self.stats.processed += 1
+
+        self.stats.add_loop_time(time.perf_counter() - started)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The pipeline state.
+        """
+        stats = self.stats
+
+        return {
+            "queued": len(self._queue),
+            "enqueued": stats.enqueued,
+            "processed": stats.processed,
+            "failed": stats.failed,
+            "batches": stats.batches,
+            "max_batch_size": stats.max_batch_size,
+            "executor_time": stats.executor_time,
+            "loop_time": stats.loop_time,
+            "max_loop_time": stats.max_loop_time,
+        }
+
+
+def _prepare_batch(batch: list[_PipelineItem]) -> tuple[list[Any], float]:
+    """Prepare a batch of work in a worker thread.
+
+    Returns:
+        The results of each item & the time taken.
+    """
+    started = time.perf_counter()
+    results: list[Any] = []
+
+    for prepare, _dispatch in batch:
+        try:
+            results.append(prepare())
+        except Exception:
+            _LOGGER.exception("failed to prepare activity")
+            results.append(_FAILED)
+
+    return results, time.perf_counter() - started
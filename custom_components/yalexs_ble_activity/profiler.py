@@ -0,0 +1,211 @@
+"""Activity profiling for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+import cProfile
+from dataclasses import dataclass
+import datetime as dt
+import logging
+from pathlib import Path
+import pstats
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN, PROFILE_POLL_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+_INTEGRATION_DIR = str(Path(__file__).parent)
+
+HOT_PATH = (
+    "_async_activity_update",
+    "_record_activity",
+    "_flush_pending_update",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class ProfiledFunction:
+    """Profiling statistics for a single function of the integration."""
+
+    function: str
+    calls: int
+    total_time: float
+    cumulative_time: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for a service response.
+
+        Returns:
+            The function statistics.
+        """
+        return {
+            "function": self.function,
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "cumulative_time": self.cumulative_time,
+        }
+
+
+class ActivityProfiler:
+    """Profile the processing of activity on demand.
+
+    Nothing is installed while a profile is not running, so processing
+    activity has no added cost. While running, all threads are profiled so
+    that work done in the executor is included, but only functions of this
+    integration are summarized.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is running."""
+        return self._lock.locked()
+
+    async def async_profile(
+        self,
+        duration: float,
+        activities: int | None,
+        top: int,
+    ) -> dict[str, Any]:
+        """Profile activity for a duration or number of activities.
+
+        Args:
+            duration: The maximum number of seconds to profile.
+            activities: The number of activities after which to stop.
+            top: The number of functions to include in the summary.
+
+        Returns:
+            The location of the written files & a summary.
+        """
+        async with self._lock:
+            received = self._received()
+            started = time.perf_counter()
+            profiler = cProfile.Profile()
+            done = asyncio.Event()
+
+            @callback
+            def _async_check_activities(now: dt.datetime) -> None:  # noqa: ARG001
+                if activities is not None and self._received() - received >= activities:
+                    done.set()
+
+            _LOGGER.info("profiling activity for up to %ss", duration)
+
+            cancel = async_track_time_interval(
+                self.hass,
+                _async_check_activities,
+                PROFILE_POLL_INTERVAL,
+                name="yalexs_ble_activity profile",
+                cancel_on_shutdown=True,
+            )
+            profiler.enable()
+            try:
+                with suppress(TimeoutError):
+                    async with asyncio.timeout(duration):
+                        await done.wait()
+            finally:
+                profiler.disable()
+                cancel()
+
+            elapsed = time.perf_counter() - started
+            profiled = self._received() - received
+            path = Path(self.hass.config.path(f"{DOMAIN}_profile_{int(time.time())}"))
+
+            functions = await self.hass.async_add_executor_job(
+                _write_profile, profiler, path, profiled, elapsed, top
+            )
+
+        return {
+            "activities": profiled,
+            "duration": elapsed,
+            "stats": str(path.with_suffix(".prof")),
+            "summary": str(path.with_suffix(".txt")),
+            "functions": [function.as_dict() for function in functions],
+        }
+
+    def _received(self) -> int:
+        return sum(
+            log.received
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED
+            for log in entry.runtime_data.locks.values()
+        )
+
+
+def _write_profile(
+    profiler: cProfile.Profile,
+    path: Path,
+    activities: int,
+    duration: float,
+    top: int,
+) -> list[ProfiledFunction]:
+    """Write profile stats & a summary; this runs in a worker thread.
+
+    Returns:
+        The functions of the integration with the most cumulative time.
+    """
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(path.with_suffix(".prof"))
+
+    functions = sorted(
+        (
+            ProfiledFunction(
+                function=f"{Path(filename).stem}:{line}({name})",
+                calls=calls,
+                total_time=total_time,
+                cumulative_time=cumulative_time,
+            )
+            for (filename, line, name), (
+                _primitive_calls,
+                calls,
+                total_time,
+                cumulative_time,
+                _callers,
+            ) in stats.stats.items()  # type: ignore[attr-defined]
+            if filename.startswith(_INTEGRATION_DIR)
+        ),
+        key=lambda function: function.cumulative_time,
+        reverse=True,
+    )
+
+    hot_path = {
+        name: function
+        for function in functions
+        for name in HOT_PATH
+        if function.function.endswith(f"({name})")
+    }
+
+    lines = [
+        f"Profiled {activities} activities in {duration:.3f}s",
+        "",
+        "Hot path:",
+        *(
+            f"  {name}: not called"
+            if (function := hot_path.get(name)) is None
+            else f"  {name}: {function.calls} calls, "
+            f"{function.cumulative_time:.6f}s cumulative"
+            for name in HOT_PATH
+        ),
+        "",
+        f"Top {top} functions by cumulative time:",
+        f"  {'cumtime':>10} {'tottime':>10} {'calls':>8}  function",
+        *(
+            f"  {function.cumulative_time:10.6f} {function.total_time:10.6f} "
+            f"{function.calls:8d}  {function.function}"
+            for function in functions[:top]
+        ),
+    ]
+
+    path.with_suffix(".txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return functions[:top]
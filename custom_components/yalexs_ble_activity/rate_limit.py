@@ -0,0 +1,114 @@
+"""Activity rate limiting for Yale Access Bluetooth Activity."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime as dt
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.issue_registry import (
+    IssueSeverity,
+    async_create_issue,
+    async_delete_issue,
+)
+from yalexs_ble import DoorActivity, LockActivity
+
+from .const import DOMAIN
+
+
+@dataclass(slots=True)
+class SuppressedActivity:
+    """Activity collapsed while a lock exceeded its rate limit."""
+
+    latest: DoorActivity | LockActivity
+    since: dt.datetime
+    count: int = 1
+
+
+class ActivityRateLimiter:
+    """Limit the rate of activity processed for a single lock.
+
+    A token bucket allows bursts of activity, i.e. the backlog of a lock, while
+    limiting sustained activity to the refill rate. Activity beyond the limit
+    is collapsed so that it can be summarized rather than silently dropped.
+    """
+
+    def __init__(self, capacity: int, rate: float) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            capacity: The number of activities allowed in a burst.
+            rate: The number of activities allowed per second once the burst
+                has been used.
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.suppressed: SuppressedActivity | None = None
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def allow(self, activity: DoorActivity | LockActivity) -> bool:
+        """Consume a token for an activity or collapse it if none remain.
+
+        Returns:
+            If the activity should be processed.
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+
+        if (suppressed := self.suppressed) is None:
+            self.suppressed = SuppressedActivity(
+                latest=activity, since=activity.timestamp
+            )
+        else:
+            suppressed.count += 1
+            suppressed.since = min(suppressed.since, activity.timestamp)
+            suppressed.latest = max(
+                suppressed.latest, activity, key=lambda item: item.timestamp
+            )
+
+        return False
+
+    def take_suppressed(self) -> SuppressedActivity | None:
+        """Take the activity collapsed since the last call.
+
+        Returns:
+            The suppressed activity, if any.
+        """
+        suppressed = self.suppressed
+        self.suppressed = None
+        return suppressed
+
+
+def create_activity_storm_issue(
+    hass: HomeAssistant,
+    entity_id: str,
+    name: str,
+) -> None:
+    """Create a repair issue for a lock that exceeded its rate limit."""
+    async_create_issue(
+        hass,
+        DOMAIN,
+        f"activity_storm_{entity_id}",
+        is_fixable=False,
+        is_persistent=False,
+        severity=IssueSeverity.WARNING,
+        translation_key="activity_storm",
+        translation_placeholders={
+            "entity_id": entity_id,
+            "name": name,
+        },
+    )
+
+
+def delete_activity_storm_issue(hass: HomeAssistant, entity_id: str) -> None:
+    """Delete the repair issue for a lock that exceeded its rate limit."""
+    async_delete_issue(hass, DOMAIN, f"activity_storm_{entity_id}")
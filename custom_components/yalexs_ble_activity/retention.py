@@ -0,0 +1,254 @@
+"""Retention policy for Yale Access Bluetooth Activity history."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import concurrent.futures
+from dataclasses import dataclass
+import datetime as dt
+import logging
+import time
+from typing import Any
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder.core import Recorder
+from homeassistant.components.recorder.db_schema import StateAttributes, States
+from homeassistant.components.recorder.tasks import RecorderTask
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import event as evt
+from homeassistant.util import dt as dt_util
+from sqlalchemy import delete, select, update
+
+from .const import RETENTION_PURGE_CHUNK_SIZE, RETENTION_PURGE_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class PurgeRun:
+    """The outcome of a single retention purge."""
+
+    finished: dt.datetime
+    purge_before: dt.datetime
+    rows_removed: int
+    chunks: int
+    duration: float
+
+
+class ActivityRetention:
+    """Purge recorded activity for the entities of a config entry.
+
+    Rows are removed in chunks by tasks that run on the recorder thread so the
+    event loop is never blocked and other recorder work can interleave between
+    chunks. Long-term statistics are not touched.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        days: int,
+        entity_ids: Callable[[], list[str]],
+    ) -> None:
+        """Initialize the retention policy."""
+        self.hass = hass
+        self.entry = entry
+        self.days = days
+        self.last_run: PurgeRun | None = None
+        self.total_rows_removed = 0
+        self._entity_ids = entity_ids
+        self._running = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Schedule periodic purges.
+
+        Returns:
+            A callback to stop scheduling purges.
+        """
+        return evt.async_track_time_interval(
+            self.hass,
+            self._async_scheduled_purge,
+            RETENTION_PURGE_INTERVAL,
+            name="yalexs_ble_activity retention purge",
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def _async_scheduled_purge(self, now: dt.datetime) -> None:  # noqa: ARG002
+        self.entry.async_create_background_task(
+            self.hass,
+            self.async_purge(),
+            f"yalexs_ble_activity retention purge {self.entry.title}",
+        )
+
+    async def async_purge(self) -> PurgeRun | None:
+        """Purge activity older than the retention period.
+
+        Returns:
+            The outcome of the purge or `None` if a purge is already running.
+        """
+        if self._running:
+            return None
+
+        self._running = True
+        started = time.monotonic()
+        purge_before = dt_util.utcnow() - dt.timedelta(days=self.days)
+        entity_ids = self._entity_ids()
+        rows_removed = 0
+        chunks = 0
+
+        try:
+            while entity_ids:
+                removed = await self._async_purge_chunk(
+                    entity_ids, purge_before.timestamp()
+                )
+                rows_removed += removed
+                chunks += 1
+
+                if removed < RETENTION_PURGE_CHUNK_SIZE:
+                    break
+        finally:
+            self._running = False
+
+        self.total_rows_removed += rows_removed
+        self.last_run = PurgeRun(
+            finished=dt_util.utcnow(),
+            purge_before=purge_before,
+            rows_removed=rows_removed,
+            chunks=chunks,
+            duration=time.monotonic() - started,
+        )
+
+        _LOGGER.debug(
+            "purged %s activity rows in %s chunk(s) (%.3fs)",
+            rows_removed,
+            chunks,
+            self.last_run.duration,
+        )
+
+        return self.last_run
+
+    async def _async_purge_chunk(
+        self, entity_ids: list[str], purge_before: float
+    ) -> int:
+        future: concurrent.futures.Future[int] = concurrent.futures.Future()
+        recorder.get_instance(self.hass).queue_task(
+            _PurgeActivityChunkTask(entity_ids, purge_before, future)
+        )
+        return await asyncio.wrap_future(future)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The retention state.
+        """
+        last_run = self.last_run
+
+        return {
+            "days": self.days,
+            "running": self._running,
+            "total_rows_removed": self.total_rows_removed,
+            "last_run": None
+            if last_run is None
+            else {
+                "finished": last_run.finished.isoformat(),
+                "purge_before": last_run.purge_before.isoformat(),
+                "rows_removed": last_run.rows_removed,
+                "chunks": last_run.chunks,
+                "duration": last_run.duration,
+            },
+        }
+
+
+@dataclass(slots=True)
+class _PurgeActivityChunkTask(RecorderTask):
+    """Recorder task to purge a single chunk of activity rows."""
+
+    entity_ids: list[str]
+    purge_before: float
+    future: concurrent.futures.Future[int]
+
+    def run(self, instance: Recorder) -> None:
+        # the purge may have been cancelled (e.g. on unload) while queued.
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            removed = _purge_activity_chunk(
+                instance, self.entity_ids, self.purge_before
+            )
+        except Exception as err:  # noqa: BLE001
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(removed)
+
+
+def _purge_activity_chunk(
+    instance: Recorder,
+    entity_ids: list[str],
+    purge_before: float,
+) -> int:
+    """Remove up to one chunk of state rows for the given entities.
+
+    Returns:
+        The number of state rows removed.
+    """
+    with session_scope(session=instance.get_session()) as session:
+        metadata_ids = [
+            metadata_id
+            for metadata_id in instance.states_meta_manager.get_many(
+                entity_ids, session, from_recorder=True
+            ).values()
+            if metadata_id is not None
+        ]
+
+        rows = session.execute(
+            select(States.state_id, States.attributes_id)
+            .where(States.metadata_id.in_(metadata_ids))
+            .where(States.last_updated_ts < purge_before)
+            .limit(RETENTION_PURGE_CHUNK_SIZE)
+        ).all()
+
+        if not rows:
+            return 0
+
+        state_ids = {row.state_id for row in rows}
+        attributes_ids = {
+            row.attributes_id for row in rows if row.attributes_id is not None
+        }
+
+        session.execute(
+            update(States)
+            .where(States.old_state_id.in_(state_ids))
+            .values(old_state_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            delete(States)
+            .where(States.state_id.in_(state_ids))
+            .execution_options(synchronize_session=False)
+        )
+        instance.states_manager.evict_purged_state_ids(state_ids)
+
+        used_attributes_ids = set(
+            session.execute(
+                select(States.attributes_id)
+                .where(States.attributes_id.in_(attributes_ids))
+                .distinct()
+            ).scalars()
+        )
+        unused_attributes_ids = attributes_ids - used_attributes_ids
+
+        session.execute(
+            delete(StateAttributes)
+            .where(StateAttributes.attributes_id.in_(unused_attributes_ids))
+            .execution_options(synchronize_session=False)
+        )
+        instance.state_attributes_manager.evict_purged(unused_attributes_ids)
+
+        return len(state_ids)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import datetime as dt
+from functools import partial
 import logging
 from typing import Any
 
@@ -10,33 +11,52 @@ from homeassistant.components import recorder
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.yalexs_ble.entity import YALEXSBLEEntity
 from homeassistant.components.yalexs_ble.models import YaleXSBLEData
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN
 from homeassistant.core import (
     CALLBACK_TYPE,
     Event,
     EventStateChangedData,
+    HassJob,
     HomeAssistant,
     State,
     callback,
 )
-from homeassistant.helpers import entity_registry as er, event as evt
+from homeassistant.helpers import event as evt
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
-from homeassistant.helpers.restore_state import (
-    ExtraStoredData,
-    RestoredExtraData,
-    RestoreEntity,
-)
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
 from homeassistant.util import dt as dt_util
 from yalexs_ble import ConnectionInfo, DoorActivity, LockActivity, LockInfo
 
+from .activity_log import LockActivityLog, ProcessedActivity
+from .archive import archive_key
 from .const import (
-    ATTR_REMOTE_TYPE,
+    ACTIVITY_RATE_LIMIT_BURST,
+    ACTIVITY_RATE_LIMIT_RATE,
+    ACTIVITY_STORM_SUMMARY_INTERVAL,
     ATTR_SLOT,
     ATTR_SOURCE,
+    ATTR_SUPPRESSED,
+    ATTR_SUPPRESSED_SINCE,
     ATTR_TIMESTAMP,
-    CONF_LOCK_ENTITIES,
+    CONF_ENTRY_WINDOW,
+    ENTRY_WINDOW_DEFAULT,
+    EVENT_ACTIVITY,
+    EVENT_ENTRY,
     OPERATION_SENSOR_WRITE_DELAY,
+    SIGNAL_ACTIVITY,
+    SIGNAL_ACTIVITY_PAYLOAD,
+)
+from .correlation import ActivityEntry, EntryCorrelator
+from .entity import async_setup_lock_entities
+from .models import YaleXSBLEActivityConfigEntry, YaleXSBLEActivityData
+from .operation import OperationExtraData, OperationState
+from .payload import ActivityPayload
+from .rate_limit import (
+    ActivityRateLimiter,
+    SuppressedActivity,
+    create_activity_storm_issue,
+    delete_activity_storm_issue,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -44,22 +64,15 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(  # noqa: RUF029
     hass: HomeAssistant,
-    entry: ConfigEntry,
+    entry: YaleXSBLEActivityConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Yale Access Bluetooth Activity sensors."""
-
-    entity_registry = er.async_get(hass)
-
-    async_add_entities(
-        YaleXSBLEOperationSensor(data)
-        for lock_enitity_id in entry.data[CONF_LOCK_ENTITIES]
-        if (
-            (lock_entry := entity_registry.async_get(lock_enitity_id))
-            and (core_entry_id := lock_entry.config_entry_id)
-            and (core_entry := hass.config_entries.async_get_known_entry(core_entry_id))
-            and (data := core_entry.runtime_data)
-        )
+    async_setup_lock_entities(
+        hass,
+        entry,
+        async_add_entities,
+        partial(YaleXSBLEOperationSensor, runtime_data=entry.runtime_data),
     )
 
 
@@ -70,14 +83,50 @@ class YaleXSBLEOperationSensor(YALEXSBLEEntity, SensorEntity, RestoreEntity):
     _attr_icon = "mdi:lock-clock"
     _pending_activity_update: DoorActivity | LockActivity | None = None
     _cancel_pending_activity_update: CALLBACK_TYPE | None = None
+    _cancel_suppressed_summary: CALLBACK_TYPE | None = None
+    _latest_activity_timestamp: dt.datetime | None = None
+    _operation: OperationState | None = None
+    _operation_attributes: dict[str, Any] | None = None
+    _operation_extra_data: OperationExtraData | None = None
 
     def __init__(
         self,
         data: YaleXSBLEData,
+        runtime_data: YaleXSBLEActivityData,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(data)
         self._attr_unique_id = f"{data.lock.address}operation"
+        self._drain = runtime_data.drain
+        self._pipeline = runtime_data.pipeline
+        self._activity_logs = runtime_data.locks
+        self._activity_log = LockActivityLog(data.lock.address)
+        self._archive = runtime_data.archive
+        self._sinks = runtime_data.sinks
+        self._archive_key = archive_key(self._attr_unique_id)
+        self._journal = runtime_data.journal
+        self._activity_signal = SIGNAL_ACTIVITY.format(address=data.lock.address)
+        self._address = data.lock.address
+        self._filters = runtime_data.filters
+        self._lock_title = data.title
+        self._correlator = EntryCorrelator(
+            dt.timedelta(
+                seconds=runtime_data.data.get(CONF_ENTRY_WINDOW, ENTRY_WINDOW_DEFAULT)
+            )
+        )
+        self._rate_limiter = ActivityRateLimiter(
+            ACTIVITY_RATE_LIMIT_BURST, ACTIVITY_RATE_LIMIT_RATE
+        )
+        self._flush_pending_update_job = HassJob(
+            self._flush_pending_update,
+            "yalexs_ble_activity flush pending update",
+            cancel_on_shutdown=True,
+        )
+        self._summarize_suppressed_job = HassJob(
+            self._summarize_suppressed,
+            "yalexs_ble_activity summarize suppressed activity",
+            cancel_on_shutdown=True,
+        )
 
     @callback
     def _async_activity_update(
@@ -87,22 +136,112 @@ class YaleXSBLEOperationSensor(YALEXSBLEEntity, SensorEntity, RestoreEntity):
         connection_info: ConnectionInfo,  # noqa: ARG002
     ) -> None:
         """Handle activity update."""
+        self._activity_log.received += 1
 
-        value, attributes = self._extract_values(activity)
+        if (
+            activity_filter := self._filters.get(self._address)
+        ) is not None and activity_filter(activity):
+            self._activity_log.filtered += 1
+            return
+
+        # backlog is deferred by the drain & processed in batches that yield
+        # to live activity, so a large backlog is never collapsed.
+        if not self._drain.async_is_backlog(
+            self._address, activity
+        ) and not self._rate_limiter.allow(activity):
+            self._activity_log.suppressed += 1
+            self._async_handle_storm()
+            return
+
+        self._drain.async_process(
+            self._address,
+            activity,
+            partial(self._async_process_activity, activity),
+        )
 
-        _LOGGER.debug("creating event for activity update")
+    @callback
+    def _async_handle_storm(self) -> None:
+        """Handle activity that exceeds the rate limit of the lock.
+
+        Collapsed activity is summarized periodically for as long as the storm
+        continues. A repair issue is raised for the duration of the storm.
+        """
+        if self._cancel_suppressed_summary is not None:
+            return
+
+        _LOGGER.warning(
+            "%s exceeded its activity rate limit; collapsing activity",
+            self.entity_id,
+        )
 
-        self.hass.bus.async_fire(
-            "yalexs_ble_activity",
-            {
-                "entity_id": self.entity_id,
-                "state": value,
-                "attributes": attributes,
-            },
+        self._activity_log.storms += 1
+        create_activity_storm_issue(self.hass, self.entity_id, self._lock_title)
+        self._cancel_suppressed_summary = evt.async_call_later(
+            self.hass,
+            ACTIVITY_STORM_SUMMARY_INTERVAL,
+            self._summarize_suppressed_job,
         )
 
-        self._record_activity(activity)
+    @callback
+    def _summarize_suppressed(self, now: dt.datetime) -> None:  # noqa: ARG002
+        if (suppressed := self._rate_limiter.take_suppressed()) is None:
+            _LOGGER.info("%s activity storm has ended", self.entity_id)
+            self._cancel_suppressed_summary = None
+            delete_activity_storm_issue(self.hass, self.entity_id)
+            return
+
+        self._cancel_suppressed_summary = evt.async_call_later(
+            self.hass,
+            ACTIVITY_STORM_SUMMARY_INTERVAL,
+            self._summarize_suppressed_job,
+        )
+        self._drain.async_process(
+            self._address,
+            suppressed.latest,
+            partial(self._async_process_activity, suppressed.latest, suppressed),
+        )
+
+    @callback
+    def _async_cancel_suppressed_summary(self) -> None:
+        if self._cancel_suppressed_summary is None:
+            return
+
+        self._cancel_suppressed_summary()
+        self._cancel_suppressed_summary = None
+        delete_activity_storm_issue(self.hass, self.entity_id)
+
+    @callback
+    def _async_cancel_pending_update(self) -> None:
+        """Cancel writing pending activity; it remains in the journal."""
+        if self._cancel_pending_activity_update is None:
+            return
+
+        self._cancel_pending_activity_update()
+        self._cancel_pending_activity_update = None
+
+    @callback
+    def _async_process_activity(
+        self,
+        activity: DoorActivity | LockActivity,
+        suppressed: SuppressedActivity | None = None,
+    ) -> None:
+        self._pipeline.async_enqueue(
+            partial(self._prepare_activity, activity, suppressed),
+            partial(self._async_dispatch_activity, self._correlator.process(activity)),
+        )
+
+        # backlog may be processed after more recent live activity while the
+        # lock drains. it is still recorded, but must not replace the state.
+        if (
+            latest := self._latest_activity_timestamp
+        ) is not None and activity.timestamp < latest:
+            return
+
+        self._latest_activity_timestamp = activity.timestamp
         self._pending_activity_update = activity
+        self._activity_log.pending = activity
+        self._activity_log.timer_armed = True
+        self._journal.async_append(self._archive_key, activity)
 
         if self._cancel_pending_activity_update:
             self._cancel_pending_activity_update()
@@ -110,11 +249,80 @@ class YaleXSBLEOperationSensor(YALEXSBLEEntity, SensorEntity, RestoreEntity):
         self._cancel_pending_activity_update = evt.async_call_later(
             self.hass,
             OPERATION_SENSOR_WRITE_DELAY,
-            self._flush_pending_update,
+            self._flush_pending_update_job,
         )
 
-    def _record_activity(self, activity: DoorActivity | LockActivity) -> None:
+    def _prepare_activity(
+        self,
+        activity: DoorActivity | LockActivity,
+        suppressed: SuppressedActivity | None,
+    ) -> tuple[str | None, dict[str, Any], ActivityPayload]:
+        """Prepare activity; this runs in a worker thread.
+
+        Activity that summarizes collapsed activity includes the number of
+        activities it represents & when the first of them occurred.
+
+        Returns:
+            The value, attributes & event payload of the activity.
+        """
         native_value, attributes = self._extract_values(activity)
+
+        if suppressed is not None:
+            attributes[ATTR_SUPPRESSED] = suppressed.count
+            attributes[ATTR_SUPPRESSED_SINCE] = suppressed.since
+
+        self._record_activity(activity, native_value, attributes)
+        return (
+            native_value,
+            attributes,
+            ActivityPayload.build(self.entity_id, native_value, attributes),
+        )
+
+    @callback
+    def _async_dispatch_activity(
+        self,
+        activity_entry: ActivityEntry | None,
+        values: tuple[str | None, dict[str, Any], ActivityPayload],
+    ) -> None:
+        value, attributes, payload = values
+
+        # unsupported activity has no timestamp to order it in the history.
+        if ATTR_TIMESTAMP in attributes:
+            self._activity_log.append(
+                ProcessedActivity.from_values(dt_util.utcnow(), value, attributes)
+            )
+
+        _LOGGER.debug("creating event for activity update")
+
+        self.hass.bus.async_fire(EVENT_ACTIVITY, payload.data)
+        self._activity_log.events_fired += 1
+        async_dispatcher_send(self.hass, SIGNAL_ACTIVITY_PAYLOAD, payload)
+
+        for forwarder in self._sinks:
+            forwarder.async_append(payload.serialized)
+
+        if activity_entry is not None:
+            self.hass.bus.async_fire(
+                EVENT_ENTRY, {"entity_id": self.entity_id, **activity_entry.as_dict()}
+            )
+
+        async_dispatcher_send(self.hass, self._activity_signal, value, attributes)
+
+        if self._archive is not None and value is not None:
+            self._archive.async_append(
+                self._archive_key,
+                attributes[ATTR_TIMESTAMP],
+                value,
+                attributes.get(ATTR_SOURCE),
+                attributes.get(ATTR_SLOT),
+            )
+
+    def _record_activity(
+        self,
+        activity: DoorActivity | LockActivity,
+        native_value: str | None,
+        attributes: dict[str, Any],
+    ) -> None:
         state_changed_data: EventStateChangedData = {
             "entity_id": self.entity_id,
             "old_state": None,
@@ -133,6 +341,7 @@ class YaleXSBLEOperationSensor(YALEXSBLEEntity, SensorEntity, RestoreEntity):
 
         instance = recorder.get_instance(self.hass)
         instance.queue_task(Event(str(EVENT_STATE_CHANGED), state_changed_data))
+        self._activity_log.recorder_submissions += 1
 
     @callback
     def _flush_pending_update(self, now: dt.datetime) -> None:  # noqa: ARG002
@@ -141,41 +350,47 @@ class YaleXSBLEOperationSensor(YALEXSBLEEntity, SensorEntity, RestoreEntity):
 
         _LOGGER.debug("flushing pending activity update")
 
-        self._attr_native_value, self._attr_extra_state_attributes = (
-            self._extract_values(activity)
-        )
+        self._set_operation(activity)
         self._pending_activity_update = None
+        self._cancel_pending_activity_update = None
+        self._activity_log.pending = None
+        self._activity_log.timer_armed = False
+        self._journal.async_append(self._archive_key, None)
 
         self.async_write_ha_state()
+        self._activity_log.states_written += 1
+
+    def _set_operation(self, activity: DoorActivity | LockActivity) -> None:
+        operation = OperationState.from_activity(activity)
+        self._replace_operation(operation)
+
+        if operation.value is not None:
+            self._activity_log.latest = operation.processed(dt_util.utcnow())
+
+    def _replace_operation(self, operation: OperationState | None) -> None:
+        # attributes & restore data are built once for each operation.
+        self._operation = operation
+        self._operation_attributes = None
+        self._operation_extra_data = None
 
     @staticmethod
     def _extract_values(
         activity: DoorActivity | LockActivity,
     ) -> tuple[str | None, dict[str, Any]]:
-        value: str | None = None
-        attributes: dict[str, Any] = {}
-
-        if isinstance(activity, DoorActivity):
-            value = f"door_{activity.status.name.lower()}"
-            attributes[ATTR_TIMESTAMP] = activity.timestamp
-        elif isinstance(activity, LockActivity):
-            value = f"lock_{activity.status.name.lower()}"
-            attributes[ATTR_TIMESTAMP] = activity.timestamp
-            attributes[ATTR_SOURCE] = activity.source.name.lower()
-            if activity.remote_type is not None:
-                attributes[ATTR_REMOTE_TYPE] = activity.remote_type.name.lower()
-            if activity.slot is not None:
-                attributes[ATTR_SLOT] = activity.slot
-
-        return (value, attributes)
+        operation = OperationState.from_activity(activity)
+        return (operation.value, operation.attributes)
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks, perform initial updates & restore state."""
         await super().async_added_to_hass()
 
+        self._activity_logs[self.entity_id] = self._activity_log
+        self.async_on_remove(partial(self._activity_logs.pop, self.entity_id, None))
+        self.async_on_remove(self._async_cancel_suppressed_summary)
+        self.async_on_remove(self._async_cancel_pending_update)
         self.async_on_remove(
-            self._device.register_activity_callback(
-                self._async_activity_update, request_update=True
+            self._drain.async_schedule(
+                self._address, self._async_register_activity_callback
             )
         )
 
@@ -184,15 +399,47 @@ class YaleXSBLEOperationSensor(YALEXSBLEEntity, SensorEntity, RestoreEntity):
             and last_state.state not in {STATE_UNKNOWN, STATE_UNAVAILABLE}
             and (extra_data := await self.async_get_last_extra_data()) is not None
         ):
-            extra_data_dict = extra_data.as_dict()
-            self._attr_native_value = extra_data_dict["value"]
-            self._attr_extra_state_attributes = extra_data_dict["attributes"]
+            self._replace_operation(OperationState.from_dict(extra_data.as_dict()))
+
+        # activity that was still pending when home assistant stopped or the
+        # entry unloaded was journaled, but never written as the state. live
+        # activity that arrived in the meantime is more recent.
+        if (
+            activity := self._journal.async_take_restored(self._archive_key)
+        ) is not None and self._latest_activity_timestamp is None:
+            _LOGGER.debug("replaying journaled activity update")
+
+            self._latest_activity_timestamp = activity.timestamp
+            self._set_operation(activity)
+            self._journal.async_append(self._archive_key, None)
+
+    @callback
+    def _async_register_activity_callback(
+        self, *, request_update: bool
+    ) -> CALLBACK_TYPE:
+        return self._device.register_activity_callback(
+            self._async_activity_update, request_update=request_update
+        )
+
+    @property
+    def native_value(self) -> str | None:
+        """The last operation of the door or lock."""
+        return None if self._operation is None else self._operation.value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """The details of the last operation."""
+        if self._operation is None:
+            return None
+
+        if self._operation_attributes is None:
+            self._operation_attributes = self._operation.attributes
+
+        return self._operation_attributes
 
     @property
     def extra_restore_state_data(self) -> ExtraStoredData | None:
-        return RestoredExtraData(
-            {
-                "value": self._attr_native_value,
-                "attributes": self._attr_extra_state_attributes,
-            }
-        )
+        if self._operation_extra_data is None:
+            self._operation_extra_data = OperationExtraData(self._operation)
+
+        return self._operation_extra_data
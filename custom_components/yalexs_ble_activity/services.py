@@ -0,0 +1,370 @@
+"""Services for the Yale Access Bluetooth Activity integration."""
+
+from __future__ import annotations
+
+import datetime as dt
+from functools import partial
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .activity_log import LockActivityLog
+from .archive import ActivityArchive, archive_key, summarize
+from .audit import ActivityAudit
+from .const import (
+    DOMAIN,
+    PROFILE_DEFAULT_DURATION,
+    PROFILE_DEFAULT_TOP,
+    TIMELINE_PAGE_MAX,
+    TIMELINE_PAGE_SIZE,
+)
+from .profiler import ActivityProfiler
+from .timeline import InvalidCursorError, timeline_page
+
+ATTR_ACTIVITIES = "activities"
+ATTR_CURSOR = "cursor"
+ATTR_DURATION = "duration"
+ATTR_END = "end"
+ATTR_LIMIT = "limit"
+ATTR_START = "start"
+ATTR_TOP = "top"
+
+SERVICE_ARCHIVE_SUMMARY = "archive_summary"
+SERVICE_AUDIT = "audit"
+SERVICE_GET_LATEST = "get_latest"
+SERVICE_GET_TIMELINE = "get_timeline"
+SERVICE_PROFILE = "profile"
+
+ARCHIVE_SUMMARY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+AUDIT_SCHEMA = vol.Schema({})
+
+GET_LATEST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+GET_TIMELINE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_LIMIT, default=TIMELINE_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=TIMELINE_PAGE_MAX)
+        ),
+        vol.Optional(ATTR_CURSOR): cv.string,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=PROFILE_DEFAULT_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False, max=3600)
+        ),
+        vol.Optional(ATTR_ACTIVITIES): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_TOP, default=PROFILE_DEFAULT_TOP): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the services for the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ARCHIVE_SUMMARY,
+        partial(_async_archive_summary, hass),
+        schema=ARCHIVE_SUMMARY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_AUDIT,
+        partial(_async_audit, hass),
+        schema=AUDIT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_LATEST,
+        partial(_async_get_latest, hass),
+        schema=GET_LATEST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TIMELINE,
+        partial(_async_get_timeline, hass),
+        schema=GET_TIMELINE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        partial(_async_profile, ActivityProfiler(hass)),
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_archive_summary(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Summarize the archived activity of locks.
+
+    Returns:
+        The summary.
+
+    Raises:
+        ServiceValidationError: If no entries archive activity or an entity is
+            not an operation sensor.
+    """
+    archives: list[ActivityArchive] = [
+        archive
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and (archive := entry.runtime_data.archive) is not None
+    ]
+
+    if not archives:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="archive_not_configured",
+        )
+
+    keys: list[str] | None = None
+
+    if (entity_ids := call.data.get(ATTR_ENTITY_ID)) is not None:
+        keys = [_async_archive_key(hass, entity_id) for entity_id in entity_ids]
+
+    for archive in archives:
+        await archive.async_flush()
+
+    summary = await hass.async_add_executor_job(
+        summarize,
+        archives[0].path,
+        keys,
+        _timestamp(call.data.get(ATTR_START)),
+        _timestamp(call.data.get(ATTR_END)),
+        dt_util.get_default_time_zone(),
+    )
+
+    return summary.as_dict()
+
+
+async def _async_audit(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:  # noqa: ARG001
+    """Audit recorded activity against the archive.
+
+    Returns:
+        The outcome of the audit for each lock.
+
+    Raises:
+        ServiceValidationError: If no entries audit activity or an audit is
+            already running.
+    """
+    audits: list[ActivityAudit] = [
+        audit
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and (audit := entry.runtime_data.audit) is not None
+    ]
+
+    if not audits:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="audit_not_configured",
+        )
+
+    locks: dict[str, Any] = {}
+
+    for audit in audits:
+        if (run := await audit.async_audit()) is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="audit_in_progress",
+            )
+
+        locks.update(run.as_dict()["locks"])
+
+    return {"locks": locks}
+
+
+@callback
+def _async_get_latest(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Get the latest activity of locks.
+
+    The latest activity is kept in memory for each lock as its sensor is
+    updated, so no history is read.
+
+    Returns:
+        The latest activity & processing state of each lock.
+    """
+    logs = _async_activity_logs(hass, call.data.get(ATTR_ENTITY_ID))
+
+    return {
+        "locks": {entity_id: _latest(log) for entity_id, log in logs.items()},
+    }
+
+
+@callback
+def _async_get_timeline(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Get a page of the activity of locks, newest first.
+
+    Returns:
+        The activities of the page & the cursor of the next page.
+
+    Raises:
+        ServiceValidationError: If an entity is not an operation sensor or the
+            cursor is invalid.
+    """
+    logs = _async_activity_logs(hass, call.data.get(ATTR_ENTITY_ID))
+
+    try:
+        page = timeline_page(
+            {entity_id: log.timeline for entity_id, log in logs.items()},
+            call.data[ATTR_LIMIT],
+            call.data.get(ATTR_CURSOR),
+        )
+    except InvalidCursorError as err:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_cursor",
+            translation_placeholders={"cursor": call.data[ATTR_CURSOR]},
+        ) from err
+
+    return page.as_dict()
+
+
+async def _async_profile(
+    profiler: ActivityProfiler, call: ServiceCall
+) -> ServiceResponse:
+    """Profile the processing of activity.
+
+    Returns:
+        The location of the written files & a summary.
+
+    Raises:
+        ServiceValidationError: If a profile is already running.
+    """
+    if profiler.running:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="profile_in_progress",
+        )
+
+    return await profiler.async_profile(
+        call.data[ATTR_DURATION],
+        call.data.get(ATTR_ACTIVITIES),
+        call.data[ATTR_TOP],
+    )
+
+
+@callback
+def _async_activity_logs(
+    hass: HomeAssistant,
+    entity_ids: list[str] | None,
+) -> dict[str, LockActivityLog]:
+    """Get the activity logs of locks.
+
+    Args:
+        hass: The Home Assistant instance.
+        entity_ids: The operation sensors of the locks; all locks when `None`.
+
+    Returns:
+        The activity logs keyed by entity ID.
+
+    Raises:
+        ServiceValidationError: If an entity is not an operation sensor.
+    """
+    logs: dict[str, LockActivityLog] = {
+        entity_id: log
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        for entity_id, log in entry.runtime_data.locks.items()
+    }
+
+    if entity_ids is None:
+        return logs
+
+    for entity_id in entity_ids:
+        if entity_id not in logs:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="invalid_entity",
+                translation_placeholders={"entity_id": entity_id},
+            )
+
+    return {entity_id: logs[entity_id] for entity_id in entity_ids}
+
+
+@callback
+def _async_archive_key(hass: HomeAssistant, entity_id: str) -> str:
+    """Get the archive key for an operation sensor.
+
+    Returns:
+        The archive key.
+
+    Raises:
+        ServiceValidationError: If the entity is not an operation sensor.
+    """
+    if (
+        (entity_entry := er.async_get(hass).async_get(entity_id)) is None
+        or entity_entry.platform != DOMAIN
+        or entity_entry.domain != Platform.SENSOR
+    ):
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_entity",
+            translation_placeholders={"entity_id": entity_id},
+        )
+
+    return archive_key(entity_entry.unique_id)
+
+
+def _latest(log: LockActivityLog) -> dict[str, Any]:
+    latest = log.latest
+
+    return {
+        "activity": None
+        if latest is None
+        else {
+            "state": latest.state,
+            "timestamp": latest.timestamp.isoformat(),
+            "source": latest.source,
+            "remote_type": latest.remote_type,
+            "slot": latest.slot,
+            "processed_at": None
+            if latest.processed_at is None
+            else latest.processed_at.isoformat(),
+        },
+        "pending": log.pending is not None,
+        "received": log.received,
+        "events_fired": log.events_fired,
+        "states_written": log.states_written,
+    }
+
+
+def _timestamp(value: dt.datetime | None) -> int | None:
+    if value is None:
+        return None
+
+    return int(dt_util.as_utc(value).timestamp())
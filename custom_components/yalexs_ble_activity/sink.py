@@ -0,0 +1,371 @@
+"""Batched forwarding of activity to external sinks for Yale Access Bluetooth Activity.
+
+Activity is forwarded to an HTTP endpoint or an MQTT topic in batches rather
+than one request per activity. Batches are posted through the shared Home
+Assistant client session, which keeps connections to the endpoint alive
+between batches, or published through the connection of the MQTT
+integration.
+
+Each activity is buffered as its pre-serialized payload. The buffer is bounded;
+the oldest activity beyond it is spilled to segment files on disk & sent
+before buffered activity. Batches that fail are retried with exponential
+backoff. Activity that's still buffered when the entry unloads or Home
+Assistant stops is spilled, so it's sent once the entry is set up again.
+Once the spill is full, newly spilled activity is dropped. Delivery is at
+least once & activity spilled while a batch is being retried may be delivered
+ahead of it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+import datetime as dt
+import logging
+from pathlib import Path
+from typing import Any, Protocol
+
+import aiohttp
+from homeassistant.components import mqtt
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONTENT_TYPE_JSON, EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HassJob, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import event as evt
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    CONF_SINK_TOPIC,
+    CONF_SINK_URL,
+    DOMAIN,
+    SINK_BATCH_DELAY,
+    SINK_BATCH_SIZE,
+    SINK_BUFFER_SIZE,
+    SINK_RETRY_MAX,
+    SINK_RETRY_MIN,
+    SINK_SPILL_SEGMENTS,
+    SINK_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_SEGMENT_SUFFIX = ".jsonl"
+
+
+class SinkError(Exception):
+    """A batch of activity could not be sent to a sink."""
+
+
+@dataclass(slots=True, frozen=True)
+class SpilledSegment:
+    """A batch of activity spilled to disk."""
+
+    path: Path
+    size: int
+    written: asyncio.Future[None]
+
+
+class ActivitySink(Protocol):
+    """A destination for batches of activity."""
+
+    name: str
+
+    async def async_send(self, body: bytes) -> None:
+        """Send a serialized batch of activity.
+
+        Raises:
+            SinkError: If the batch could not be sent.
+        """
+
+
+class HttpActivitySink:
+    """Post batches of activity to an HTTP endpoint."""
+
+    name = "http"
+
+    def __init__(self, hass: HomeAssistant, url: str) -> None:
+        """Initialize the sink."""
+        self.url = url
+        self._session = async_get_clientsession(hass)
+
+    async def async_send(self, body: bytes) -> None:
+        """Post a serialized batch of activity.
+
+        Raises:
+            SinkError: If the batch could not be posted.
+        """
+        try:
+            async with self._session.post(
+                self.url,
+                data=body,
+                headers={aiohttp.hdrs.CONTENT_TYPE: CONTENT_TYPE_JSON},
+                timeout=aiohttp.ClientTimeout(total=SINK_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise SinkError(repr(err)) from err
+
+
+class MqttActivitySink:
+    """Publish batches of activity to an MQTT topic."""
+
+    name = "mqtt"
+
+    def __init__(self, hass: HomeAssistant, topic: str) -> None:
+        """Initialize the sink."""
+        self.hass = hass
+        self.topic = topic
+
+    async def async_send(self, body: bytes) -> None:
+        """Publish a serialized batch of activity.
+
+        Raises:
+            SinkError: If the batch could not be published.
+        """
+        try:
+            await mqtt.async_publish(self.hass, self.topic, body, qos=1)
+        except HomeAssistantError as err:
+            raise SinkError(repr(err)) from err
+
+
+class ActivityForwarder:
+    """Forward the activity of the locks of a config entry to a sink."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        sink: ActivitySink,
+    ) -> None:
+        """Initialize the forwarder."""
+        self.hass = hass
+        self.entry = entry
+        self.sink = sink
+        self.path = Path(hass.config.path(DOMAIN, "sink", entry.entry_id, sink.name))
+        self.sent = 0
+        self.batches = 0
+        self.failures = 0
+        self.spilled = 0
+        self.dropped = 0
+        self._attempts = 0
+        self._next_segment = 0
+        self._buffer: deque[bytes] = deque()
+        self._segments: deque[SpilledSegment] = deque()
+        self._send_task: asyncio.Task[None] | None = None
+        self._cancel_send: CALLBACK_TYPE | None = None
+        self._send_job = HassJob(
+            self._async_start_send,
+            "yalexs_ble_activity sink send",
+            cancel_on_shutdown=True,
+        )
+
+    async def async_start(self) -> CALLBACK_TYPE:
+        """Load activity spilled before the entry was last unloaded.
+
+        Returns:
+            A callback to stop spilling activity at shutdown.
+        """
+        for path, size in await self.hass.async_add_executor_job(
+            _load_segments, self.path
+        ):
+            written = self.hass.loop.create_future()
+            written.set_result(None)
+            self._segments.append(SpilledSegment(path, size, written))
+            self._next_segment = int(path.stem) + 1
+
+        if self._segments:
+            self._async_schedule_send(0)
+
+        return self.hass.bus.async_listen(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
+
+    @callback
+    def async_append(self, serialized: bytes) -> None:
+        """Buffer the serialized payload of an activity to be forwarded."""
+        self._buffer.append(serialized)
+
+        if len(self._buffer) > SINK_BUFFER_SIZE:
+            self._async_spill(SINK_BATCH_SIZE)
+
+        self._async_schedule_send(SINK_BATCH_DELAY)
+
+    async def async_stop(self) -> None:
+        """Stop sending & spill buffered activity to disk."""
+        if self._send_task is not None:
+            await self._send_task
+
+        if self._cancel_send is not None:
+            self._cancel_send()
+            self._cancel_send = None
+
+        await self._async_spill_all()
+
+    async def _async_final_write(self, event: Event) -> None:  # noqa: ARG002
+        await self._async_spill_all()
+
+    async def _async_spill_all(self) -> None:
+        while self._buffer:
+            self._async_spill(SINK_BATCH_SIZE)
+
+        await asyncio.gather(*(segment.written for segment in self._segments))
+
+    @callback
+    def _async_spill(self, count: int) -> None:
+        lines = [self._buffer.popleft() for _ in range(min(count, len(self._buffer)))]
+
+        # the newest activity is dropped once the spill is full, so spilled
+        # segments are only ever removed once they've been sent.
+        if len(self._segments) >= SINK_SPILL_SEGMENTS:
+            self.dropped += len(lines)
+            _LOGGER.warning(
+                "%s sink spill is full; dropped %s activities",
+                self.sink.name,
+                len(lines),
+            )
+            return
+
+        path = self.path / f"{self._next_segment:012}{_SEGMENT_SUFFIX}"
+        self._next_segment += 1
+        self._segments.append(
+            SpilledSegment(
+                path,
+                len(lines),
+                self.hass.async_add_executor_job(_write_segment, path, lines),
+            )
+        )
+        self.spilled += len(lines)
+
+    @callback
+    def _async_schedule_send(self, delay: float) -> None:
+        if self._send_task is not None or self._cancel_send is not None:
+            return
+
+        self._cancel_send = evt.async_call_later(self.hass, delay, self._send_job)
+
+    @callback
+    def _async_start_send(self, now: dt.datetime) -> None:  # noqa: ARG002
+        self._cancel_send = None
+        self._send_task = self.entry.async_create_task(
+            self.hass, self._async_send(), f"yalexs_ble_activity {self.sink.name} sink"
+        )
+
+    async def _async_send(self) -> None:
+        retry: float | None = None
+
+        try:
+            while self._segments or self._buffer:
+                segment: SpilledSegment | None = None
+
+                if self._segments:
+                    segment = self._segments[0]
+                    await segment.written
+                    lines = await self.hass.async_add_executor_job(
+                        _read_segment, segment.path
+                    )
+                else:
+                    count = min(SINK_BATCH_SIZE, len(self._buffer))
+                    lines = [self._buffer.popleft() for _ in range(count)]
+
+                try:
+                    await self.sink.async_send(_batch_body(lines))
+                # any failure is retried so the batch that was taken isn't lost.
+                except Exception as err:  # noqa: BLE001
+                    self.failures += 1
+                    self._attempts += 1
+                    retry = min(
+                        SINK_RETRY_MIN * 2 ** (self._attempts - 1), SINK_RETRY_MAX
+                    )
+
+                    if segment is None:
+                        self._buffer.extendleft(reversed(lines))
+
+                    _LOGGER.warning(
+                        "failed to send %s activities to %s sink, retrying in %ss: %s",
+                        len(lines),
+                        self.sink.name,
+                        retry,
+                        err,
+                    )
+                    return
+
+                if segment is not None:
+                    self._segments.popleft()
+                    await self.hass.async_add_executor_job(segment.path.unlink)
+
+                self._attempts = 0
+                self.sent += len(lines)
+                self.batches += 1
+        finally:
+            self._send_task = None
+
+            if retry is not None:
+                self._async_schedule_send(retry)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for diagnostics.
+
+        Returns:
+            The forwarder state.
+        """
+        return {
+            "buffered": len(self._buffer),
+            "spilled_pending": sum(segment.size for segment in self._segments),
+            "sent": self.sent,
+            "batches": self.batches,
+            "failures": self.failures,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+        }
+
+
+@callback
+def async_create_forwarders(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+) -> list[ActivityForwarder]:
+    """Create forwarders for the sinks configured for an entry.
+
+    Returns:
+        The forwarders.
+    """
+    sinks: list[ActivitySink] = []
+
+    if url := entry.data.get(CONF_SINK_URL):
+        sinks.append(HttpActivitySink(hass, url))
+
+    if topic := entry.data.get(CONF_SINK_TOPIC):
+        sinks.append(MqttActivitySink(hass, topic))
+
+    return [ActivityForwarder(hass, entry, sink) for sink in sinks]
+
+
+def _batch_body(lines: Iterable[bytes]) -> bytes:
+    return b'{"activities":[%s]}' % b",".join(lines)
+
+
+def _load_segments(path: Path) -> list[tuple[Path, int]]:
+    """Find spilled segments, oldest first.
+
+    Returns:
+        The path & number of activities of each segment.
+    """
+    if not path.is_dir():
+        return []
+
+    return [
+        (segment, len(_read_segment(segment)))
+        for segment in sorted(path.glob(f"*{_SEGMENT_SUFFIX}"))
+    ]
+
+
+def _read_segment(path: Path) -> list[bytes]:
+    with path.open("rb") as file:
+        return [line.rstrip(b"\n") for line in file if line.strip()]
+
+
+def _write_segment(path: Path, lines: list[bytes]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"".join(line + b"\n" for line in lines))
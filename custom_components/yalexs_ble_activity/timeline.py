@@ -0,0 +1,147 @@
+"""Site-wide activity timeline for Yale Access Bluetooth Activity.
+
+Each lock keeps its recent activity in chronological order as it's
+processed, inserting backfilled activity in place. The timeline of a site is
+a k-way merge of the timelines of its locks, newest first. A page starts at
+its cursor, found in each lock's timeline with a binary search, and the merge
+stops once the page is full, so pages are served in time proportional to the
+page & the number of locks rather than by sorting all of the history.
+
+Activity is ordered by its timestamp, then by the entity ID of its lock &
+its state. A cursor is the position of the last activity of a page in that
+order, so it stays valid after a restart & even once that activity is no
+longer kept.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+import heapq
+from itertools import islice
+import math
+from operator import itemgetter
+from typing import Any
+
+from .activity_log import LockTimeline, ProcessedActivity, TimelineKey
+
+type TimelineCursor = tuple[float, str, str]
+
+
+class InvalidCursorError(ValueError):
+    """A timeline cursor could not be read."""
+
+
+@dataclass(slots=True, frozen=True)
+class TimelinePage:
+    """A page of the activity of many locks, newest first."""
+
+    activities: list[tuple[str, ProcessedActivity]]
+    cursor: str | None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation for a service response.
+
+        Returns:
+            The activities of the page & the cursor of the next page.
+        """
+        return {
+            "activities": [
+                {
+                    "entity_id": entity_id,
+                    "state": activity.state,
+                    "timestamp": activity.timestamp.isoformat(),
+                    "source": activity.source,
+                    "remote_type": activity.remote_type,
+                    "slot": activity.slot,
+                }
+                for entity_id, activity in self.activities
+            ],
+            "cursor": self.cursor,
+        }
+
+
+def timeline_page(
+    timelines: Mapping[str, LockTimeline],
+    limit: int,
+    cursor: str | None = None,
+) -> TimelinePage:
+    """Get a page of the merged timeline of locks.
+
+    Args:
+        timelines: The timelines of the locks keyed by entity ID.
+        limit: The maximum number of activities in the page.
+        cursor: The cursor of the page; the newest activity when `None`.
+
+    Returns:
+        The page.
+    """
+    after = None if cursor is None else _decode_cursor(cursor)
+    merged = heapq.merge(
+        *(
+            _entries(
+                entity_id,
+                timeline,
+                None if after is None else _lock_key(entity_id, after),
+            )
+            for entity_id, timeline in timelines.items()
+        ),
+        key=itemgetter(0),
+        reverse=True,
+    )
+    entries = list(islice(merged, limit + 1))
+
+    return TimelinePage(
+        activities=[
+            (entity_id, activity) for _, entity_id, activity in entries[:limit]
+        ],
+        cursor=_encode_cursor(entries[limit - 1][0]) if len(entries) > limit else None,
+    )
+
+
+def _entries(
+    entity_id: str,
+    timeline: LockTimeline,
+    before: TimelineKey | None,
+) -> Iterator[tuple[TimelineCursor, str, ProcessedActivity]]:
+    for (timestamp, state), activity in timeline.before(before):
+        yield (timestamp, entity_id, state), entity_id, activity
+
+
+def _lock_key(entity_id: str, cursor: TimelineCursor) -> TimelineKey:
+    """Get the key in the timeline of a lock that a page starts before.
+
+    Returns:
+        The key.
+    """
+    timestamp, cursor_entity_id, state = cursor
+
+    # activity of other locks at the time of the cursor is in the following
+    # pages when their entity ID sorts before the cursor's.
+    if entity_id < cursor_entity_id:
+        return (math.nextafter(timestamp, math.inf), "")
+    if entity_id > cursor_entity_id:
+        return (timestamp, "")
+
+    return (timestamp, state)
+
+
+def _encode_cursor(cursor: TimelineCursor) -> str:
+    timestamp, entity_id, state = cursor
+    return f"{timestamp!r}:{entity_id}:{state}"
+
+
+def _decode_cursor(cursor: str) -> TimelineCursor:
+    """Read a cursor.
+
+    Returns:
+        The position of the last activity of the previous page.
+
+    Raises:
+        InvalidCursorError: If the cursor could not be read.
+    """
+    try:
+        timestamp, entity_id, state = cursor.split(":", 2)
+        return (float(timestamp), entity_id, state)
+    except ValueError as err:
+        raise InvalidCursorError(cursor) from err
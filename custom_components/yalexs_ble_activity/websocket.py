@@ -0,0 +1,54 @@
+"""Websocket API for the Yale Access Bluetooth Activity integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+import voluptuous as vol
+
+from .const import DOMAIN, SIGNAL_ACTIVITY_PAYLOAD
+from .payload import ActivityPayload
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Set up the websocket API for the integration."""
+    websocket_api.async_register_command(hass, websocket_subscribe_activity)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+@callback
+def websocket_subscribe_activity(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to the activity of all locks or of specific locks.
+
+    Each activity is sent as its pre-serialized payload, so it's serialized
+    once no matter how many dashboards are subscribed.
+    """
+    msg_id: int = msg["id"]
+    entity_ids: set[str] | None = (
+        None if (ids := msg.get(ATTR_ENTITY_ID)) is None else set(ids)
+    )
+
+    @callback
+    def _async_forward(payload: ActivityPayload) -> None:
+        if entity_ids is None or payload.data["entity_id"] in entity_ids:
+            connection.send_message(payload.event_message(msg_id))
+
+    connection.subscriptions[msg_id] = async_dispatcher_connect(
+        hass, SIGNAL_ACTIVITY_PAYLOAD, _async_forward
+    )
+    connection.send_result(msg_id)
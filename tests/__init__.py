@@ -94,3 +94,18 @@ def add_mock_lock(
         device_id=device_entry.id,
         config_entry=mock_config_entry,
     )
+
+
+def activity_update_handler(hass: HomeAssistant, lock: er.RegistryEntry):
+    """Get the activity update callback registered for a lock.
+
+    Returns:
+        The most recently registered activity callback.
+    """
+    core_entry = hass.config_entries.async_get_known_entry(lock.config_entry_id)
+    data = core_entry.runtime_data
+    register_activity_update_call = data.lock.register_activity_callback.mock_calls[-1]
+    _name, register_activity_update_args, _kwargs = register_activity_update_call
+    (activity_update,) = register_activity_update_args
+
+    return activity_update
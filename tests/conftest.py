@@ -2,6 +2,7 @@
 
 from collections.abc import Generator
 import logging
+from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 
 from freezegun.api import FrozenDateTimeFactory
@@ -56,6 +57,12 @@ def mock_dependencies(hass: HomeAssistant) -> None:
     mock_component(hass, "yalexs_ble")
 
 
+@pytest.fixture(autouse=True)
+def mock_config_dir(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Use a temporary config directory for journals, archives & profiles."""
+    hass.config.config_dir = str(tmp_path)
+
+
 @pytest.fixture(autouse=True)
 def mock_recorder(
     enable_custom_integrations,
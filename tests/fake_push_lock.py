@@ -0,0 +1,256 @@
+"""A simulated Yale Access Bluetooth `PushLock` for load & reconnect testing.
+
+The fake implements the activity callback API of the patched `yalexs-ble`, so
+the integration subscribes to it exactly as it would to a real lock. Requesting
+an update connects to the lock & reads its backlog one activity at a time.
+Connections can be dropped part way through reading the backlog, activity
+accumulates in the backlog while disconnected, and reading can be slowed by
+random jitter to mimic a busy Bluetooth adapter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+import datetime as dt
+from itertools import cycle, islice
+import random
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from yalexs_ble import ConnectionInfo, DoorActivity, LockActivity, LockInfo, LockState
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from . import add_mock_lock
+
+type ActivityCallback = Callable[
+    [DoorActivity | LockActivity, LockInfo, ConnectionInfo], None
+]
+
+
+def _activity_cycle(
+    slot: int,
+) -> Iterator[Callable[[dt.datetime], DoorActivity | LockActivity]]:
+    return cycle(
+        [
+            lambda timestamp: LockActivity(
+                timestamp=timestamp,
+                status=LockStatus.UNLOCKED,
+                source=LockOperationSource.PIN,
+                remote_type=LockOperationRemoteType.UNKNOWN,
+                slot=slot,
+            ),
+            lambda timestamp: DoorActivity(
+                timestamp=timestamp, status=DoorStatus.OPENED
+            ),
+            lambda timestamp: DoorActivity(
+                timestamp=timestamp, status=DoorStatus.CLOSED
+            ),
+            lambda timestamp: LockActivity(
+                timestamp=timestamp,
+                status=LockStatus.LOCKED,
+                source=LockOperationSource.AUTO_LOCK,
+                remote_type=None,
+                slot=None,
+            ),
+        ]
+    )
+
+
+def make_activities(
+    count: int,
+    end: dt.datetime,
+    spacing: dt.timedelta = dt.timedelta(seconds=10),
+    slot: int = 1,
+) -> list[DoorActivity | LockActivity]:
+    """Make a sequence of entries through a door, ending at the given time.
+
+    Returns:
+        The activities, oldest first.
+    """
+    start = end - spacing * (count - 1)
+
+    return [
+        make(start + spacing * index)
+        for index, make in enumerate(islice(_activity_cycle(slot), count))
+    ]
+
+
+class FakePushLock:
+    """A simulated `PushLock` implementing the activity callback API."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        address: str,
+        *,
+        backlog: Iterable[DoorActivity | LockActivity] = (),
+        jitter: float = 0,
+        drop_after: int | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the lock.
+
+        Args:
+            hass: Home Assistant.
+            address: The Bluetooth address of the lock.
+            backlog: Activity stored on the lock that has not yet been read.
+            jitter: The maximum random delay in seconds before connecting &
+                before reading each activity.
+            drop_after: Drop each connection after reading this many
+                activities, leaving the rest of the backlog on the lock.
+            seed: The seed for the jitter.
+        """
+        self.hass = hass
+        self.address = address
+        self.jitter = jitter
+        self.drop_after = drop_after
+        self.lock_info = LockInfo(
+            manufacturer="Yale",
+            model="fake",
+            serial=f"fake-serial:{address}",
+            firmware="1.0.0",
+        )
+        self.lock_state = LockState(
+            lock=LockStatus.LOCKED,
+            door=DoorStatus.CLOSED,
+            battery=None,
+            auth=None,
+            auto_lock=None,
+            auto_lock_prev=None,
+        )
+        self.connection_info = ConnectionInfo(rssi=-60)
+        self.connected = False
+        self.connections = 0
+        self.drops = 0
+        self.delivered = 0
+        self.update_requests = 0
+        self._backlog: deque[DoorActivity | LockActivity] = deque(backlog)
+        self._activity_callbacks: list[ActivityCallback] = []
+        self._random = random.Random(seed)  # noqa: S311
+        self._connecting: asyncio.Task[None] | None = None
+
+    @property
+    def backlog(self) -> int:
+        """The number of activities that have not yet been read."""
+        return len(self._backlog)
+
+    @callback
+    def register_callback(  # noqa: PLR6301
+        self,
+        callback: Callable[..., None],  # noqa: ARG002
+    ) -> CALLBACK_TYPE:
+        """Register a state callback; state changes are not simulated.
+
+        Returns:
+            A callback to unregister.
+        """
+        return lambda: None
+
+    @callback
+    def register_activity_callback(
+        self,
+        callback: ActivityCallback,
+        request_update: bool = False,  # noqa: FBT002
+    ) -> CALLBACK_TYPE:
+        """Register an activity callback, optionally requesting an update.
+
+        Returns:
+            A callback to unregister.
+        """
+        self._activity_callbacks.append(callback)
+
+        if request_update:
+            self.update_requests += 1
+            self.async_connect()
+
+        def _unregister() -> None:
+            self._activity_callbacks.remove(callback)
+
+        return _unregister
+
+    @callback
+    def async_connect(self) -> None:
+        """Connect in the background & read the backlog."""
+        if self._connecting is not None:
+            return
+
+        self._connecting = self.hass.async_create_background_task(
+            self._async_connect(), f"fake push lock connect {self.address}"
+        )
+
+    async def async_wait_connected(self) -> None:
+        """Wait for a pending connection to finish reading the backlog."""
+        if self._connecting is not None:
+            await self._connecting
+
+    @callback
+    def disconnect(self) -> None:
+        """Drop the connection; activity accumulates in the backlog."""
+        self.connected = False
+
+    @callback
+    def push(self, activity: DoorActivity | LockActivity) -> None:
+        """Simulate activity occurring at the lock.
+
+        Activity is delivered immediately while connected & otherwise added
+        to the backlog.
+        """
+        if self.connected:
+            self._deliver(activity)
+        else:
+            self._backlog.append(activity)
+
+    async def _async_connect(self) -> None:
+        try:
+            await self._async_jitter()
+
+            self.connections += 1
+            self.connected = True
+            read = 0
+
+            while self._backlog and self.connected:
+                if read == self.drop_after:
+                    self.drops += 1
+                    self.connected = False
+                    break
+
+                await self._async_jitter()
+                self._deliver(self._backlog.popleft())
+                read += 1
+        finally:
+            self._connecting = None
+
+    async def _async_jitter(self) -> None:
+        await asyncio.sleep(self._random.uniform(0, self.jitter) if self.jitter else 0)
+
+    @callback
+    def _deliver(self, activity: DoorActivity | LockActivity) -> None:
+        self.delivered += 1
+
+        for activity_callback in list(self._activity_callbacks):
+            activity_callback(activity, self.lock_info, self.connection_info)
+
+
+def add_fake_lock(
+    hass: HomeAssistant,
+    entity_id: str,
+    **kwargs: object,
+) -> tuple[er.RegistryEntry, FakePushLock]:
+    """Add a lock device backed by a fake `PushLock`.
+
+    Returns:
+        The created lock entity & its fake `PushLock`.
+    """
+    lock = add_mock_lock(hass, entity_id)
+    core_entry = hass.config_entries.async_get_known_entry(lock.config_entry_id)
+    fake = FakePushLock(hass, core_entry.runtime_data.lock.address, **kwargs)  # type: ignore[arg-type]
+    core_entry.runtime_data.lock = fake
+
+    return lock, fake
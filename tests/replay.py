@@ -0,0 +1,254 @@
+"""Replay recorded activity streams through Yale Access Bluetooth Activity.
+
+Streams are JSONL files with one activity per line, i.e.:
+
+    {"type": "lock", "timestamp": "2025-05-20T06:30:00+00:00", "status": "unlocked",
+     "source": "pin", "remote_type": "unknown", "slot": 3}
+    {"type": "door", "timestamp": "2025-05-20T06:30:04+00:00", "status": "opened"}
+
+Run `script/replay <stream.jsonl> [--speed N]` to replay a stream against an
+isolated Home Assistant instance & print a report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import json
+import math
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+import time
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.core import Event, HomeAssistant, callback
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+    mock_component,
+)
+from yalexs_ble import DoorActivity, LockActivity
+
+from custom_components.yalexs_ble_activity.const import (
+    ATTR_SLOT,
+    ATTR_TIMESTAMP,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+)
+from custom_components.yalexs_ble_activity.journal import (
+    activity_as_dict,
+    activity_from_dict,
+)
+
+from . import activity_update_handler, add_mock_lock, setup_integration
+
+PERCENTILES = (50, 90, 95, 99)
+
+type ActivityKey = tuple[str, int | None]
+
+
+def load_activities(path: Path) -> list[DoorActivity | LockActivity]:
+    """Load a recorded JSONL activity stream.
+
+    Returns:
+        The activities.
+    """
+    with path.open(encoding="utf-8") as stream:
+        return [activity_from_dict(json.loads(line)) for line in stream if line.strip()]
+
+
+def save_activities(
+    path: Path,
+    activities: Iterable[DoorActivity | LockActivity],
+) -> None:
+    """Save activities as a JSONL activity stream."""
+    with path.open("w", encoding="utf-8") as stream:
+        stream.writelines(
+            f"{json.dumps(activity_as_dict(activity))}\n" for activity in activities
+        )
+
+
+@dataclass
+class ReplayReport:
+    """The outcome of a replay."""
+
+    count: int
+    duration: float
+    latencies: list[float] = field(repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Activities processed per second."""
+        return self.count / self.duration if self.duration else math.inf
+
+    def percentile(self, percent: float) -> float:
+        """Get a latency percentile using the nearest-rank method.
+
+        Returns:
+            The latency in seconds, or NaN when nothing was dispatched.
+        """
+        if not self.latencies:
+            return math.nan
+
+        ordered = sorted(self.latencies)
+        rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dictionary representation of the report.
+
+        Returns:
+            The report. Latency is `None` when nothing was dispatched.
+        """
+        return {
+            "count": self.count,
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "latency": {
+                f"p{percent}": self.percentile(percent) for percent in PERCENTILES
+            }
+            | {"max": max(self.latencies)}
+            if self.latencies
+            else None,
+        }
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    activity_update: Callable[..., None],
+    activities: list[DoorActivity | LockActivity],
+    *,
+    speed: float | None = None,
+) -> ReplayReport:
+    """Replay activities through an activity callback.
+
+    Latency is measured from when each activity is pushed until the matching
+    `yalexs_ble_activity` event is fired. Events are matched to activity by
+    timestamp & slot, so activity that's filtered or rate limited has no
+    latency rather than skewing the latency of later activity.
+
+    Args:
+        hass: Home Assistant.
+        activity_update: The registered activity callback.
+        activities: The activities to replay.
+        speed: A playback speed relative to the recorded timestamps, i.e. `1`
+            for real-time or `60` for one recorded minute per second. Activity
+            is replayed as fast as possible when `None`.
+
+    Returns:
+        The report for the replay.
+    """
+    pushed: defaultdict[ActivityKey, deque[float]] = defaultdict(deque)
+    latencies: list[float] = []
+
+    @callback
+    def _async_dispatched(event: Event) -> None:
+        attributes = event.data["attributes"]
+
+        if pushes := pushed.get(
+            (attributes[ATTR_TIMESTAMP], attributes.get(ATTR_SLOT))
+        ):
+            latencies.append(time.perf_counter() - pushes.popleft())
+
+    unsubscribe = hass.bus.async_listen("yalexs_ble_activity", _async_dispatched)
+    started = time.perf_counter()
+    first_timestamp = activities[0].timestamp if activities else None
+
+    try:
+        for activity in activities:
+            if speed is not None:
+                assert first_timestamp is not None
+                offset = (activity.timestamp - first_timestamp).total_seconds()
+                delay = started + offset / speed - time.perf_counter()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            key = (activity.timestamp.isoformat(), getattr(activity, "slot", None))
+            pushed[key].append(time.perf_counter())
+            activity_update(activity, lock_info=None, connection_info=None)
+
+        await hass.async_block_till_done()
+    finally:
+        unsubscribe()
+
+    return ReplayReport(
+        count=len(latencies),
+        duration=time.perf_counter() - started,
+        latencies=latencies,
+    )
+
+
+async def _async_main(stream: Path, speed: float | None) -> ReplayReport:
+    activities = load_activities(stream)
+
+    with TemporaryDirectory() as config_dir:
+        return await _async_replay_stream(activities, config_dir, speed)
+
+
+async def _async_replay_stream(
+    activities: list[DoorActivity | LockActivity],
+    config_dir: str,
+    speed: float | None,
+) -> ReplayReport:
+    async with async_test_home_assistant(config_dir=config_dir) as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+        mock_component(hass, "yalexs_ble")
+
+        lock = add_mock_lock(hass, "lock.replay")
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            title="Yale Access Bluetooth Activity",
+            data={CONF_LOCK_ENTITIES: [lock.entity_id]},
+        )
+
+        # a recorded stream is replayed as fast as possible, so it would be
+        # collapsed as an activity storm once it exceeds the burst limit.
+        with (
+            patch("homeassistant.components.recorder.get_instance"),
+            patch(
+                "homeassistant.components.yalexs_ble.entity.YALEXSBLEEntity.async_added_to_hass",
+            ),
+            patch(
+                "custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_BURST",
+                len(activities),
+            ),
+        ):
+            await setup_integration(hass, config_entry)
+            report = await async_replay(
+                hass,
+                activity_update_handler(hass, lock),
+                activities,
+                speed=speed,
+            )
+            await hass.config_entries.async_unload(config_entry.entry_id)
+
+        await hass.async_stop(force=True)
+
+    return report
+
+
+def main() -> None:
+    """Replay a recorded activity stream & print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("stream", type=Path, help="JSONL activity stream")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=None,
+        help="playback speed; 1 for real-time (default: as fast as possible)",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(_async_main(args.stream, args.speed))
+    sys.stdout.write(f"{json.dumps(report.as_dict(), indent=2)}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""Test Yale Access Bluetooth Activity archive."""
+
+from array import array
+import datetime as dt
+from itertools import cycle, islice
+import logging
+from pathlib import Path
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity import archive as archive_module
+from custom_components.yalexs_ble_activity.archive import (
+    ActivityArchive,
+    ActivityColumns,
+    ArchivedActivity,
+    ArchiveSegmentError,
+    append_columns,
+    read_activity,
+    summarize,
+)
+from custom_components.yalexs_ble_activity.const import (
+    ARCHIVE_FLUSH_INTERVAL,
+    ARCHIVE_SEGMENT_SIZE,
+    CONF_ARCHIVE,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+)
+
+from . import MOCK_UTC_NOW, MockNow, activity_update_handler, setup_integration
+
+_LOGGER = logging.getLogger(__name__)
+
+BENCHMARK_SIZE = 1_000_000
+
+# a monday at 10:00 UTC
+MONDAY = int(dt.datetime(2025, 5, 19, 10, tzinfo=dt.UTC).timestamp())
+NO_SLOT = 0xFFFF
+# door statuses followed by lock statuses, with the high bit set
+STATUSES = (*range(5), *range(0x80, 0x87), 0x8C)
+
+
+@pytest.fixture(name="config_entry")
+def mock_config_entry() -> MockConfigEntry:
+    """Return a mocked config entry that archives activity."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_ARCHIVE: True,
+        },
+    )
+
+
+def _columns(rows: list[tuple[int, int, int, int]]) -> ActivityColumns:
+    timestamps, statuses, sources, slots = zip(*rows, strict=True)
+    return ActivityColumns(
+        array("q", timestamps),
+        array("B", statuses),
+        array("B", sources),
+        array("H", slots),
+    )
+
+
+def test_summarize(tmp_path: Path) -> None:
+    """Test summarizing archived activity."""
+    append_columns(
+        tmp_path / "front_door",
+        _columns(
+            [
+                (MONDAY, 131, 3, 3),  # lock_unlocked via pin slot 3
+                (MONDAY + 60, 3, 0, NO_SLOT),  # door_opened
+                (MONDAY + 90 * 60, 133, 5, NO_SLOT),  # lock_locked by auto lock
+            ]
+        ),
+    )
+    append_columns(
+        tmp_path / "back_door",
+        _columns([(MONDAY - 60, 131, 3, 3), (MONDAY + 86_400, 131, 3, 7)]),
+    )
+
+    summary = summarize(tmp_path, None, None, None, dt.UTC)
+
+    assert summary.activities == 5
+    assert summary.heatmap[0][9] == 1
+    assert summary.heatmap[0][10] == 2
+    assert summary.heatmap[0][11] == 1
+    assert summary.heatmap[1][10] == 1
+    assert sum(map(sum, summary.heatmap)) == 5
+    assert summary.slots == {3: 2, 7: 1}
+    assert summary.statuses == {"door_opened": 1, "lock_unlocked": 3, "lock_locked": 1}
+    assert summary.size == 2 * (32 + 16) + 5 * 8
+
+    summary = summarize(tmp_path, ["front_door"], MONDAY + 60, None, dt.UTC)
+    assert summary.activities == 2
+    assert summary.slots == {}
+
+    summary = summarize(tmp_path, None, None, MONDAY + 60, dt.UTC)
+    assert summary.activities == 2
+    assert summary.slots == {3: 2}
+
+    summary = summarize(tmp_path, None, None, None, dt.timezone(dt.timedelta(hours=-5)))
+    assert summary.heatmap[0][5] == 2
+
+
+def test_summarize_without_archive(tmp_path: Path) -> None:
+    """Test summarizing before anything has been archived."""
+    summary = summarize(tmp_path / "archive", None, None, None, dt.UTC)
+
+    assert summary.activities == 0
+    assert summary.size == 0
+    assert summary.as_dict()["slots"] == {}
+
+
+def test_append_rolls_over_segments(tmp_path: Path) -> None:
+    """Test activity is appended to the final segment until it is full."""
+    directory = tmp_path / "front_door"
+    segment = directory / "00000000.seg"
+
+    with patch.object(archive_module, "ARCHIVE_SEGMENT_SIZE", 3):
+        append_columns(
+            directory, _columns([(MONDAY, 131, 3, 1), (MONDAY + 1, 133, 5, 2)])
+        )
+        assert [path.name for path in sorted(directory.iterdir())] == ["00000000.seg"]
+
+        # a block left by an interrupted flush is overwritten.
+        existing = segment.read_bytes()
+        with segment.open("ab") as file:
+            file.write(b"\xff" * 20)
+
+        append_columns(
+            directory,
+            _columns([(MONDAY + 2, 131, 3, 3), (MONDAY - 3, 131, 3, 4)]),
+        )
+        assert [path.name for path in sorted(directory.iterdir())] == [
+            "00000000.seg",
+            "00000001.seg",
+        ]
+        assert segment.read_bytes()[32:64] == existing[32:]
+        assert segment.stat().st_size == 64 + 16 + 8
+
+        append_columns(directory, _columns([(MONDAY + 4, 131, 3, 5)]))
+
+    summary = summarize(tmp_path, None, None, None, dt.UTC)
+    assert summary.activities == 5
+    assert summary.slots == {1: 1, 2: 1, 3: 1, 4: 1, 5: 1}
+    assert summary.heatmap[0][9] == 1
+
+
+def test_read_activity(tmp_path: Path) -> None:
+    """Test reading the archived activity of a lock in timestamp order."""
+    directory = tmp_path / "front_door"
+
+    with patch.object(archive_module, "ARCHIVE_SEGMENT_SIZE", 2):
+        append_columns(
+            directory,
+            _columns(
+                [
+                    (MONDAY + 60, 3, 0, NO_SLOT),  # door_opened
+                    (MONDAY, 131, 3, 3),  # lock_unlocked via pin slot 3
+                    (MONDAY + 90, 133, 5, NO_SLOT),  # lock_locked by auto lock
+                    (MONDAY + 120, 1, 0, NO_SLOT),  # door_closed
+                ]
+            ),
+        )
+
+    assert read_activity(directory, MONDAY, MONDAY + 120) == [
+        ArchivedActivity(MONDAY, "lock_unlocked", "pin", 3),
+        ArchivedActivity(MONDAY + 60, "door_opened", None, None),
+        ArchivedActivity(MONDAY + 90, "lock_locked", "auto_lock", None),
+    ]
+
+    # segments without activity in the range are not mapped.
+    with patch.object(
+        archive_module, "_mapped_segment", wraps=archive_module._mapped_segment
+    ) as mapped_segment:
+        assert read_activity(directory, MONDAY + 90, MONDAY + 121) == [
+            ArchivedActivity(MONDAY + 90, "lock_locked", "auto_lock", None),
+            ArchivedActivity(MONDAY + 120, "door_closed", None, None),
+        ]
+        assert read_activity(directory, MONDAY - 60, MONDAY) == []
+
+    assert mapped_segment.call_count == 1
+    assert read_activity(tmp_path / "back_door", MONDAY, MONDAY + 120) == []
+
+
+@pytest.mark.parametrize("size", [16, 64], ids=["truncated", "unknown_format"])
+def test_unsupported_segment(tmp_path: Path, size: int) -> None:
+    """Test unsupported segments are not read."""
+    directory = tmp_path / "front_door"
+    directory.mkdir()
+    (directory / "00000000.seg").write_bytes(b"\0" * size)
+
+    with pytest.raises(ArchiveSegmentError):
+        summarize(tmp_path, None, None, None, dt.UTC)
+
+
+def test_append_to_unsupported_segment(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test activity is written to a new segment after an unsupported one."""
+    directory = tmp_path / "front_door"
+    directory.mkdir()
+    (directory / "00000000.seg").write_bytes(b"\0" * 16)
+
+    append_columns(directory, _columns([(MONDAY, 131, 3, 1)]))
+
+    assert [path.name for path in sorted(directory.iterdir())] == [
+        "00000000.seg",
+        "00000001.seg",
+    ]
+    assert "unsupported archive segment" in caplog.text
+
+
+def test_benchmark(tmp_path: Path) -> None:
+    """Test the size & query time of a large archive."""
+    columns = ActivityColumns(
+        array("q", range(MONDAY, MONDAY + BENCHMARK_SIZE * 97, 97)),
+        array("B", islice(cycle(STATUSES), BENCHMARK_SIZE)),
+        array("B", (index % 7 for index in range(BENCHMARK_SIZE))),
+        array(
+            "H",
+            (
+                index % 20 if index % 3 == 0 else NO_SLOT
+                for index in range(BENCHMARK_SIZE)
+            ),
+        ),
+    )
+    append_columns(tmp_path / "front_door", columns)
+
+    summary = summarize(tmp_path, None, None, None, dt.UTC)
+
+    _LOGGER.info(
+        "archived %s activities in %s bytes (%.2f bytes each), queried in %.6fs",
+        BENCHMARK_SIZE,
+        summary.size,
+        summary.size / BENCHMARK_SIZE,
+        summary.query_time,
+    )
+
+    segments = -(-BENCHMARK_SIZE // ARCHIVE_SEGMENT_SIZE)
+    assert summary.activities == BENCHMARK_SIZE
+    assert summary.size == segments * (32 + 16) + BENCHMARK_SIZE * 8
+    assert sum(summary.slots.values()) == -(-BENCHMARK_SIZE // 3)
+    assert sum(map(sum, summary.heatmap)) == BENCHMARK_SIZE
+
+
+async def test_archive_activity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test activity is archived & summarized by the service."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        LockActivity(
+            timestamp=MOCK_UTC_NOW,
+            status=LockStatus.UNLOCKED,
+            source=LockOperationSource.PIN,
+            remote_type=LockOperationRemoteType.UNKNOWN,
+            slot=3,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    activity_update(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+        lock_info=None,
+        connection_info=None,
+    )
+    activity_update(
+        type("UnsupportedActivity", (object,), {"timestamp": MOCK_UTC_NOW})(),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    archive = config_entry.runtime_data.archive
+    assert archive
+    assert archive.as_dict()["buffered"] == 2
+
+    now._tick(ARCHIVE_FLUSH_INTERVAL.total_seconds())
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert archive.as_dict()["buffered"] == 0
+    assert archive.as_dict()["archived"] == 2
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "archive_summary",
+        {"entity_id": "sensor.front_door_operation"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response
+    assert response["activities"] == 2
+    assert response["slots"] == {"3": 1}
+    assert response["statuses"] == {"door_opened": 1, "lock_unlocked": 1}
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "archive_summary",
+        {"start": MOCK_UTC_NOW + dt.timedelta(hours=1)},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response
+    assert response["activities"] == 0
+
+
+async def test_archive_slot_out_of_range(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test slots that don't fit the archive are archived without a slot."""
+    archive = ActivityArchive(hass, config_entry)
+
+    for slot in (3, NO_SLOT, -1):
+        archive.async_append("front_door", MOCK_UTC_NOW, "lock_unlocked", "pin", slot)
+
+    # activity without a known status is not archived.
+    archive.async_append("front_door", MOCK_UTC_NOW, "unsupported", None, None)
+
+    await archive.async_flush()
+
+    timestamp = int(MOCK_UTC_NOW.timestamp())
+    assert [
+        activity.slot
+        for activity in read_activity(
+            archive.path / "front_door", timestamp, timestamp + 1
+        )
+    ] == [3, None, None]
+
+
+async def test_archive_flush_failed(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test activity that couldn't be written is written by the next flush."""
+    archive = ActivityArchive(hass, config_entry)
+    timestamp = int(MOCK_UTC_NOW.timestamp())
+
+    archive.async_append("back_door", MOCK_UTC_NOW, "door_opened", None, None)
+    archive.async_append("front_door", MOCK_UTC_NOW, "lock_unlocked", "pin", 3)
+
+    def append_during_write(directory: Path, columns: ActivityColumns) -> None:
+        if directory.name == "back_door":
+            return
+
+        # activity buffered while the flush is in progress.
+        for key, state in (("front_door", "lock_locked"), ("side_door", "door_closed")):
+            hass.loop.call_soon_threadsafe(
+                archive.async_append,
+                key,
+                MOCK_UTC_NOW + dt.timedelta(seconds=1),
+                state,
+                None,
+                None,
+            )
+
+        raise OSError("No space left on device")
+
+    with patch.object(
+        archive_module, "append_columns", side_effect=append_during_write
+    ):
+        await archive.async_flush()
+
+    assert "failed to archive activity" in caplog.text
+    assert archive.as_dict() == {"buffered": 3, "archived": 1, "last_flush": None}
+
+    await archive.async_flush()
+
+    assert archive.as_dict()["buffered"] == 0
+    assert archive.as_dict()["archived"] == 4
+    assert archive.last_flush
+    assert read_activity(archive.path / "front_door", timestamp, timestamp + 2) == [
+        ArchivedActivity(timestamp, "lock_unlocked", "pin", 3),
+        ArchivedActivity(timestamp + 1, "lock_locked", None, None),
+    ]
+
+
+async def test_archive_flushed_on_unload(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    tmp_path: Path,
+) -> None:
+    """Test buffered activity is written when the entry is unloaded."""
+    await setup_integration(hass, config_entry)
+
+    activity_update_handler(hass, lock)(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.CLOSED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+    summary = summarize(tmp_path / DOMAIN / "archive", None, None, None, dt.UTC)
+    assert summary.activities == 1
+
+
+async def test_archive_flushed_when_full(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity is written once a segment worth is buffered."""
+    with patch.object(archive_module, "ARCHIVE_SEGMENT_SIZE", 2):
+        await setup_integration(hass, config_entry)
+
+        activity_update = activity_update_handler(hass, lock)
+        for status in (DoorStatus.OPENED, DoorStatus.CLOSED):
+            activity_update(
+                DoorActivity(timestamp=MOCK_UTC_NOW, status=status),
+                lock_info=None,
+                connection_info=None,
+            )
+
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    archive = config_entry.runtime_data.archive
+    assert archive
+    assert archive.as_dict()["archived"] == 2
+
+
+async def test_archive_summary_not_configured(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test summarizing fails when no entry archives activity."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={CONF_LOCK_ENTITIES: ["lock.front_door"]},
+    )
+    await setup_integration(hass, config_entry)
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await hass.services.async_call(
+            DOMAIN, "archive_summary", {}, blocking=True, return_response=True
+        )
+
+    assert exc_info.value.translation_key == "archive_not_configured"
+
+
+async def test_archive_summary_invalid_entity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test summarizing fails for entities other than operation sensors."""
+    await setup_integration(hass, config_entry)
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await hass.services.async_call(
+            DOMAIN,
+            "archive_summary",
+            {"entity_id": "event.front_door_activity"},
+            blocking=True,
+            return_response=True,
+        )
+
+    assert exc_info.value.translation_key == "invalid_entity"
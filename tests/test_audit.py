@@ -0,0 +1,296 @@
+"""Test Yale Access Bluetooth Activity integrity audit."""
+
+import concurrent.futures
+import datetime as dt
+from unittest.mock import Mock, patch
+
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.yalexs_ble_activity import audit as audit_module
+from custom_components.yalexs_ble_activity.archive import ArchivedActivity
+from custom_components.yalexs_ble_activity.audit import merge_activity
+from custom_components.yalexs_ble_activity.const import (
+    AUDIT_INTERVAL,
+    CONF_ARCHIVE,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+)
+
+from . import activity_update_handler, setup_integration
+from .fake_push_lock import make_activities
+
+ENTITY_ID = "sensor.front_door_operation"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: Recorder,
+    enable_custom_integrations,
+):
+    """Enable custom integrations once the recorder is set up."""
+    return
+
+
+@pytest.fixture(autouse=True)
+def mock_recorder() -> None:
+    """Use the in-memory recorder rather than a mock."""
+    return
+
+
+@pytest.fixture(name="config_entry")
+def mock_config_entry() -> MockConfigEntry:
+    """Return a mocked config entry that archives activity."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_ARCHIVE: True,
+        },
+    )
+
+
+def test_merge_activity() -> None:
+    """Test archived & recorded activity are compared one second at a time."""
+    unlocked = ArchivedActivity(100, "lock_unlocked", "pin", 3)
+    opened = ArchivedActivity(100, "door_opened", None, None)
+    closed = ArchivedActivity(130, "door_closed", None, None)
+    locked = ArchivedActivity(160, "lock_locked", "auto_lock", None)
+
+    audit = merge_activity(
+        [unlocked, opened, closed, locked],
+        [
+            (90, "lock_locked"),
+            (100, "door_opened"),
+            (100, "lock_unlocked"),
+            (100, "lock_unlocked"),
+            (160, "lock_unlocked"),
+            (190, "door_ajar"),
+        ],
+    )
+
+    assert audit.missing == [closed, locked]
+    assert audit.as_dict() == {
+        "archived": 4,
+        "recorded": 6,
+        "missing": 2,
+        "duplicates": 1,
+        "unarchived": 3,
+    }
+
+
+async def test_requeue_missing_activity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity dropped by the recorder queue is recorded again."""
+    await setup_integration(hass, config_entry)
+
+    activities = make_activities(6, dt_util.utcnow() - dt.timedelta(hours=1))
+    dropped = {activities[1].timestamp, activities[4].timestamp}
+    instance = get_instance(hass)
+    queue_task = instance.queue_task
+
+    def _queue_task(task: object) -> None:
+        if (
+            isinstance(task, Event)
+            and task.event_type == EVENT_STATE_CHANGED
+            and (last_updated := task.data["new_state"].last_updated) in dropped
+        ):
+            dropped.discard(last_updated)
+            return
+
+        queue_task(task)  # type: ignore[arg-type]
+
+    with patch.object(instance, "queue_task", _queue_task):
+        activity_update = activity_update_handler(hass, lock)
+
+        for activity in activities:
+            activity_update(activity, lock_info=None, connection_info=None)
+
+        await hass.async_block_till_done()
+
+    await async_wait_recording_done(hass)
+
+    audit = config_entry.runtime_data.audit
+    run = await audit.async_audit()
+
+    assert run is not None
+    assert run.locks[ENTITY_ID].as_dict() == {
+        "archived": 6,
+        "recorded": 4,
+        "missing": 2,
+        "duplicates": 0,
+        "unarchived": 0,
+    }
+    assert [activity.timestamp for activity in run.locks[ENTITY_ID].missing] == [
+        int(activities[1].timestamp.timestamp()),
+        int(activities[4].timestamp.timestamp()),
+    ]
+
+    await async_wait_recording_done(hass)
+    run = await audit.async_audit()
+
+    assert run is not None
+    assert run.locks[ENTITY_ID].as_dict() == {
+        "archived": 6,
+        "recorded": 6,
+        "missing": 0,
+        "duplicates": 0,
+        "unarchived": 0,
+    }
+
+    diagnostics = audit.as_dict()
+    assert diagnostics["running"] is False
+    assert diagnostics["total_requeued"] == 2
+    assert diagnostics["last_run"]["locks"] == {
+        ENTITY_ID: run.locks[ENTITY_ID].as_dict()
+    }
+    assert diagnostics["last_run"]["end"] == run.end.isoformat()
+
+
+async def test_audit_service(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test auditing recorded activity with the service."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+
+    for activity in make_activities(2, dt_util.utcnow() - dt.timedelta(hours=1)):
+        activity_update(activity, lock_info=None, connection_info=None)
+
+    await hass.async_block_till_done()
+    await async_wait_recording_done(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN, "audit", {}, blocking=True, return_response=True
+    )
+
+    assert response == {
+        "locks": {
+            ENTITY_ID: {
+                "archived": 2,
+                "recorded": 2,
+                "missing": 0,
+                "duplicates": 0,
+                "unarchived": 0,
+            },
+        },
+    }
+
+
+async def test_audit_service_not_configured(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test the service requires an entry that archives activity."""
+    await setup_integration(
+        hass,
+        MockConfigEntry(
+            domain=DOMAIN,
+            title="Yale Access Bluetooth Activity",
+            data={CONF_LOCK_ENTITIES: ["lock.front_door"]},
+        ),
+    )
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await hass.services.async_call(
+            DOMAIN, "audit", {}, blocking=True, return_response=True
+        )
+
+    assert exc_info.value.translation_key == "audit_not_configured"
+
+
+async def test_audit_already_running(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test an audit is skipped while another is running."""
+    await setup_integration(hass, config_entry)
+
+    audit = config_entry.runtime_data.audit
+    first = hass.async_create_task(audit.async_audit())
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await hass.services.async_call(
+            DOMAIN, "audit", {}, blocking=True, return_response=True
+        )
+
+    assert exc_info.value.translation_key == "audit_in_progress"
+    assert await audit.async_audit() is None
+    assert await first is not None
+
+
+async def test_scheduled_audit(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test audits are scheduled periodically."""
+    await setup_integration(hass, config_entry)
+
+    audit = config_entry.runtime_data.audit
+    assert audit.last_run is None
+
+    async_fire_time_changed(hass, dt_util.utcnow() + AUDIT_INTERVAL)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert audit.last_run is not None
+    assert audit.last_run.locks[ENTITY_ID].archived == 0
+
+
+async def test_audit_failure(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test a failed audit is raised & does not stay running."""
+    await setup_integration(hass, config_entry)
+
+    audit = config_entry.runtime_data.audit
+
+    with (
+        patch(
+            "custom_components.yalexs_ble_activity.audit._audit_lock",
+            side_effect=RuntimeError("mock-failure"),
+        ),
+        pytest.raises(RuntimeError, match="mock-failure"),
+    ):
+        await audit.async_audit()
+
+    assert audit.as_dict()["running"] is False
+    assert audit.last_run is None
+
+
+def test_cancelled_audit_lock() -> None:
+    """Test a cancelled audit of a lock does not query the recorder."""
+    future: concurrent.futures.Future[audit_module.LockAudit] = (
+        concurrent.futures.Future()
+    )
+    future.cancel()
+
+    with patch(
+        "custom_components.yalexs_ble_activity.audit._audit_lock",
+    ) as mock_audit_lock:
+        audit_module._AuditLockTask(ENTITY_ID, [], 0, 0, future).run(Mock())
+
+    assert not mock_audit_lock.called
@@ -0,0 +1,292 @@
+"""Test Yale Access Bluetooth Activity calendars."""
+
+import datetime as dt
+
+from homeassistant.components.calendar import DOMAIN as CALENDAR_DOMAIN, CalendarEvent
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yalexs_ble import DoorActivity
+from yalexs_ble.const import DoorStatus
+
+from custom_components.yalexs_ble_activity.activity_log import ProcessedActivity
+from custom_components.yalexs_ble_activity.periods import (
+    PERIOD_UNLOCKED,
+    LockPeriods,
+    PeriodIndex,
+)
+
+from . import MOCK_UTC_NOW, MockNow, activity_update_handler, setup_integration
+from .fake_push_lock import make_activities
+
+ENTITY_ID = "calendar.front_door_activity"
+
+
+def _at(seconds: int) -> dt.datetime:
+    return MOCK_UTC_NOW + dt.timedelta(seconds=seconds)
+
+
+def _spans(index: PeriodIndex | LockPeriods, start: int, end: int) -> list[tuple]:
+    return [
+        (
+            period.kind,
+            int((period.start - MOCK_UTC_NOW).total_seconds()),
+            None
+            if period.end is None
+            else int((period.end - MOCK_UTC_NOW).total_seconds()),
+        )
+        for period in index.between(_at(start), _at(end))
+    ]
+
+
+def test_period_index() -> None:
+    """Test activity is paired into periods & found by range."""
+    index = PeriodIndex(PERIOD_UNLOCKED)
+
+    for seconds, opening in (
+        (0, False),
+        (10, True),
+        (20, True),
+        (30, False),
+        (40, False),
+        (50, True),
+        (60, False),
+        (70, True),
+    ):
+        index.add(_at(seconds), opening=opening)
+
+    assert len(index) == 2
+    assert _spans(index, 0, 100) == [
+        ("unlocked", 10, 30),
+        ("unlocked", 50, 60),
+        ("unlocked", 70, None),
+    ]
+
+    # ranges are exclusive of periods that end at their start or start at
+    # their end.
+    assert _spans(index, 30, 50) == []
+    assert _spans(index, 29, 51) == [("unlocked", 10, 30), ("unlocked", 50, 60)]
+    assert _spans(index, 60, 70) == []
+
+    # backfilled activity splits the period it occurred within.
+    index.add(_at(15), opening=False)
+    assert _spans(index, 0, 70) == [
+        ("unlocked", 10, 15),
+        ("unlocked", 20, 30),
+        ("unlocked", 50, 60),
+    ]
+
+    index.add(_at(80), opening=False)
+    assert index.current is None
+    assert _spans(index, 60, 100) == [("unlocked", 70, 80)]
+
+
+def test_period_index_size() -> None:
+    """Test periods are dropped with the oldest activity."""
+    index = PeriodIndex(PERIOD_UNLOCKED, size=4)
+
+    for seconds in range(0, 60, 10):
+        index.add(_at(seconds), opening=seconds % 20 == 0)
+
+    assert _spans(index, 0, 100) == [("unlocked", 20, 30), ("unlocked", 40, 50)]
+
+
+def test_period_index_backfill() -> None:
+    """Test backfilled activity pairs the periods from it onward again."""
+    index = PeriodIndex(PERIOD_UNLOCKED)
+
+    for seconds, opening in (
+        (10, True),
+        (20, False),
+        (30, True),
+        (40, False),
+        (50, True),
+        (60, True),
+    ):
+        index.add(_at(seconds), opening=opening)
+
+    # activity before all periods.
+    index.add(_at(5), opening=True)
+    assert _spans(index, 0, 100) == [
+        ("unlocked", 5, 20),
+        ("unlocked", 30, 40),
+        ("unlocked", 50, None),
+    ]
+
+    # activity between the last period & the current period.
+    index.add(_at(45), opening=False)
+    assert _spans(index, 0, 100) == [
+        ("unlocked", 5, 20),
+        ("unlocked", 30, 40),
+        ("unlocked", 50, None),
+    ]
+
+    # activity within the current period.
+    index.add(_at(55), opening=False)
+    assert _spans(index, 0, 100) == [
+        ("unlocked", 5, 20),
+        ("unlocked", 30, 40),
+        ("unlocked", 50, 55),
+        ("unlocked", 60, None),
+    ]
+
+
+def test_lock_periods() -> None:
+    """Test periods of each kind are merged & unrelated activity is ignored."""
+    periods = LockPeriods()
+
+    for seconds, value in (
+        (0, "lock_unlocked"),
+        (10, "door_opened"),
+        (20, "door_closed"),
+        (25, "lock_locking"),
+        (30, "lock_locked"),
+        (40, "door_ajar"),
+        (50, None),
+    ):
+        periods.process(value, {"timestamp": _at(seconds)})
+
+    assert _spans(periods, 0, 100) == [
+        ("unlocked", 0, 30),
+        ("door_open", 10, 20),
+        ("door_open", 40, None),
+    ]
+    assert periods.current is not None
+    assert periods.current.kind == "door_open"
+
+
+def test_lock_periods_restore() -> None:
+    """Test restored history is merged with activity processed since startup."""
+    periods = LockPeriods(size=3)
+    periods.process("lock_locked", {"timestamp": _at(30)})
+
+    periods.restore(
+        [
+            ProcessedActivity(None, _at(-10), "lock_unlocked"),
+            ProcessedActivity(None, _at(-5), "lock_locked"),
+            ProcessedActivity(None, _at(0), "lock_unlocked", "pin", "unknown", 3),
+            ProcessedActivity(None, _at(10), "door_opened"),
+            ProcessedActivity(None, _at(20), "door_closed"),
+            ProcessedActivity(None, _at(25), "lock_locking"),
+            ProcessedActivity(None, _at(26), None),
+        ]
+    )
+
+    assert _spans(periods, -100, 100) == [
+        ("unlocked", 0, 30),
+        ("door_open", 10, 20),
+    ]
+    (period, _) = periods.between(_at(0), _at(100))
+    assert (period.source, period.remote_type, period.slot) == ("pin", "unknown", 3)
+
+
+async def test_calendar(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    entity_registry: er.EntityRegistry,
+    now: MockNow,
+) -> None:
+    """Test entry & exit periods are events of the calendar."""
+    await setup_integration(hass, config_entry)
+
+    entity_entry = entity_registry.async_get(ENTITY_ID)
+    assert entity_entry
+    assert entity_entry.unique_id == "mock-address:front_doorcalendar"
+    assert entity_entry.translation_key == "activity"
+
+    state = hass.states.get(ENTITY_ID)
+    assert state
+    assert state.state == STATE_OFF
+
+    activity_update = activity_update_handler(hass, lock)
+    activities = make_activities(8, MOCK_UTC_NOW, slot=3)
+
+    # the first entry is read after the more recent entry.
+    for activity in [*activities[4:], *activities[:4]]:
+        activity_update(activity, lock_info=None, connection_info=None)
+
+    await hass.async_block_till_done()
+
+    calendar = hass.data[CALENDAR_DOMAIN].get_entity(ENTITY_ID)
+    events = await calendar.async_get_events(hass, _at(-45), _at(-15))
+
+    assert events == [
+        CalendarEvent(
+            start=_at(-70),
+            end=_at(-40),
+            summary="Unlocked",
+            description="unlocked via keypad slot 3",
+            uid=f"unlocked_{_at(-70).timestamp()!r}",
+        ),
+        CalendarEvent(
+            start=_at(-30),
+            end=_at(0),
+            summary="Unlocked",
+            description="unlocked via keypad slot 3",
+            uid=f"unlocked_{_at(-30).timestamp()!r}",
+        ),
+        CalendarEvent(
+            start=_at(-20),
+            end=_at(-10),
+            summary="Door open",
+            uid=f"door_open_{_at(-20).timestamp()!r}",
+        ),
+    ]
+    assert await calendar.async_get_events(hass, _at(0), _at(60)) == []
+
+
+async def test_calendar_ongoing_period(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test the calendar is on while the door is open."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.UNKNOWN),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(ENTITY_ID)
+    assert state
+    assert state.state == STATE_OFF
+
+    activity_update(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(ENTITY_ID)
+    assert state
+    assert state.state == STATE_ON
+    assert state.attributes["message"] == "Door open"
+
+    now._tick(30)
+    calendar = hass.data[CALENDAR_DOMAIN].get_entity(ENTITY_ID)
+    (event,) = await calendar.async_get_events(hass, _at(-60), _at(60))
+    assert event.start == MOCK_UTC_NOW
+    assert event.end == _at(90)
+
+    activity_update(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.CLOSED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(ENTITY_ID)
+    assert state
+    assert state.state == STATE_OFF
+
+    # periods that start & end at the same time last for a moment.
+    (event,) = await calendar.async_get_events(hass, _at(-60), _at(60))
+    assert event.end == _at(1)
@@ -1,19 +1,30 @@
 """Test Yale Access Bluetooth Activity config flow."""
 
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant
-from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.data_entry_flow import FlowResultType, InvalidData
 from homeassistant.helpers import entity_registry as er
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.yalexs_ble_activity.const import CONF_LOCK_ENTITIES, DOMAIN
+from custom_components.yalexs_ble_activity.const import (
+    CONF_FILTER_LOCK,
+    CONF_FILTERS,
+    CONF_KINDS,
+    CONF_LOCK_ENTITIES,
+    CONF_RETENTION_DAYS,
+    CONF_SINK_TOPIC,
+    CONF_SINK_URL,
+    CONF_SLOTS,
+    DOMAIN,
+)
 
 
 @pytest.mark.parametrize(
-    ("user_input", "expected_result"),
+    ("user_input", "expected_result", "expected_title"),
     [
         (
             {
@@ -22,14 +33,27 @@ from custom_components.yalexs_ble_activity.const import CONF_LOCK_ENTITIES, DOMA
             {
                 CONF_LOCK_ENTITIES: ["lock.front_door"],
             },
+            "Yale Access Bluetooth Activity",
+        ),
+        (
+            {
+                CONF_NAME: "Building A",
+                CONF_LOCK_ENTITIES: ["lock.front_door"],
+            },
+            {
+                CONF_LOCK_ENTITIES: ["lock.front_door"],
+            },
+            "Building A",
         ),
     ],
+    ids=["default_name", "custom_name"],
 )
 async def test_user_flow(
     hass: HomeAssistant,
     lock: er.RegistryEntry,
     user_input: dict,
     expected_result: dict,
+    expected_title: str,
 ) -> None:
     """Test starting a flow by user."""
     result = await hass.config_entries.flow.async_init(
@@ -50,7 +74,7 @@ async def test_user_flow(
         assert result["type"] is FlowResultType.CREATE_ENTRY
         assert result["data"] == expected_result
 
-        assert result["title"] == "Yale Access Bluetooth Activity"
+        assert result["title"] == expected_title
 
         await hass.async_block_till_done()
 
@@ -95,3 +119,257 @@ async def test_options_flow(
     assert mock_config.data == {
         CONF_LOCK_ENTITIES: ["lock.front_door"],
     }
+
+
+async def test_options_flow_clear_retention(
+    hass: HomeAssistant,
+) -> None:
+    """Test options flow removes a cleared retention period & sink."""
+    mock_config = MockConfigEntry(
+        domain=DOMAIN,
+        title="home",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_RETENTION_DAYS: 30,
+            CONF_SINK_URL: "http://security.local/activity",
+        },
+    )
+    mock_config.add_to_hass(hass)
+
+    with patch(
+        "custom_components.yalexs_ble_activity.async_setup_entry",
+        return_value=True,
+    ):
+        await hass.config_entries.async_setup(mock_config.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(mock_config.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_LOCK_ENTITIES: ["lock.front_door"],
+            },
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert mock_config.data == {
+        CONF_LOCK_ENTITIES: ["lock.front_door"],
+    }
+
+
+async def test_user_flow_invalid_sink_topic(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test the sink topic must be a topic activity can be published to."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_USER},
+    )
+
+    with pytest.raises(InvalidData) as exc_info:
+        await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_LOCK_ENTITIES: ["lock.front_door"],
+                CONF_SINK_TOPIC: "security/locks/#",
+            },
+        )
+
+    assert exc_info.value.schema_errors == {CONF_SINK_TOPIC: ANY}
+
+
+async def test_user_flow_lock_already_configured(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test a lock cannot be added to a second entry."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        title="Building A",
+        data={CONF_LOCK_ENTITIES: ["lock.front_door"]},
+    ).add_to_hass(hass)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_USER},
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={
+            CONF_NAME: "Building B",
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+        },
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_LOCK_ENTITIES: "lock_already_configured"}
+
+
+async def test_options_flow_lock_already_configured(
+    hass: HomeAssistant,
+) -> None:
+    """Test a lock cannot be moved into an entry while used by another."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        title="Building A",
+        data={CONF_LOCK_ENTITIES: ["lock.front_door"]},
+    ).add_to_hass(hass)
+    mock_config = MockConfigEntry(
+        domain=DOMAIN,
+        title="Building B",
+        data={CONF_LOCK_ENTITIES: ["lock.back_door"]},
+    )
+    mock_config.add_to_hass(hass)
+
+    with patch(
+        "custom_components.yalexs_ble_activity.async_setup_entry",
+        return_value=True,
+    ):
+        await hass.config_entries.async_setup(mock_config.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(mock_config.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_LOCK_ENTITIES: ["lock.back_door", "lock.front_door"],
+            },
+        )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_LOCK_ENTITIES: "lock_already_configured"}
+    assert mock_config.data == {CONF_LOCK_ENTITIES: ["lock.back_door"]}
+
+
+@pytest.mark.parametrize(
+    ("filters_input", "expected_filters"),
+    [
+        (
+            {CONF_KINDS: ["door"], CONF_SLOTS: ["3"]},
+            {
+                "lock.back_door": {CONF_KINDS: ["lock"]},
+                "lock.front_door": {CONF_KINDS: ["door"], CONF_SLOTS: [3]},
+            },
+        ),
+        (
+            {CONF_KINDS: []},
+            {"lock.back_door": {CONF_KINDS: ["lock"]}},
+        ),
+    ],
+    ids=["set_filters", "clear_filters"],
+)
+async def test_options_flow_filters(
+    hass: HomeAssistant,
+    filters_input: dict,
+    expected_filters: dict,
+) -> None:
+    """Test options flow edits the filters of a lock."""
+    mock_config = MockConfigEntry(
+        domain=DOMAIN,
+        title="home",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door", "lock.back_door"],
+            CONF_FILTERS: {
+                "lock.front_door": {CONF_SLOTS: [1]},
+                "lock.back_door": {CONF_KINDS: ["lock"]},
+            },
+        },
+    )
+    mock_config.add_to_hass(hass)
+
+    with patch(
+        "custom_components.yalexs_ble_activity.async_setup_entry",
+        return_value=True,
+    ):
+        await hass.config_entries.async_setup(mock_config.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(mock_config.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_LOCK_ENTITIES: ["lock.front_door", "lock.back_door"],
+                CONF_FILTER_LOCK: "lock.front_door",
+            },
+        )
+
+        assert result["type"] is FlowResultType.FORM
+        assert result["step_id"] == "filters"
+        assert result["description_placeholders"] == {"entity_id": "lock.front_door"}
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input=filters_input,
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert mock_config.data == {
+        CONF_LOCK_ENTITIES: ["lock.front_door", "lock.back_door"],
+        CONF_FILTERS: expected_filters,
+    }
+
+
+async def test_options_flow_filters_of_removed_lock(
+    hass: HomeAssistant,
+) -> None:
+    """Test options flow removes the filters of removed locks."""
+    mock_config = MockConfigEntry(
+        domain=DOMAIN,
+        title="home",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door", "lock.back_door"],
+            CONF_FILTERS: {"lock.back_door": {CONF_KINDS: ["lock"]}},
+        },
+    )
+    mock_config.add_to_hass(hass)
+
+    with patch(
+        "custom_components.yalexs_ble_activity.async_setup_entry",
+        return_value=True,
+    ):
+        await hass.config_entries.async_setup(mock_config.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(mock_config.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={CONF_LOCK_ENTITIES: ["lock.front_door"]},
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert mock_config.data == {
+        CONF_LOCK_ENTITIES: ["lock.front_door"],
+        CONF_FILTERS: {},
+    }
+
+
+async def test_options_flow_filter_lock_not_selected(
+    hass: HomeAssistant,
+) -> None:
+    """Test the lock to filter must be one of the selected locks."""
+    mock_config = MockConfigEntry(
+        domain=DOMAIN,
+        title="home",
+        data={CONF_LOCK_ENTITIES: ["lock.front_door", "lock.back_door"]},
+    )
+    mock_config.add_to_hass(hass)
+
+    with patch(
+        "custom_components.yalexs_ble_activity.async_setup_entry",
+        return_value=True,
+    ):
+        await hass.config_entries.async_setup(mock_config.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(mock_config.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_LOCK_ENTITIES: ["lock.front_door"],
+                CONF_FILTER_LOCK: "lock.back_door",
+            },
+        )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_FILTER_LOCK: "filter_lock_not_selected"}
@@ -0,0 +1,303 @@
+"""Test Yale Access Bluetooth Activity entry correlation."""
+
+import datetime as dt
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity.const import (
+    CONF_ENTRY_WINDOW,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+    EVENT_ENTRY,
+)
+from custom_components.yalexs_ble_activity.correlation import (
+    ActivityEntry,
+    EntryCorrelator,
+)
+
+from . import MOCK_UTC_NOW, activity_update_handler, setup_integration
+
+WINDOW = dt.timedelta(seconds=30)
+
+
+def _at(seconds: float) -> dt.datetime:
+    return MOCK_UTC_NOW + dt.timedelta(seconds=seconds)
+
+
+def _unlock(seconds: float) -> LockActivity:
+    return LockActivity(
+        timestamp=_at(seconds),
+        status=LockStatus.UNLOCKED,
+        source=LockOperationSource.PIN,
+        remote_type=LockOperationRemoteType.UNKNOWN,
+        slot=3,
+    )
+
+
+def _lock(seconds: float) -> LockActivity:
+    return LockActivity(
+        timestamp=_at(seconds),
+        status=LockStatus.LOCKED,
+        source=LockOperationSource.AUTO_LOCK,
+        remote_type=None,
+        slot=None,
+    )
+
+
+def _door(seconds: float, status: DoorStatus) -> DoorActivity:
+    return DoorActivity(timestamp=_at(seconds), status=status)
+
+
+def _entry(unlocked: float, opened: float, closed: float) -> ActivityEntry:
+    return ActivityEntry(
+        unlocked_at=_at(unlocked),
+        source="pin",
+        remote_type="unknown",
+        slot=3,
+        door_opened_at=_at(opened),
+        door_closed_at=_at(closed),
+    )
+
+
+def _correlate(
+    correlator: EntryCorrelator, activities: list[DoorActivity | LockActivity]
+) -> list[ActivityEntry]:
+    return [
+        entry
+        for activity in activities
+        if (entry := correlator.process(activity)) is not None
+    ]
+
+
+def test_entry() -> None:
+    """Test an unlock followed by the door opening & closing is an entry."""
+    correlator = EntryCorrelator(WINDOW)
+
+    entries = _correlate(
+        correlator,
+        [
+            _unlock(0),
+            _door(10, DoorStatus.OPENED),
+            _door(12, DoorStatus.AJAR),
+            _door(25, DoorStatus.CLOSED),
+            _lock(30),
+        ],
+    )
+
+    assert entries == [_entry(0, 10, 25)]
+    assert entries[0].door_open_duration == 15
+    assert entries[0].as_dict() == {
+        "unlocked_at": _at(0).isoformat(),
+        "source": "pin",
+        "remote_type": "unknown",
+        "slot": 3,
+        "door_opened_at": _at(10).isoformat(),
+        "door_closed_at": _at(25).isoformat(),
+        "door_open_duration": 15.0,
+    }
+
+
+def test_entry_remote_type() -> None:
+    """Test entries of unlocks without a remote type."""
+    correlator = EntryCorrelator(WINDOW)
+
+    (entry,) = _correlate(
+        correlator,
+        [
+            LockActivity(
+                timestamp=_at(0),
+                status=LockStatus.UNLOCKED,
+                source=LockOperationSource.MANUAL,
+                remote_type=None,
+                slot=None,
+            ),
+            _door(1, DoorStatus.OPENED),
+            _door(2, DoorStatus.CLOSED),
+        ],
+    )
+
+    assert entry.source == "manual"
+    assert entry.remote_type is None
+    assert entry.slot is None
+
+
+def test_no_entry() -> None:
+    """Test sequences that are not entries."""
+    correlator = EntryCorrelator(WINDOW)
+
+    assert not _correlate(
+        correlator,
+        [
+            # door activity without an unlock
+            _door(0, DoorStatus.OPENED),
+            _door(1, DoorStatus.CLOSED),
+            # the door opens after the window
+            _unlock(10),
+            _door(41, DoorStatus.OPENED),
+            _door(42, DoorStatus.CLOSED),
+            # the lock locks before the door opens
+            _unlock(50),
+            _lock(51),
+            _door(52, DoorStatus.OPENED),
+            _door(53, DoorStatus.CLOSED),
+            # the door closes without opening
+            _unlock(60),
+            _door(61, DoorStatus.CLOSED),
+            _door(62, DoorStatus.AJAR),
+        ],
+    )
+
+
+def test_window_bounds_opening_only() -> None:
+    """Test the door may stay open beyond the window."""
+    correlator = EntryCorrelator(WINDOW)
+
+    assert _correlate(
+        correlator,
+        [
+            _unlock(0),
+            _door(30, DoorStatus.OPENED),
+            _door(300, DoorStatus.CLOSED),
+        ],
+    ) == [_entry(0, 30, 300)]
+
+
+def test_replayed_backlog() -> None:
+    """Test replaying a backlog neither duplicates nor corrupts entries."""
+    correlator = EntryCorrelator(WINDOW)
+    backlog = [
+        _unlock(0),
+        _door(5, DoorStatus.OPENED),
+        _door(9, DoorStatus.CLOSED),
+        _unlock(20),
+        _door(20, DoorStatus.OPENED),
+        _door(20, DoorStatus.CLOSED),
+    ]
+
+    assert _correlate(correlator, backlog) == [_entry(0, 5, 9), _entry(20, 20, 20)]
+    assert not _correlate(correlator, backlog)
+    assert not _correlate(correlator, backlog[-3:])
+
+    # live activity continues to be correlated after the replay.
+    assert _correlate(
+        correlator,
+        [_unlock(40), _door(41, DoorStatus.OPENED), _door(42, DoorStatus.CLOSED)],
+    ) == [_entry(40, 41, 42)]
+
+
+def test_out_of_order_activity() -> None:
+    """Test activity older than correlated activity doesn't disturb entries."""
+    correlator = EntryCorrelator(WINDOW)
+
+    assert not _correlate(
+        correlator,
+        [
+            _unlock(10),
+            _door(11, DoorStatus.OPENED),
+            _door(5, DoorStatus.CLOSED),
+            _unlock(6),
+        ],
+    )
+    assert correlator.process(_door(12, DoorStatus.CLOSED)) == _entry(10, 11, 12)
+
+
+def test_backlog_after_live_activity() -> None:
+    """Test a backlog processed after live activity is correlated in order."""
+    correlator = EntryCorrelator(WINDOW)
+
+    assert not _correlate(correlator, [_unlock(100)])
+    assert _correlate(
+        correlator,
+        [
+            _unlock(0),
+            _door(5, DoorStatus.OPENED),
+            _door(9, DoorStatus.CLOSED),
+            _unlock(20),
+            _door(21, DoorStatus.OPENED),
+            _door(22, DoorStatus.CLOSED),
+        ],
+    ) == [_entry(0, 5, 9), _entry(20, 21, 22)]
+
+    # a backlog that steps back in time is a new window, so a pending unlock
+    # isn't paired with older door activity.
+    assert not _correlate(
+        correlator,
+        [
+            _unlock(50),
+            _door(40, DoorStatus.OPENED),
+            _door(41, DoorStatus.CLOSED),
+        ],
+    )
+    assert _correlate(
+        correlator,
+        [
+            _unlock(30),
+            _door(31, DoorStatus.OPENED),
+            _door(32, DoorStatus.CLOSED),
+        ],
+    ) == [_entry(30, 31, 32)]
+
+    # live correlation continues from the live activity.
+    assert _correlate(
+        correlator,
+        [_door(101, DoorStatus.OPENED), _door(102, DoorStatus.CLOSED)],
+    ) == [_entry(100, 101, 102)]
+
+
+def test_unsupported_activity() -> None:
+    """Test unsupported activity is ignored."""
+    correlator = EntryCorrelator(WINDOW)
+    unsupported = type("UnsupportedActivity", (object,), {"timestamp": _at(1)})()
+
+    assert not _correlate(correlator, [_unlock(0), unsupported])
+    assert correlator.process(_door(2, DoorStatus.OPENED)) is None
+
+
+async def test_entry_event(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test entries are fired as events after the activity that completes them."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_ENTRY_WINDOW: 5,
+        },
+    )
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ENTRY)
+    activity_update = activity_update_handler(hass, lock)
+
+    for activity in [
+        _unlock(0),
+        _door(6, DoorStatus.OPENED),
+        _door(7, DoorStatus.CLOSED),
+        _unlock(10),
+        _door(15, DoorStatus.OPENED),
+        _door(22, DoorStatus.CLOSED),
+    ]:
+        activity_update(activity, lock_info=None, connection_info=None)
+    await hass.async_block_till_done()
+
+    assert [event.data for event in events] == [
+        {
+            "entity_id": "sensor.front_door_operation",
+            **_entry(10, 15, 22).as_dict(),
+        }
+    ]
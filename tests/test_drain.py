@@ -0,0 +1,268 @@
+"""Test Yale Access Bluetooth Activity startup drains."""
+
+import datetime as dt
+from unittest.mock import Mock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from yalexs_ble import LockActivity
+from yalexs_ble.const import LockOperationSource, LockStatus
+
+from custom_components.yalexs_ble_activity.const import (
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+    DRAIN_IDLE_TIMEOUT,
+    DRAIN_TIMEOUT,
+)
+
+from . import (
+    MOCK_UTC_NOW,
+    MockNow,
+    activity_update_handler,
+    add_mock_lock,
+    setup_integration,
+)
+
+FRONT_DOOR = "mock-address:front_door"
+BACK_DOOR = "mock-address:back_door"
+
+
+@pytest.fixture(name="back_door_lock")
+def mock_back_door_lock(
+    hass: HomeAssistant,
+) -> er.RegistryEntry:
+    """Return a second mocked lock."""
+    return add_mock_lock(hass, "lock.back_door")
+
+
+@pytest.fixture(name="config_entry")
+def mock_config_entry() -> MockConfigEntry:
+    """Return a mocked config entry with two locks."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door", "lock.back_door"],
+        },
+    )
+
+
+def _lock_activity(timestamp: dt.datetime, status: LockStatus) -> LockActivity:
+    return LockActivity(
+        timestamp=timestamp,
+        status=status,
+        source=LockOperationSource.MANUAL,
+    )
+
+
+def _register_activity_callback_mock(hass: HomeAssistant, lock: er.RegistryEntry):
+    core_entry = hass.config_entries.async_get_known_entry(lock.config_entry_id)
+    return core_entry.runtime_data.lock.register_activity_callback
+
+
+def _update_requests(register: Mock) -> list[bool]:
+    return [call.kwargs["request_update"] for call in register.call_args_list]
+
+
+async def test_concurrent_drain_limit(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    back_door_lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test only a limited number of locks drain at once."""
+    with patch(
+        "custom_components.yalexs_ble_activity.drain.DRAIN_MAX_CONCURRENT",
+        1,
+    ):
+        await setup_integration(hass, config_entry)
+
+    front_register = _register_activity_callback_mock(hass, lock)
+    back_register = _register_activity_callback_mock(hass, back_door_lock)
+
+    # both locks are subscribed, but only the draining lock requests backlog.
+    assert _update_requests(front_register) == [False, True]
+    assert _update_requests(back_register) == [False]
+
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        _lock_activity(MOCK_UTC_NOW, LockStatus.LOCKED),
+        lock_info=None,
+        connection_info=None,
+    )
+
+    now._tick(DRAIN_IDLE_TIMEOUT)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert _update_requests(back_register) == [False, True]
+
+    drains = config_entry.runtime_data.drain.as_dict()
+    assert drains["max_concurrent"] == 1
+    assert list(drains["locks"]) == [BACK_DOOR]
+    assert drains["locks"][BACK_DOOR]["state"] == "draining"
+    assert drains["locks"][BACK_DOOR]["wait_time"] is not None
+
+    now._tick(DRAIN_TIMEOUT)
+    await hass.async_block_till_done()
+
+    # finished drains are no longer tracked.
+    assert config_entry.runtime_data.drain.as_dict()["locks"] == {}
+
+
+async def test_live_activity_before_backlog(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test live activity is processed before backlog during a drain."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        _lock_activity(MOCK_UTC_NOW - dt.timedelta(days=1), LockStatus.UNLOCKED),
+        lock_info=None,
+        connection_info=None,
+    )
+    activity_update(
+        _lock_activity(MOCK_UTC_NOW, LockStatus.LOCKED),
+        lock_info=None,
+        connection_info=None,
+    )
+
+    await hass.async_block_till_done()
+
+    assert [event.data["state"] for event in events] == [
+        "lock_locked",
+        "lock_unlocked",
+    ]
+
+    drains = config_entry.runtime_data.drain.as_dict()
+    assert drains["backlog"] == 0
+    assert drains["locks"][FRONT_DOOR]["activities"] == 2
+    assert drains["locks"][FRONT_DOOR]["backlog"] == 1
+
+    now._tick(2)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.front_door_operation")
+    assert state
+    assert state.state == "lock_locked"
+
+
+async def test_live_activity_while_queued(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    back_door_lock: er.RegistryEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test live activity of a lock waiting to drain is processed."""
+    with patch(
+        "custom_components.yalexs_ble_activity.drain.DRAIN_MAX_CONCURRENT",
+        1,
+    ):
+        await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update = activity_update_handler(hass, back_door_lock)
+    activity_update(
+        _lock_activity(MOCK_UTC_NOW, LockStatus.UNLOCKED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in events] == [
+        "sensor.back_door_operation"
+    ]
+
+    drains = config_entry.runtime_data.drain.as_dict()
+    assert drains["locks"][BACK_DOOR]["state"] == "queued"
+    assert drains["locks"][BACK_DOOR]["activities"] == 0
+
+
+async def test_activity_after_drain(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test activity after a drain finishes is processed immediately."""
+    await setup_integration(hass, config_entry)
+
+    now._tick(DRAIN_TIMEOUT)
+    await hass.async_block_till_done()
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        _lock_activity(MOCK_UTC_NOW - dt.timedelta(days=1), LockStatus.UNLOCKED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    assert [event.data["state"] for event in events] == ["lock_unlocked"]
+    assert FRONT_DOOR not in config_entry.runtime_data.drain.as_dict()["locks"]
+
+
+async def test_unload_during_drain(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    back_door_lock: er.RegistryEntry,
+) -> None:
+    """Test unloading stops active drains & cancels queued drains."""
+    with patch(
+        "custom_components.yalexs_ble_activity.drain.DRAIN_MAX_CONCURRENT",
+        1,
+    ):
+        await setup_integration(hass, config_entry)
+
+    front_register = _register_activity_callback_mock(hass, lock)
+    back_register = _register_activity_callback_mock(hass, back_door_lock)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert front_register.return_value.call_count == 2
+    assert back_register.return_value.call_count == 1
+    assert _update_requests(back_register) == [False]
+
+
+async def test_cancel_discards_backlog(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    now: MockNow,
+) -> None:
+    """Test cancelling a drain discards its pending backlog."""
+    await setup_integration(hass, config_entry)
+
+    coordinator = config_entry.runtime_data.drain
+    unsubscribe = Mock()
+    processed: list[str] = []
+
+    cancel = coordinator.async_schedule("mock-key", lambda **_: unsubscribe)
+    coordinator.async_process(
+        "mock-key",
+        _lock_activity(MOCK_UTC_NOW - dt.timedelta(days=1), LockStatus.UNLOCKED),
+        lambda: processed.append("mock-key"),
+    )
+    assert coordinator.as_dict()["backlog"] == 1
+
+    cancel()
+    await hass.async_block_till_done()
+
+    assert processed == []
+    assert unsubscribe.call_count == 2
+    assert coordinator.as_dict()["backlog"] == 0
+    assert "mock-key" not in coordinator.as_dict()["locks"]
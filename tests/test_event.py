@@ -0,0 +1,208 @@
+"""Test Yale Access Bluetooth Activity events."""
+
+import logging
+import time
+from unittest.mock import patch
+
+from homeassistant.const import STATE_UNKNOWN, Platform
+from homeassistant.core import Event, EventStateChangedData, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity.const import (
+    ACTIVITY_EVENT_TYPES,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+)
+
+from . import MOCK_UTC_NOW, activity_update_handler, add_mock_lock, setup_integration
+
+_LOGGER = logging.getLogger(__name__)
+
+LOCK_COUNT = 20
+
+
+async def test_event(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test the event entity created for a lock."""
+    with patch("custom_components.yalexs_ble_activity.PLATFORMS", [Platform.EVENT]):
+        await setup_integration(hass, config_entry)
+
+    entity_entry = entity_registry.async_get("event.front_door_activity")
+    assert entity_entry
+    assert entity_entry.unique_id == "mock-address:front_dooractivity"
+    assert entity_entry.translation_key == "activity"
+
+    state = hass.states.get("event.front_door_activity")
+    assert state
+    assert state.state == STATE_UNKNOWN
+    assert state.attributes["event_types"] == ACTIVITY_EVENT_TYPES
+    assert state.attributes["event_type"] is None
+
+
+async def test_event_activity_update(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity is fired as a typed event."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        LockActivity(
+            timestamp=MOCK_UTC_NOW,
+            status=LockStatus.UNLOCKED,
+            source=LockOperationSource.PIN,
+            remote_type=LockOperationRemoteType.UNKNOWN,
+            slot=3,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.front_door_activity")
+    assert state
+    assert state.state != STATE_UNKNOWN
+    assert state.attributes["event_type"] == "lock_unlocked"
+    assert state.attributes["timestamp"] == MOCK_UTC_NOW
+    assert state.attributes["source"] == "pin"
+    assert state.attributes["remote_type"] == "unknown"
+    assert state.attributes["slot"] == 3
+
+    activity_update(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.front_door_activity")
+    assert state
+    assert state.attributes["event_type"] == "door_opened"
+    assert "source" not in state.attributes
+
+    activity_update(
+        LockActivity(
+            timestamp=MOCK_UTC_NOW,
+            status=LockStatus.SECUREMODE,
+            source=LockOperationSource.REMOTE,
+            remote_type=LockOperationRemoteType.BLE,
+            slot=0,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.front_door_activity")
+    assert state
+    assert state.attributes["event_type"] == "lock_securemode"
+
+
+async def test_event_unsupported_activity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test unsupported activity does not fire an event."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        type("UnsupportedActivity", (object,), {"timestamp": MOCK_UTC_NOW})(),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("event.front_door_activity")
+    assert state
+    assert state.state == STATE_UNKNOWN
+
+
+async def test_event_entity_listener_cost(
+    hass: HomeAssistant,
+) -> None:
+    """Test per-lock listeners are only woken for their own lock.
+
+    Listeners of the bus-wide event are woken for the activity of every lock
+    & must filter by entity, while listeners of an event entity are only
+    woken for that lock.
+    """
+    locks = [add_mock_lock(hass, f"lock.door_{index}") for index in range(LOCK_COUNT)]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={CONF_LOCK_ENTITIES: [lock.entity_id for lock in locks]},
+    )
+    await setup_integration(hass, config_entry)
+
+    bus_wakeups = 0
+    bus_matches = 0
+    entity_wakeups = 0
+    bus_time = 0.0
+    entity_time = 0.0
+
+    def _bus_listener(entity_id: str):
+        @callback
+        def _async_listener(event: Event) -> None:
+            nonlocal bus_wakeups, bus_matches, bus_time
+            started = time.perf_counter()
+            bus_wakeups += 1
+            if event.data["entity_id"] == entity_id:
+                bus_matches += 1
+            bus_time += time.perf_counter() - started
+
+        return _async_listener
+
+    @callback
+    def _async_entity_listener(event: Event[EventStateChangedData]) -> None:
+        nonlocal entity_wakeups, entity_time
+        started = time.perf_counter()
+        entity_wakeups += 1
+        entity_time += time.perf_counter() - started
+
+    for index in range(LOCK_COUNT):
+        hass.bus.async_listen(
+            "yalexs_ble_activity", _bus_listener(f"sensor.door_{index}_operation")
+        )
+        async_track_state_change_event(
+            hass, f"event.door_{index}_activity", _async_entity_listener
+        )
+
+    for lock in locks:
+        activity_update_handler(hass, lock)(
+            DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+            lock_info=None,
+            connection_info=None,
+        )
+
+    await hass.async_block_till_done()
+
+    _LOGGER.info(
+        "%s locks: bus listeners woken %s times (%.6fs), "
+        "event entity listeners woken %s times (%.6fs)",
+        LOCK_COUNT,
+        bus_wakeups,
+        bus_time,
+        entity_wakeups,
+        entity_time,
+    )
+
+    assert bus_matches == LOCK_COUNT
+    assert bus_wakeups == LOCK_COUNT * LOCK_COUNT
+    assert entity_wakeups == LOCK_COUNT
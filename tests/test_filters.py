@@ -0,0 +1,178 @@
+"""Test Yale Access Bluetooth Activity filters."""
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity.const import (
+    CONF_FILTERS,
+    CONF_KINDS,
+    CONF_LOCK_ENTITIES,
+    CONF_REMOTE_TYPES,
+    CONF_SLOTS,
+    CONF_SOURCES,
+    CONF_STATUSES,
+    DOMAIN,
+    EVENT_ACTIVITY,
+)
+from custom_components.yalexs_ble_activity.filters import compile_activity_filter
+
+from . import MOCK_UTC_NOW, activity_update_handler, setup_integration
+
+DOOR_OPENED = DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED)
+DOOR_CLOSED = DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.CLOSED)
+PIN_UNLOCK = LockActivity(
+    timestamp=MOCK_UTC_NOW,
+    status=LockStatus.UNLOCKED,
+    source=LockOperationSource.PIN,
+    remote_type=None,
+    slot=3,
+)
+REMOTE_LOCK = LockActivity(
+    timestamp=MOCK_UTC_NOW,
+    status=LockStatus.LOCKED,
+    source=LockOperationSource.REMOTE,
+    remote_type=LockOperationRemoteType.BLE,
+    slot=None,
+)
+AUTO_LOCK = LockActivity(
+    timestamp=MOCK_UTC_NOW,
+    status=LockStatus.LOCKED,
+    source=LockOperationSource.AUTO_LOCK,
+    remote_type=None,
+    slot=None,
+)
+UNSUPPORTED = type("UnsupportedActivity", (object,), {"timestamp": MOCK_UTC_NOW})()
+
+
+@pytest.fixture(name="config_entry")
+def mock_config_entry() -> MockConfigEntry:
+    """Return a mocked config entry that filters door activity."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_FILTERS: {
+                "lock.front_door": {CONF_KINDS: ["door"]},
+                "lock.removed_door": {CONF_KINDS: ["lock"]},
+            },
+        },
+    )
+
+
+def test_compile_without_rules() -> None:
+    """Test rules that filter nothing compile to no predicate."""
+    assert compile_activity_filter({}) is None
+    assert compile_activity_filter({CONF_KINDS: [], CONF_SLOTS: []}) is None
+
+
+@pytest.mark.parametrize(
+    ("rules", "expected"),
+    [
+        (
+            {CONF_KINDS: ["door"]},
+            [DOOR_OPENED, DOOR_CLOSED],
+        ),
+        (
+            {CONF_KINDS: ["lock"]},
+            [PIN_UNLOCK, REMOTE_LOCK, AUTO_LOCK],
+        ),
+        (
+            {CONF_STATUSES: ["door_closed", "lock_unlocked"]},
+            [DOOR_CLOSED, PIN_UNLOCK],
+        ),
+        (
+            {CONF_SOURCES: ["auto_lock"]},
+            [AUTO_LOCK],
+        ),
+        (
+            {CONF_REMOTE_TYPES: ["ble"]},
+            [REMOTE_LOCK],
+        ),
+        (
+            {CONF_SLOTS: [3]},
+            [PIN_UNLOCK],
+        ),
+    ],
+    ids=["door", "lock", "statuses", "sources", "remote_types", "slots"],
+)
+def test_compile_activity_filter(
+    rules: dict[str, list], expected: list[DoorActivity | LockActivity]
+) -> None:
+    """Test compiled predicates match the activity of each rule."""
+    activity_filter = compile_activity_filter(rules)
+    assert activity_filter is not None
+
+    assert [
+        activity
+        for activity in (DOOR_OPENED, DOOR_CLOSED, PIN_UNLOCK, REMOTE_LOCK, AUTO_LOCK)
+        if activity_filter(activity)
+    ] == expected
+    assert not activity_filter(UNSUPPORTED)
+
+
+async def test_filtered_activity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test filtered activity is neither recorded nor fired."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    activity_update = activity_update_handler(hass, lock)
+
+    for activity in (DOOR_OPENED, PIN_UNLOCK, DOOR_CLOSED):
+        activity_update(activity, lock_info=None, connection_info=None)
+    await hass.async_block_till_done()
+
+    assert [event.data["state"] for event in events] == ["lock_unlocked"]
+
+    activity_log = config_entry.runtime_data.locks["sensor.front_door_operation"]
+    assert activity_log.received == 3
+    assert activity_log.filtered == 2
+    assert activity_log.recorder_submissions == 1
+
+
+async def test_filters_updated(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test filters are applied to the loaded entry without reloading."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={
+            **config_entry.data,
+            CONF_FILTERS: {"lock.front_door": {CONF_SOURCES: ["pin"]}},
+        },
+    )
+    await hass.async_block_till_done()
+
+    # the activity callback was not registered again by a reload
+    assert activity_update_handler(hass, lock) is activity_update
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+
+    for activity in (DOOR_OPENED, PIN_UNLOCK):
+        activity_update(activity, lock_info=None, connection_info=None)
+    await hass.async_block_till_done()
+
+    assert [event.data["state"] for event in events] == ["door_opened"]
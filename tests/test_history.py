@@ -0,0 +1,270 @@
+"""Test warming Yale Access Bluetooth Activity history."""
+
+import datetime as dt
+import logging
+import time
+from unittest.mock import patch
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.db_schema import (
+    StateAttributes,
+    States,
+    StatesMeta,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+from sqlalchemy import insert
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity.activity_log import (
+    LockActivityLog,
+    ProcessedActivity,
+)
+from custom_components.yalexs_ble_activity.const import (
+    ACTIVITY_HISTORY_SIZE,
+    OPERATION_SENSOR_WRITE_DELAY,
+)
+from custom_components.yalexs_ble_activity.history import load_history
+
+from . import MOCK_UTC_NOW, activity_update_handler, setup_integration
+
+_LOGGER = logging.getLogger(__name__)
+
+BENCHMARK_LOCK_COUNT = 100
+BENCHMARK_ACTIVITY_COUNT = 1000
+
+# ids well clear of rows the recorder writes itself.
+ID_OFFSET = 1_000_000
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: Recorder,
+    enable_custom_integrations,
+):
+    """Enable custom integrations once the recorder is set up."""
+    return
+
+
+@pytest.fixture(autouse=True)
+def mock_recorder() -> None:
+    """Use the in-memory recorder rather than a mock."""
+    return
+
+
+def _processed(seconds: int, state: str) -> ProcessedActivity:
+    return ProcessedActivity(
+        processed_at=None,
+        timestamp=MOCK_UTC_NOW + dt.timedelta(seconds=seconds),
+        state=state,
+    )
+
+
+def test_restore_history() -> None:
+    """Test restored history predates & skips activity processed since startup."""
+    log = LockActivityLog("mock-address")
+    log.recent.append(_processed(2, "lock_locked"))
+
+    log.restore(
+        [
+            _processed(0, "lock_unlocked"),
+            _processed(1, "door_opened"),
+            _processed(2, "lock_locked"),
+        ]
+    )
+
+    assert [activity.state for activity in log.recent] == [
+        "lock_unlocked",
+        "door_opened",
+        "lock_locked",
+    ]
+
+
+async def test_warm_history(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test recent activity is restored from the recorder after a reload."""
+    await setup_integration(hass, config_entry)
+
+    utcnow = dt_util.utcnow()
+    activity_update = activity_update_handler(hass, lock)
+    activity_update(
+        LockActivity(
+            timestamp=utcnow - dt.timedelta(minutes=2),
+            status=LockStatus.UNLOCKED,
+            source=LockOperationSource.PIN,
+            remote_type=LockOperationRemoteType.UNKNOWN,
+            slot=3,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    activity_update(
+        DoorActivity(
+            timestamp=utcnow - dt.timedelta(minutes=1),
+            status=DoorStatus.OPENED,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+    async_fire_time_changed(
+        hass, utcnow + dt.timedelta(seconds=OPERATION_SENSOR_WRITE_DELAY)
+    )
+    await async_wait_recording_done(hass)
+
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    log = config_entry.runtime_data.locks["sensor.front_door_operation"]
+    assert list(log.recent) == [
+        ProcessedActivity(
+            processed_at=None,
+            timestamp=utcnow - dt.timedelta(minutes=2),
+            state="lock_unlocked",
+            source="pin",
+            remote_type="unknown",
+            slot=3,
+        ),
+        ProcessedActivity(
+            processed_at=None,
+            timestamp=utcnow - dt.timedelta(minutes=1),
+            state="door_opened",
+        ),
+    ]
+
+    # the calendar is seeded from the restored history.
+    state = hass.states.get("calendar.front_door_activity")
+    assert state
+    assert state.state == STATE_ON
+    assert state.attributes["message"] == "Door open"
+
+
+async def test_warm_history_without_activity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test warming history for locks without recorded activity."""
+    with patch(
+        "custom_components.yalexs_ble_activity.history.load_history",
+        wraps=load_history,
+    ) as load_history_mock:
+        await setup_integration(hass, config_entry)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    load_history_mock.assert_called_once()
+    assert not config_entry.runtime_data.locks["sensor.front_door_operation"].recent
+
+
+async def test_load_history_benchmark(
+    hass: HomeAssistant,
+    recorder_mock: Recorder,
+) -> None:
+    """Test loading the history of many locks with a single query."""
+    base = MOCK_UTC_NOW.timestamp()
+    entity_ids = [
+        f"sensor.lock_{index}_operation" for index in range(BENCHMARK_LOCK_COUNT)
+    ]
+
+    def _insert_activity() -> None:
+        metadata = [
+            {"metadata_id": ID_OFFSET + index, "entity_id": entity_id}
+            for index, entity_id in enumerate(entity_ids)
+        ]
+        attributes = []
+        states = []
+
+        for meta in metadata:
+            for index in range(BENCHMARK_ACTIVITY_COUNT):
+                attributes_id = ID_OFFSET + len(attributes)
+                timestamp = base + index
+                attributes.append(
+                    {
+                        "attributes_id": attributes_id,
+                        "hash": attributes_id,
+                        "shared_attrs": json_dumps(
+                            {
+                                "timestamp": dt_util.utc_from_timestamp(
+                                    timestamp
+                                ).isoformat(),
+                                "source": "manual",
+                            }
+                        ),
+                    }
+                )
+                states.append(
+                    {
+                        "metadata_id": meta["metadata_id"],
+                        "state": "lock_locked" if index % 2 else "lock_unlocked",
+                        "attributes_id": attributes_id,
+                        "last_updated_ts": timestamp,
+                    }
+                )
+
+        # a row without an activity timestamp is skipped.
+        attributes.append(
+            {
+                "attributes_id": ID_OFFSET + len(attributes),
+                "hash": 0,
+                "shared_attrs": "{}",
+            }
+        )
+        states.append(
+            {
+                "metadata_id": ID_OFFSET,
+                "state": "lock_locked",
+                "attributes_id": ID_OFFSET + len(attributes) - 1,
+                "last_updated_ts": base + BENCHMARK_ACTIVITY_COUNT,
+            }
+        )
+
+        with session_scope(session=recorder_mock.get_session()) as session:
+            session.execute(insert(StatesMeta), metadata)
+            session.execute(insert(StateAttributes), attributes)
+            session.execute(insert(States), states)
+
+    await async_wait_recording_done(hass)
+    await recorder_mock.async_add_executor_job(_insert_activity)
+
+    started = time.perf_counter()
+    history = await recorder.get_instance(hass).async_add_executor_job(
+        load_history, recorder_mock, entity_ids, ACTIVITY_HISTORY_SIZE
+    )
+    duration = time.perf_counter() - started
+
+    _LOGGER.info(
+        "loaded history of %s locks x %s activities in %.3fs",
+        BENCHMARK_LOCK_COUNT,
+        BENCHMARK_ACTIVITY_COUNT,
+        duration,
+    )
+
+    assert len(history) == BENCHMARK_LOCK_COUNT
+    assert {len(activities) for activities in history.values()} == {
+        ACTIVITY_HISTORY_SIZE
+    }
+    assert history[entity_ids[0]][-1].timestamp == dt_util.utc_from_timestamp(
+        base + BENCHMARK_ACTIVITY_COUNT - 1
+    )
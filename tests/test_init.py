@@ -1,6 +1,6 @@
 """Test component setup."""
 
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant
@@ -15,10 +15,19 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 from syrupy.assertion import SnapshotAssertion
 from syrupy.filters import props
 
-from custom_components.yalexs_ble_activity import YALEXSBLE_VERSION
-from custom_components.yalexs_ble_activity.const import CONF_LOCK_ENTITIES, DOMAIN
+from custom_components.yalexs_ble_activity import (
+    YALEXSBLE_VERSION,
+    entity as entity_module,
+)
+from custom_components.yalexs_ble_activity.const import (
+    CONF_FILTERS,
+    CONF_KINDS,
+    CONF_LOCK_ENTITIES,
+    CONF_RETENTION_DAYS,
+    DOMAIN,
+)
 
-from . import setup_integration
+from . import add_mock_lock, setup_added_integration, setup_integration
 
 
 async def test_async_setup(hass: HomeAssistant):
@@ -84,6 +93,9 @@ async def test_patching_yalexs_ble(
         del push_lock_class_mock.register_activity_callback
 
         await setup_integration(hass, config_entry)
+        assert config_entry.state is ConfigEntryState.SETUP_RETRY
+
+        await hass.async_block_till_done(wait_background_tasks=True)
         assert config_entry.state is ConfigEntryState.SETUP_ERROR
         assert expected_error in caplog.text
 
@@ -108,6 +120,184 @@ async def test_renamed_lock_entity(
     await hass.async_block_till_done()
     assert config_entry.data[CONF_LOCK_ENTITIES] == [f"{lock.entity_id}_renamed"]
 
+    # tracking follows the renamed lock
+    entity_registry.async_update_entity(
+        f"{lock.entity_id}_renamed",
+        new_entity_id=f"{lock.entity_id}_renamed_again",
+    )
+    await hass.async_block_till_done()
+    assert config_entry.data[CONF_LOCK_ENTITIES] == [f"{lock.entity_id}_renamed_again"]
+
+    # the entry was not reloaded & the sensor is unchanged
+    assert _update_requests(hass, lock) == 1
+    assert entity_registry.async_get("sensor.front_door_operation")
+
+
+async def test_renamed_lock_entity_filters(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test the filters of a renamed lock entity follow the lock."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={
+            CONF_LOCK_ENTITIES: [lock.entity_id],
+            CONF_FILTERS: {lock.entity_id: {CONF_KINDS: ["door"]}},
+        },
+    )
+    await setup_integration(hass, config_entry)
+
+    entity_registry.async_update_entity(
+        lock.entity_id,
+        new_entity_id=f"{lock.entity_id}_renamed",
+    )
+    await hass.async_block_till_done()
+
+    assert config_entry.data[CONF_FILTERS] == {
+        f"{lock.entity_id}_renamed": {CONF_KINDS: ["door"]}
+    }
+    assert config_entry.runtime_data.filters
+    assert _update_requests(hass, lock) == 1
+
+
+async def test_added_lock_entity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test adding a lock only sets up the sensor for that lock."""
+    await setup_integration(hass, config_entry)
+
+    back_door_lock = add_mock_lock(hass, "lock.back_door")
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={
+            **config_entry.data,
+            CONF_LOCK_ENTITIES: [lock.entity_id, back_door_lock.entity_id],
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert _update_requests(hass, lock) == 1
+    assert entity_registry.async_get("sensor.back_door_operation")
+    assert hass.states.get("sensor.back_door_operation")
+
+
+async def test_removed_lock_entity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    device_registry: dr.DeviceRegistry,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test removing a lock only removes the sensor for that lock."""
+    back_door_lock = add_mock_lock(hass, "lock.back_door")
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={CONF_LOCK_ENTITIES: [lock.entity_id, back_door_lock.entity_id]},
+    )
+    await setup_added_integration(hass, config_entry)
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={CONF_LOCK_ENTITIES: [lock.entity_id]},
+    )
+    await hass.async_block_till_done()
+
+    assert _update_requests(hass, lock) == 1
+    assert entity_registry.async_get("sensor.front_door_operation")
+    assert not entity_registry.async_get("sensor.back_door_operation")
+    assert not hass.states.get("sensor.back_door_operation")
+    assert entity_registry.async_get("event.front_door_activity")
+    assert not entity_registry.async_get("event.back_door_activity")
+    assert entity_registry.async_get("calendar.front_door_activity")
+    assert not entity_registry.async_get("calendar.back_door_activity")
+    assert "sensor.back_door_operation" not in config_entry.runtime_data.locks
+
+    back_door_device = device_registry.async_get(back_door_lock.device_id)
+    assert back_door_device
+    assert config_entry.entry_id not in back_door_device.config_entries
+
+
+async def test_removed_lock_entity_with_reload(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    device_registry: dr.DeviceRegistry,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Test a lock removed along with other changes is removed on reload."""
+    back_door_lock = add_mock_lock(hass, "lock.back_door")
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={CONF_LOCK_ENTITIES: [lock.entity_id, back_door_lock.entity_id]},
+    )
+    await setup_added_integration(hass, config_entry)
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={CONF_LOCK_ENTITIES: [lock.entity_id], CONF_RETENTION_DAYS: 30},
+    )
+    await hass.async_block_till_done()
+
+    assert _update_requests(hass, lock) == 2
+    assert entity_registry.async_get("sensor.front_door_operation")
+    assert entity_registry.async_get("calendar.front_door_activity")
+
+    for entity_id in (
+        "sensor.back_door_operation",
+        "event.back_door_activity",
+        "calendar.back_door_activity",
+    ):
+        assert not entity_registry.async_get(entity_id)
+        assert not hass.states.get(entity_id)
+
+    back_door_device = device_registry.async_get(back_door_lock.device_id)
+    assert back_door_device
+    assert config_entry.entry_id not in back_door_device.config_entries
+
+    front_door_device = device_registry.async_get(lock.device_id)
+    assert front_door_device
+    assert config_entry.entry_id in front_door_device.config_entries
+
+
+async def test_remove_entity_without_registry_entry(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test removing an entity that was never registered is ignored."""
+    await setup_integration(hass, config_entry)
+
+    entity_module._async_remove_entity(hass, config_entry, Mock(registry_entry=None))
+
+    assert hass.states.get("sensor.front_door_operation")
+
+
+async def test_changed_entry_data_reloads(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test changes other than the locks reload the entry."""
+    await setup_integration(hass, config_entry)
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={**config_entry.data, CONF_RETENTION_DAYS: 30},
+    )
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert _update_requests(hass, lock) == 2
+    assert config_entry.runtime_data.retention is not None
+
 
 async def test_create_removed_lock_entity_issue(
     hass: HomeAssistant,
@@ -129,3 +319,42 @@ async def test_create_removed_lock_entity_issue(
         DOMAIN,
         f"lock_entity_removed_{lock.entity_id}",
     )
+
+
+async def test_multiple_entries(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test locks sharded across entries are reloaded independently."""
+    back_door_lock = add_mock_lock(hass, "lock.back_door")
+    shard_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Building B",
+        data={CONF_LOCK_ENTITIES: [back_door_lock.entity_id]},
+    )
+
+    await setup_integration(hass, config_entry)
+    await setup_integration(hass, shard_entry)
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert shard_entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("sensor.front_door_operation")
+    assert hass.states.get("sensor.back_door_operation")
+    assert config_entry.runtime_data.drain is not shard_entry.runtime_data.drain
+
+    assert await hass.config_entries.async_reload(shard_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert _update_requests(hass, lock) == 1
+    assert _update_requests(hass, back_door_lock) == 2
+    assert list(config_entry.runtime_data.locks) == ["sensor.front_door_operation"]
+    assert list(shard_entry.runtime_data.locks) == ["sensor.back_door_operation"]
+
+
+def _update_requests(hass: HomeAssistant, lock: er.RegistryEntry) -> int:
+    core_entry = hass.config_entries.async_get_known_entry(lock.config_entry_id)
+    return sum(
+        call.kwargs["request_update"]
+        for call in core_entry.runtime_data.lock.register_activity_callback.call_args_list
+    )
@@ -0,0 +1,230 @@
+"""Test installing the patched yalexs-ble package."""
+
+from collections.abc import Generator
+import datetime as dt
+import logging
+from pathlib import Path
+import threading
+import time
+from typing import Any
+from unittest.mock import Mock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.yalexs_ble_activity import YALEXSBLE_VERSION
+from custom_components.yalexs_ble_activity.const import (
+    DOMAIN,
+    PATCH_UNAVAILABLE_RETRY,
+    YALEXSBLE_PATCH_URL,
+)
+from custom_components.yalexs_ble_activity.installer import STORAGE_KEY, STORAGE_VERSION
+
+from . import MOCK_UTC_NOW, setup_integration
+
+_LOGGER = logging.getLogger(__name__)
+
+PATCH_URL = YALEXSBLE_PATCH_URL.format(version=YALEXSBLE_VERSION)
+
+
+@pytest.fixture(name="wheel_dir")
+def mock_wheel_dir(tmp_path: Path) -> Path:
+    """Return a local wheel directory standing in for a package index."""
+    wheel_dir = tmp_path / DOMAIN / "wheels"
+    wheel_dir.mkdir(parents=True)
+    return wheel_dir
+
+
+@pytest.fixture(name="install_package")
+def mock_install_package() -> Generator[Mock]:
+    """Mock installing packages on an unpatched yalexs-ble."""
+    with (
+        patch("yalexs_ble.PushLock") as push_lock_class_mock,
+        patch("homeassistant.util.package.install_package") as install_package,
+    ):
+        del push_lock_class_mock.register_activity_callback
+        yield install_package
+
+
+def _cached(status: str, checked: dt.datetime) -> dict[str, Any]:
+    return {
+        "version": STORAGE_VERSION,
+        "key": STORAGE_KEY,
+        "data": {
+            "versions": {
+                YALEXSBLE_VERSION: {
+                    "status": status,
+                    "requirement": None,
+                    "checked": checked.isoformat(),
+                    "install_time": 1.0,
+                },
+            },
+        },
+    }
+
+
+async def test_install_local_wheel(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    wheel_dir: Path,
+    install_package: Mock,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test patched wheels in the local wheel directory are installed first."""
+    (wheel_dir / "yalexs_ble-0.0.1+patches.1-py3-none-any.whl").touch()
+    (wheel_dir / f"yalexs_ble-{YALEXSBLE_VERSION}-py3-none-any.whl").touch()
+    (wheel_dir / f"yalexs_ble-{YALEXSBLE_VERSION}+patches.invalid.whl").touch()
+    (wheel_dir / f"yalexs_ble-{YALEXSBLE_VERSION}+patches.2-py3-none-any.whl").touch()
+    wheel = wheel_dir / f"yalexs_ble-{YALEXSBLE_VERSION}+patches.10-py3-none-any.whl"
+    wheel.touch()
+    install_package.return_value = True
+
+    await setup_integration(hass, config_entry)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    install_package.assert_called_once_with(str(wheel))
+
+    result = hass_storage[STORAGE_KEY]["data"]["versions"][YALEXSBLE_VERSION]
+    assert result["status"] == "installed"
+    assert result["requirement"] == str(wheel)
+
+
+async def test_install_falls_back_to_source(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    wheel_dir: Path,
+    install_package: Mock,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test patches are built from source when local wheels fail to install."""
+    wheel = wheel_dir / f"yalexs_ble-{YALEXSBLE_VERSION}+patches.1-py3-none-any.whl"
+    wheel.touch()
+    install_package.side_effect = [False, False]
+
+    await setup_integration(hass, config_entry)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    assert [call.args for call in install_package.call_args_list] == [
+        (str(wheel),),
+        (PATCH_URL,),
+    ]
+
+    result = hass_storage[STORAGE_KEY]["data"]["versions"][YALEXSBLE_VERSION]
+    assert result["status"] == "unavailable"
+    assert result["requirement"] is None
+
+
+@pytest.mark.parametrize(
+    ("status", "checked", "install_count"),
+    [
+        ("installed", MOCK_UTC_NOW - dt.timedelta(days=30), 1),
+        ("unavailable", MOCK_UTC_NOW - dt.timedelta(hours=1), 0),
+        ("unavailable", MOCK_UTC_NOW - PATCH_UNAVAILABLE_RETRY, 1),
+    ],
+    ids=["installed_stale", "unavailable", "unavailable_expired"],
+)
+async def test_cached_install(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    install_package: Mock,
+    hass_storage: dict[str, Any],
+    freezer: FrozenDateTimeFactory,
+    status: str,
+    checked: dt.datetime,
+    install_count: int,
+) -> None:
+    """Test cached results avoid installs until unavailable patches expire.
+
+    Patches cached as installed by an earlier run are never current since
+    yalexs-ble is still unpatched.
+    """
+    freezer.move_to(MOCK_UTC_NOW)
+    hass_storage[STORAGE_KEY] = _cached(status, checked)
+    install_package.return_value = False
+
+    await setup_integration(hass, config_entry)
+
+    assert config_entry.state is (
+        ConfigEntryState.SETUP_RETRY if install_count else ConfigEntryState.SETUP_ERROR
+    )
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    assert install_package.call_count == install_count
+
+
+async def test_install_off_setup_path(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    install_package: Mock,
+) -> None:
+    """Test a slow install does not block setup."""
+    release = threading.Event()
+
+    def _install_package(requirement: str) -> bool:
+        release.wait(10)
+        return True
+
+    install_package.side_effect = _install_package
+
+    started = time.perf_counter()
+    await setup_integration(hass, config_entry)
+    duration = time.perf_counter() - started
+
+    _LOGGER.info("setup with install in progress took %.3fs", duration)
+
+    assert config_entry.state is ConfigEntryState.SETUP_RETRY
+    assert not release.is_set()
+
+    release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    install_package.assert_called_once_with(PATCH_URL)
+
+
+async def test_reinstall_stale_install(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    install_package: Mock,
+    hass_storage: dict[str, Any],
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test patches lost since an earlier install are installed again."""
+    freezer.move_to(MOCK_UTC_NOW)
+    hass_storage[STORAGE_KEY] = _cached(
+        "installed", MOCK_UTC_NOW - dt.timedelta(days=1)
+    )
+    install_package.return_value = True
+
+    await setup_integration(hass, config_entry)
+
+    assert config_entry.state is ConfigEntryState.SETUP_RETRY
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    install_package.assert_called_once_with(PATCH_URL)
+
+    result = hass_storage[STORAGE_KEY]["data"]["versions"][YALEXSBLE_VERSION]
+    assert result["requirement"] == PATCH_URL
+    assert result["checked"] == MOCK_UTC_NOW.isoformat()
+
+    # patches installed since startup only need a restart.
+    await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    assert install_package.call_count == 1
@@ -0,0 +1,182 @@
+"""Test Yale Access Bluetooth Activity write-ahead journal."""
+
+import logging
+from pathlib import Path
+import time
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yalexs_ble import LockActivity
+from yalexs_ble.const import LockOperationRemoteType, LockOperationSource, LockStatus
+
+from custom_components.yalexs_ble_activity.const import DOMAIN
+from custom_components.yalexs_ble_activity.journal import (
+    ActivityJournal,
+    activity_as_dict,
+)
+
+from . import MOCK_UTC_NOW, activity_update_handler, setup_integration
+from .fake_push_lock import make_activities
+from .replay import async_replay
+
+_LOGGER = logging.getLogger(__name__)
+
+BENCHMARK_SIZE = 10_000
+FRONT_DOOR_KEY = "mock_address_front_dooroperation"
+UNLOCKED = LockActivity(
+    timestamp=MOCK_UTC_NOW,
+    status=LockStatus.UNLOCKED,
+    source=LockOperationSource.PIN,
+    remote_type=LockOperationRemoteType.UNKNOWN,
+    slot=3,
+)
+
+
+def _journal_path(hass: HomeAssistant, config_entry: MockConfigEntry) -> Path:
+    return Path(hass.config.path(DOMAIN, "journal", f"{config_entry.entry_id}.jsonl"))
+
+
+async def test_replay_after_reload(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity pending at unload is written after a reload."""
+    await setup_integration(hass, config_entry)
+
+    activity_update_handler(hass, lock)(UNLOCKED, lock_info=None, connection_info=None)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.front_door_operation").state == "unknown"
+    assert config_entry.runtime_data.journal.as_dict()["pending"] == 1
+
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.front_door_operation")
+    assert state.state == "lock_unlocked"
+    assert state.attributes["slot"] == 3
+
+    journal = config_entry.runtime_data.journal
+    await journal.async_sync()
+    assert journal.as_dict() == {
+        "pending": 0,
+        "buffered": 0,
+        "appended": 1,
+        "syncs": 1,
+        "compactions": 0,
+        "replayed": 1,
+    }
+
+    # written activity is not replayed again.
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.runtime_data.journal.replayed == 0
+    assert _journal_path(hass, config_entry).read_bytes() == b""
+
+
+async def test_unreadable_lines(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test torn lines & activity of removed locks are discarded."""
+    path = _journal_path(hass, config_entry)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(
+        b"".join(
+            [
+                json_bytes(
+                    {"key": "removed_lock", "activity": activity_as_dict(UNLOCKED)}
+                ),
+                b"\n",
+                json_bytes(
+                    {"key": FRONT_DOOR_KEY, "activity": activity_as_dict(UNLOCKED)}
+                ),
+                b"\n",
+                json_bytes(
+                    {
+                        "key": FRONT_DOOR_KEY,
+                        "activity": {
+                            "type": "keypad",
+                            "timestamp": MOCK_UTC_NOW.isoformat(),
+                        },
+                    }
+                ),
+                b"\n",
+                b'{"key": "mock_address_front_dooroperation", "activ',
+            ]
+        )
+    )
+
+    await setup_integration(hass, config_entry)
+
+    assert hass.states.get("sensor.front_door_operation").state == "lock_unlocked"
+
+    journal = config_entry.runtime_data.journal
+    await journal.async_sync()
+    assert journal.as_dict()["pending"] == 0
+    assert journal.replayed == 1
+
+    # the journal was compacted to the pending activity on load.
+    restored = ActivityJournal(hass, config_entry)
+    await restored.async_load()
+    assert restored.async_take_restored(FRONT_DOOR_KEY) is None
+    assert restored.async_take_restored("removed_lock") is None
+
+
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_BURST", 10_000)
+async def test_journal_benchmark(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test the overhead of journaling a large replay.
+
+    Appends are batched, so a replay is written & fsynced far fewer times than
+    activity is journaled.
+    """
+    await setup_integration(hass, config_entry)
+
+    journal = config_entry.runtime_data.journal
+    append_time = 0.0
+    async_append = journal.async_append
+
+    def _timed_append(*args: object) -> None:
+        nonlocal append_time
+
+        started = time.perf_counter()
+        async_append(*args)  # type: ignore[arg-type]
+        append_time += time.perf_counter() - started
+
+    with patch.object(journal, "async_append", _timed_append):
+        report = await async_replay(
+            hass,
+            activity_update_handler(hass, lock),
+            make_activities(BENCHMARK_SIZE, MOCK_UTC_NOW),
+        )
+
+    started = time.perf_counter()
+    await journal.async_sync()
+    sync_time = time.perf_counter() - started
+
+    _LOGGER.info(
+        "replayed %s activities in %.3fs; journaled in %.4fs (%.2fus per activity) "
+        "with %s syncs & %s compactions, waited %.4fs for the final sync",
+        report.count,
+        report.duration,
+        append_time,
+        append_time / journal.appended * 1_000_000,
+        journal.syncs,
+        journal.compactions,
+        sync_time,
+    )
+
+    assert report.count == BENCHMARK_SIZE
+    assert journal.appended == BENCHMARK_SIZE
+    assert journal.syncs < journal.appended
+    assert journal.as_dict()["pending"] == 1
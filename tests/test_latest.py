@@ -0,0 +1,160 @@
+"""Test Yale Access Bluetooth Activity latest activity."""
+
+import datetime as dt
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity.activity_log import (
+    LockActivityLog,
+    ProcessedActivity,
+)
+from custom_components.yalexs_ble_activity.const import (
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+    OPERATION_SENSOR_WRITE_DELAY,
+)
+
+from . import (
+    MOCK_UTC_NOW,
+    MockNow,
+    activity_update_handler,
+    add_mock_lock,
+    setup_integration,
+)
+
+
+async def _async_get_latest(hass: HomeAssistant, **data: Any) -> dict:
+    return await hass.services.async_call(
+        DOMAIN, "get_latest", data, blocking=True, return_response=True
+    )
+
+
+def test_restore_latest() -> None:
+    """Test restored history provides the latest activity until it's written."""
+    log = LockActivityLog("mock-address")
+    restored = [
+        ProcessedActivity(None, MOCK_UTC_NOW, "lock_unlocked"),
+        ProcessedActivity(None, MOCK_UTC_NOW, "lock_locked"),
+    ]
+
+    log.restore([])
+    assert log.latest is None
+
+    log.restore(restored)
+    assert log.latest == restored[-1]
+
+    written = ProcessedActivity(MOCK_UTC_NOW, MOCK_UTC_NOW, "door_opened")
+    log.latest = written
+    log.restore(restored)
+    assert log.latest == written
+
+
+async def test_get_latest(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test getting the latest activity of all or specific locks."""
+    back_door = add_mock_lock(hass, "lock.back_door")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={CONF_LOCK_ENTITIES: [lock.entity_id, back_door.entity_id]},
+    )
+    await setup_integration(hass, config_entry)
+
+    activity_update_handler(hass, lock)(
+        LockActivity(
+            timestamp=MOCK_UTC_NOW,
+            status=LockStatus.UNLOCKED,
+            source=LockOperationSource.PIN,
+            remote_type=LockOperationRemoteType.UNKNOWN,
+            slot=3,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    assert await _async_get_latest(hass) == {
+        "locks": {
+            "sensor.front_door_operation": {
+                "activity": None,
+                "pending": True,
+                "received": 1,
+                "events_fired": 1,
+                "states_written": 0,
+            },
+            "sensor.back_door_operation": {
+                "activity": None,
+                "pending": False,
+                "received": 0,
+                "events_fired": 0,
+                "states_written": 0,
+            },
+        }
+    }
+
+    now._tick(OPERATION_SENSOR_WRITE_DELAY)
+    await hass.async_block_till_done()
+
+    assert await _async_get_latest(hass, entity_id="sensor.front_door_operation") == {
+        "locks": {
+            "sensor.front_door_operation": {
+                "activity": {
+                    "state": "lock_unlocked",
+                    "timestamp": MOCK_UTC_NOW.isoformat(),
+                    "source": "pin",
+                    "remote_type": "unknown",
+                    "slot": 3,
+                    "processed_at": (
+                        MOCK_UTC_NOW
+                        + dt.timedelta(seconds=OPERATION_SENSOR_WRITE_DELAY)
+                    ).isoformat(),
+                },
+                "pending": False,
+                "received": 1,
+                "events_fired": 1,
+                "states_written": 1,
+            },
+        }
+    }
+
+    activity_update_handler(hass, back_door)(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+        lock_info=None,
+        connection_info=None,
+    )
+    now._tick(OPERATION_SENSOR_WRITE_DELAY)
+    await hass.async_block_till_done()
+
+    response = await _async_get_latest(hass, entity_id="sensor.back_door_operation")
+    activity = response["locks"]["sensor.back_door_operation"]["activity"]
+    assert activity["state"] == "door_opened"
+    assert activity["source"] is None
+
+
+async def test_get_latest_invalid_entity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test getting the latest activity fails for other entities."""
+    await setup_integration(hass, config_entry)
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await _async_get_latest(hass, entity_id="event.front_door_activity")
+
+    assert exc_info.value.translation_key == "invalid_entity"
@@ -0,0 +1,414 @@
+"""Load test Yale Access Bluetooth Activity against simulated locks."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Generator
+import datetime as dt
+import logging
+import math
+from pathlib import Path
+import sys
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.restore_state import RestoredExtraData
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from yalexs_ble import DoorActivity, LockActivity
+
+import custom_components.yalexs_ble_activity
+from custom_components.yalexs_ble_activity.const import (
+    ATTR_REMOTE_TYPE,
+    ATTR_SLOT,
+    ATTR_SOURCE,
+    ATTR_TIMESTAMP,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+    EVENT_ACTIVITY,
+    OPERATION_SENSOR_WRITE_DELAY,
+)
+
+from . import MOCK_UTC_NOW, setup_integration
+from .fake_push_lock import FakePushLock, add_fake_lock, make_activities
+
+_LOGGER = logging.getLogger(__name__)
+
+INTEGRATION_PATH = Path(custom_components.yalexs_ble_activity.__file__).parent
+
+LOAD_LOCK_COUNT = 100
+LOAD_BACKLOG_SIZE = 20
+LOAD_STORM_ROUNDS = 3
+LOAD_STORM_SIZE = 5
+LOAD_JITTER = 0.002
+LOAD_TIMEOUT = 60
+LOOP_MONITOR_INTERVAL = 0.01
+SENSOR_MEMORY_LOCK_COUNT = 500
+SENSOR_MEMORY_BACKLOG_SIZE = 4
+SENSOR_MEMORY_FRAMES = 25
+
+
+class CountingRecorder:
+    """A recorder that counts queued tasks without keeping them."""
+
+    def __init__(self) -> None:
+        """Initialize the recorder."""
+        self.tasks = 0
+
+    def queue_task(self, task: object) -> None:  # noqa: ARG002
+        """Count a queued task."""
+        self.tasks += 1
+
+
+class ActivityCounter:
+    """Count activity events without keeping them."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the counter."""
+        self.count = 0
+        self._target = 0
+        self._reached = asyncio.Event()
+        hass.bus.async_listen(EVENT_ACTIVITY, self._async_count)
+
+    @callback
+    def _async_count(self, event: Event) -> None:  # noqa: ARG002
+        self.count += 1
+
+        if self.count >= self._target:
+            self._reached.set()
+
+    async def async_wait(self, hass: HomeAssistant, count: int) -> None:
+        """Wait until a number of activity events have been fired."""
+        self._target = count
+        self._reached.clear()
+
+        if self.count < count:
+            async with asyncio.timeout(LOAD_TIMEOUT):
+                await self._reached.wait()
+
+        await hass.async_block_till_done()
+
+
+@pytest.fixture(name="recorder_instance")
+def mock_recorder_instance() -> Generator[CountingRecorder]:
+    """Mock the recorder instance to count queued tasks.
+
+    Yields:
+        The recorder instance.
+    """
+    recorder_instance = CountingRecorder()
+
+    with patch(
+        "homeassistant.components.recorder.get_instance",
+        return_value=recorder_instance,
+    ):
+        yield recorder_instance
+
+
+@pytest.fixture(autouse=True)
+def fast_drain() -> Generator[None]:
+    """Finish drains soon after locks stop sending activity."""
+    with (
+        patch("custom_components.yalexs_ble_activity.drain.DRAIN_IDLE_TIMEOUT", 0.05),
+        patch("custom_components.yalexs_ble_activity.drain.DRAIN_TIMEOUT", 10),
+    ):
+        yield
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop runs a periodic wakeup."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the monitor."""
+        self.lags: list[float] = []
+        self._task = hass.async_create_background_task(
+            self._async_monitor(), "loop lag monitor"
+        )
+
+    async def _async_monitor(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LOOP_MONITOR_INTERVAL)
+            self.lags.append(loop.time() - started - LOOP_MONITOR_INTERVAL)
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+        self._task.cancel()
+
+    def percentile(self, percent: float) -> float:
+        """Get a lag percentile using the nearest-rank method.
+
+        Returns:
+            The lag in seconds.
+        """
+        ordered = sorted(self.lags)
+        return ordered[max(math.ceil(percent / 100 * len(ordered)), 1) - 1]
+
+
+async def _async_setup_fake_locks(
+    hass: HomeAssistant,
+    count: int,
+    backlog_size: int = LOAD_BACKLOG_SIZE,
+    **kwargs: object,
+) -> tuple[MockConfigEntry, list[FakePushLock]]:
+    fakes: list[FakePushLock] = []
+    lock_entity_ids: list[str] = []
+    backlog_end = dt_util.utcnow() - dt.timedelta(days=1)
+
+    for index in range(count):
+        lock, fake = add_fake_lock(
+            hass,
+            f"lock.lock_{index:03}",
+            backlog=make_activities(backlog_size, backlog_end, slot=index),
+            seed=index,
+            **kwargs,
+        )
+        fakes.append(fake)
+        lock_entity_ids.append(lock.entity_id)
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={CONF_LOCK_ENTITIES: lock_entity_ids},
+    )
+    await setup_integration(hass, config_entry)
+
+    return config_entry, fakes
+
+
+async def test_dropped_connection(
+    hass: HomeAssistant,
+    recorder_instance: CountingRecorder,
+) -> None:
+    """Test a backlog read across dropped connections is processed once."""
+    events = ActivityCounter(hass)
+    config_entry, (fake,) = await _async_setup_fake_locks(hass, 1, drop_after=8)
+
+    await events.async_wait(hass, 8)
+
+    assert fake.update_requests == 1
+    assert fake.drops == 1
+    assert fake.backlog == LOAD_BACKLOG_SIZE - 8
+    assert not fake.connected
+
+    # activity that occurs while disconnected joins the backlog.
+    for activity in make_activities(2, dt_util.utcnow()):
+        fake.push(activity)
+
+    while fake.backlog:
+        fake.async_connect()
+        await fake.async_wait_connected()
+
+    await events.async_wait(hass, LOAD_BACKLOG_SIZE + 2)
+
+    assert fake.delivered == LOAD_BACKLOG_SIZE + 2
+    assert recorder_instance.tasks == LOAD_BACKLOG_SIZE + 2
+
+    activity_log = config_entry.runtime_data.locks["sensor.lock_000_operation"]
+    assert activity_log.received == LOAD_BACKLOG_SIZE + 2
+    assert activity_log.recorder_submissions == LOAD_BACKLOG_SIZE + 2
+
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    assert not fake._activity_callbacks
+
+
+async def test_reconnect_storm(
+    hass: HomeAssistant,
+    recorder_instance: CountingRecorder,
+) -> None:
+    """Test many locks draining & reconnecting at once.
+
+    Every lock drains its backlog at startup, then all locks repeatedly drop
+    their connections, accumulate activity & reconnect together. Event loop
+    lag, memory & the number of recorder tasks are reported & bounded.
+    """
+    events = ActivityCounter(hass)
+    monitor = LoopLagMonitor(hass)
+    tracemalloc.start()
+
+    try:
+        config_entry, fakes = await _async_setup_fake_locks(
+            hass, LOAD_LOCK_COUNT, jitter=LOAD_JITTER
+        )
+        expected = LOAD_LOCK_COUNT * LOAD_BACKLOG_SIZE
+        await events.async_wait(hass, expected)
+        drained_memory, _ = tracemalloc.get_traced_memory()
+
+        for storm in range(LOAD_STORM_ROUNDS):
+            for fake in fakes:
+                fake.disconnect()
+
+                for activity in make_activities(
+                    LOAD_STORM_SIZE,
+                    dt_util.utcnow() + dt.timedelta(minutes=storm),
+                ):
+                    fake.push(activity)
+
+            for fake in fakes:
+                fake.async_connect()
+
+            expected += LOAD_LOCK_COUNT * LOAD_STORM_SIZE
+            await events.async_wait(hass, expected)
+
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        monitor.stop()
+
+    _LOGGER.info(
+        "%s locks processed %s activities; "
+        "loop lag p50 %.4fs p99 %.4fs max %.4fs; "
+        "memory after drain %.1fKiB, after storms %.1fKiB, peak %.1fKiB; "
+        "%s recorder tasks",
+        LOAD_LOCK_COUNT,
+        events.count,
+        monitor.percentile(50),
+        monitor.percentile(99),
+        max(monitor.lags),
+        drained_memory / 1024,
+        current_memory / 1024,
+        peak_memory / 1024,
+        recorder_instance.tasks,
+    )
+
+    assert events.count == expected
+    assert recorder_instance.tasks == expected
+    assert all(fake.update_requests == 1 for fake in fakes)
+    assert all(fake.connections == LOAD_STORM_ROUNDS + 1 for fake in fakes)
+    assert all(
+        activity_log.received == LOAD_BACKLOG_SIZE + LOAD_STORM_ROUNDS * LOAD_STORM_SIZE
+        for activity_log in config_entry.runtime_data.locks.values()
+    )
+
+    # drains are limited to a few locks at a time & backlog is processed in
+    # batches, so the loop stays responsive throughout.
+    assert monitor.percentile(99) < 0.25
+
+    # storms of live activity are bounded by the size of the recent history
+    # kept for each lock rather than growing with activity.
+    assert current_memory - drained_memory < 1024 * LOAD_LOCK_COUNT * 16
+
+
+def _legacy_values(
+    activity: DoorActivity | LockActivity,
+) -> tuple[str | None, dict[str, Any]]:
+    """Get the value & attributes dictionary sensors previously kept."""
+    attributes: dict[str, Any] = {ATTR_TIMESTAMP: activity.timestamp}
+
+    if isinstance(activity, DoorActivity):
+        return (f"door_{activity.status.name.lower()}", attributes)
+
+    attributes[ATTR_SOURCE] = activity.source.name.lower()
+    if activity.remote_type is not None:
+        attributes[ATTR_REMOTE_TYPE] = activity.remote_type.name.lower()
+    if activity.slot is not None:
+        attributes[ATTR_SLOT] = activity.slot
+
+    return (f"lock_{activity.status.name.lower()}", attributes)
+
+
+def _traced_memory[T](build: Callable[[], T]) -> tuple[T, int]:
+    started, _ = tracemalloc.get_traced_memory()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+
+    return result, current - started
+
+
+async def test_sensor_memory(
+    hass: HomeAssistant,
+    recorder_instance: CountingRecorder,
+) -> None:
+    """Test the memory of operation sensors for a large site.
+
+    Memory allocated by the integration is traced across setting up the
+    sensors & processing their backlog. The state each sensor keeps & the
+    restore data it provides are compared with an attributes dictionary per
+    sensor.
+    """
+    events = ActivityCounter(hass)
+    tracemalloc.start(SENSOR_MEMORY_FRAMES)
+
+    try:
+        _, fakes = await _async_setup_fake_locks(
+            hass, SENSOR_MEMORY_LOCK_COUNT, backlog_size=SENSOR_MEMORY_BACKLOG_SIZE
+        )
+        await events.async_wait(
+            hass, SENSOR_MEMORY_LOCK_COUNT * SENSOR_MEMORY_BACKLOG_SIZE
+        )
+
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + dt.timedelta(seconds=OPERATION_SENSOR_WRITE_DELAY)
+        )
+        await hass.async_block_till_done()
+        snapshot = tracemalloc.take_snapshot()
+
+        sensors = [
+            activity_callback.__self__
+            for fake in fakes
+            for activity_callback in fake._activity_callbacks
+        ]
+        legacy_states = [
+            _legacy_values(
+                make_activities(SENSOR_MEMORY_BACKLOG_SIZE, MOCK_UTC_NOW, slot=index)[
+                    -1
+                ]
+            )
+            for index in range(SENSOR_MEMORY_LOCK_COUNT)
+        ]
+        restore_data, restore_memory = _traced_memory(
+            lambda: [sensor.extra_restore_state_data for sensor in sensors]
+        )
+        legacy_restore_data, legacy_restore_memory = _traced_memory(
+            lambda: [
+                RestoredExtraData({"value": value, "attributes": attributes})
+                for value, attributes in legacy_states
+            ]
+        )
+    finally:
+        tracemalloc.stop()
+
+    # memory allocated by the integration, directly or through home assistant.
+    sensor_memory = sum(
+        stat.size
+        for stat in snapshot.filter_traces(
+            [
+                tracemalloc.Filter(
+                    inclusive=True,
+                    filename_pattern=f"{INTEGRATION_PATH}/*",
+                    all_frames=True,
+                )
+            ]
+        ).statistics("filename")
+    )
+    state_memory = sum(sys.getsizeof(sensor._operation) for sensor in sensors)
+    legacy_state_memory = sum(
+        sys.getsizeof(attributes) for _, attributes in legacy_states
+    )
+
+    _LOGGER.info(
+        "%s sensors; %.1fKiB per sensor with its lock's entities & activity; "
+        "state %.1fB per sensor vs %.1fB with an attributes dictionary; "
+        "restore data %.1fB per sensor vs %.1fB",
+        len(sensors),
+        sensor_memory / SENSOR_MEMORY_LOCK_COUNT / 1024,
+        state_memory / SENSOR_MEMORY_LOCK_COUNT,
+        legacy_state_memory / SENSOR_MEMORY_LOCK_COUNT,
+        restore_memory / SENSOR_MEMORY_LOCK_COUNT,
+        legacy_restore_memory / SENSOR_MEMORY_LOCK_COUNT,
+    )
+
+    assert len(sensors) == SENSOR_MEMORY_LOCK_COUNT
+    assert all(sensor.native_value == "lock_locked" for sensor in sensors)
+    assert sensor_memory > 0
+    assert len(restore_data) == len(legacy_restore_data)
+    assert state_memory < legacy_state_memory
+    assert restore_memory < legacy_restore_memory
@@ -0,0 +1,166 @@
+"""Test Yale Access Bluetooth Activity logbook."""
+
+from homeassistant.components.logbook import (
+    LOGBOOK_ENTRY_ENTITY_ID,
+    LOGBOOK_ENTRY_MESSAGE,
+    LOGBOOK_ENTRY_NAME,
+)
+from homeassistant.core import Event, HomeAssistant
+import pytest
+
+from custom_components.yalexs_ble_activity import logbook
+from custom_components.yalexs_ble_activity.const import (
+    DOMAIN,
+    EVENT_ACTIVITY,
+    EVENT_ENTRY,
+)
+
+
+@pytest.mark.parametrize(
+    ("state", "attributes", "expected_message"),
+    [
+        (
+            "lock_unlocked",
+            {"source": "pin", "remote_type": "unknown", "slot": 3},
+            "unlocked via keypad slot 3",
+        ),
+        ("lock_locked", {"source": "auto_lock"}, "locked by auto-lock"),
+        ("lock_locked", {"source": "manual"}, "locked manually"),
+        (
+            "lock_unlocked",
+            {"source": "remote", "remote_type": "ble"},
+            "unlocked remotely (ble)",
+        ),
+        ("lock_locking", {"source": "one_touch"}, "locking via one touch"),
+        ("lock_unknown", {"source": "unknown"}, "lock unknown"),
+        ("door_opened", {}, "door opened"),
+        (None, {}, "unsupported activity"),
+    ],
+    ids=[
+        "pin_unlock",
+        "auto_lock",
+        "manual_lock",
+        "remote_unlock",
+        "other_source",
+        "lock_unknown",
+        "door_opened",
+        "unsupported_activity",
+    ],
+)
+async def test_describe_activity_event(  # noqa: RUF029
+    hass: HomeAssistant,
+    state: str | None,
+    attributes: dict,
+    expected_message: str,
+) -> None:
+    """Test activity events are described."""
+    hass.states.async_set(
+        "sensor.front_door_operation",
+        "unknown",
+        {"friendly_name": "Front door Operation"},
+    )
+    describers = {}
+
+    def _async_describe_event(domain, event_type, describer) -> None:
+        describers[domain, event_type] = describer
+
+    logbook.async_describe_events(hass, _async_describe_event)
+    describe = describers[DOMAIN, EVENT_ACTIVITY]
+
+    assert describe(
+        Event(
+            EVENT_ACTIVITY,
+            {
+                "entity_id": "sensor.front_door_operation",
+                "state": state,
+                "attributes": attributes,
+            },
+        )
+    ) == {
+        LOGBOOK_ENTRY_NAME: "Front door Operation",
+        LOGBOOK_ENTRY_MESSAGE: expected_message,
+        LOGBOOK_ENTRY_ENTITY_ID: "sensor.front_door_operation",
+    }
+
+
+async def test_describe_activity_event_removed_entity(  # noqa: RUF029
+    hass: HomeAssistant,
+) -> None:
+    """Test activity events of entities without a state use the entity ID."""
+    describers = {}
+
+    def _async_describe_event(domain, event_type, describer) -> None:
+        describers[domain, event_type] = describer
+
+    logbook.async_describe_events(hass, _async_describe_event)
+    describe = describers[DOMAIN, EVENT_ACTIVITY]
+
+    assert (
+        describe(
+            Event(
+                EVENT_ACTIVITY,
+                {
+                    "entity_id": "sensor.front_door_operation",
+                    "state": "door_closed",
+                    "attributes": {},
+                },
+            )
+        )[LOGBOOK_ENTRY_NAME]
+        == "sensor.front_door_operation"
+    )
+
+
+def test_describe_activity_cached() -> None:
+    """Test descriptions are built once per combination of values."""
+    logbook.describe_activity.cache_clear()
+
+    for _ in range(1000):
+        logbook.describe_activity("lock_unlocked", "pin", "unknown", 3)
+
+    info = logbook.describe_activity.cache_info()
+    assert info.misses == 1
+    assert info.hits == 999
+
+
+async def test_describe_entry_event(  # noqa: RUF029
+    hass: HomeAssistant,
+) -> None:
+    """Test entry events are described."""
+    hass.states.async_set(
+        "sensor.front_door_operation",
+        "unknown",
+        {"friendly_name": "Front door Operation"},
+    )
+    describers = {}
+
+    def _async_describe_event(domain, event_type, describer) -> None:
+        describers[domain, event_type] = describer
+
+    logbook.async_describe_events(hass, _async_describe_event)
+    describe = describers[DOMAIN, EVENT_ENTRY]
+    event_data = {
+        "source": "pin",
+        "remote_type": "unknown",
+        "slot": 3,
+        "door_open_duration": 12.4,
+    }
+
+    assert describe(
+        Event(
+            EVENT_ENTRY,
+            {"entity_id": "sensor.front_door_operation", **event_data},
+        )
+    ) == {
+        LOGBOOK_ENTRY_NAME: "Front door Operation",
+        LOGBOOK_ENTRY_MESSAGE: "entry unlocked via keypad slot 3, door open for 12 seconds",
+        LOGBOOK_ENTRY_ENTITY_ID: "sensor.front_door_operation",
+    }
+    assert (
+        describe(
+            Event(
+                EVENT_ENTRY,
+                {"entity_id": "sensor.back_door_operation", **event_data},
+            )
+        )[LOGBOOK_ENTRY_NAME]
+        == "sensor.back_door_operation"
+    )
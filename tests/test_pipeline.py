@@ -0,0 +1,156 @@
+"""Test Yale Access Bluetooth Activity processing pipeline."""
+
+import datetime as dt
+import logging
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from yalexs_ble import DoorActivity
+from yalexs_ble.const import DoorStatus
+
+from custom_components.yalexs_ble_activity.const import (
+    DRAIN_TIMEOUT,
+    PIPELINE_BATCH_SIZE,
+)
+from custom_components.yalexs_ble_activity.sensor import YaleXSBLEOperationSensor
+
+from . import MOCK_UTC_NOW, MockNow, activity_update_handler, setup_integration
+
+_LOGGER = logging.getLogger(__name__)
+
+REPLAY_SIZE = 10_000
+
+
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_BURST", 10_000)
+async def test_replay_loop_latency(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test a large replay is prepared off of the event loop."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update = activity_update_handler(hass, lock)
+
+    with patch("homeassistant.components.recorder.get_instance") as mock_get_instance:
+        for index in range(REPLAY_SIZE):
+            activity_update(
+                DoorActivity(
+                    timestamp=MOCK_UTC_NOW + dt.timedelta(seconds=index),
+                    status=DoorStatus.OPENED if index % 2 else DoorStatus.CLOSED,
+                ),
+                lock_info=None,
+                connection_info=None,
+            )
+
+        await hass.async_block_till_done()
+
+    stats = config_entry.runtime_data.pipeline.stats
+
+    _LOGGER.info(
+        "replayed %s activities: loop time %.6fs (max slice %.6fs), "
+        "executor time %.6fs in %s batches",
+        REPLAY_SIZE,
+        stats.loop_time,
+        stats.max_loop_time,
+        stats.executor_time,
+        stats.batches,
+    )
+
+    assert len(events) == REPLAY_SIZE
+    assert mock_get_instance.return_value.queue_task.call_count == REPLAY_SIZE
+    assert stats.enqueued == REPLAY_SIZE
+    assert stats.processed == REPLAY_SIZE
+    assert stats.failed == 0
+    assert stats.batches == REPLAY_SIZE // PIPELINE_BATCH_SIZE
+    assert stats.max_batch_size == PIPELINE_BATCH_SIZE
+    assert stats.max_loop_time <= stats.loop_time
+
+    now._tick(DRAIN_TIMEOUT)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.front_door_operation")
+    assert state
+    assert state.state == "door_opened"
+
+
+async def test_prepare_failure(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+    caplog,
+) -> None:
+    """Test activity that fails to be prepared is not dispatched."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update = activity_update_handler(hass, lock)
+
+    with patch.object(
+        YaleXSBLEOperationSensor,
+        "_extract_values",
+        side_effect=RuntimeError("mock-failure"),
+    ):
+        activity_update(
+            DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+            lock_info=None,
+            connection_info=None,
+        )
+        await hass.async_block_till_done()
+
+    stats = config_entry.runtime_data.pipeline.stats
+
+    assert events == []
+    assert stats.failed == 1
+    assert stats.processed == 0
+    assert "failed to prepare activity" in caplog.text
+
+
+async def test_dispatch_failure(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+    caplog,
+) -> None:
+    """Test activity that fails to be dispatched doesn't stop the rest."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update = activity_update_handler(hass, lock)
+    dispatch_activity = YaleXSBLEOperationSensor._async_dispatch_activity
+    dispatched = []
+
+    def fail_first_dispatch(self: YaleXSBLEOperationSensor, *args: Any) -> None:
+        if not dispatched:
+            dispatched.append(args)
+            raise RuntimeError("mock-failure")
+
+        dispatch_activity(self, *args)
+
+    with patch.object(
+        YaleXSBLEOperationSensor, "_async_dispatch_activity", fail_first_dispatch
+    ):
+        for status in (DoorStatus.OPENED, DoorStatus.CLOSED):
+            activity_update(
+                DoorActivity(timestamp=MOCK_UTC_NOW, status=status),
+                lock_info=None,
+                connection_info=None,
+            )
+        await hass.async_block_till_done()
+
+    stats = config_entry.runtime_data.pipeline.stats
+
+    assert stats.failed == 1
+    assert stats.processed == 1
+    assert "failed to dispatch activity" in caplog.text
+    assert [event.data["state"] for event in events] == ["door_closed"]
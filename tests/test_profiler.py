@@ -0,0 +1,84 @@
+"""Test profiling Yale Access Bluetooth Activity."""
+
+import asyncio
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yalexs_ble import DoorActivity
+from yalexs_ble.const import DoorStatus
+
+from custom_components.yalexs_ble_activity.const import DOMAIN
+
+from . import MOCK_UTC_NOW, activity_update_handler, setup_integration
+
+
+async def test_profile_activities(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test profiling stops after a number of activities."""
+    await setup_integration(hass, config_entry)
+
+    profile = hass.async_create_task(
+        hass.services.async_call(
+            DOMAIN,
+            "profile",
+            {"activities": 2, "duration": 30, "top": 5},
+            blocking=True,
+            return_response=True,
+        )
+    )
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await hass.services.async_call(DOMAIN, "profile", {}, blocking=True)
+
+    assert exc_info.value.translation_key == "profile_in_progress"
+
+    activity_update = activity_update_handler(hass, lock)
+    for status in (DoorStatus.OPENED, DoorStatus.CLOSED):
+        activity_update(
+            DoorActivity(timestamp=MOCK_UTC_NOW, status=status),
+            lock_info=None,
+            connection_info=None,
+        )
+
+    response = await profile
+
+    assert response
+    assert response["activities"] == 2
+    assert len(response["functions"]) <= 5
+    assert Path(response["stats"]).exists()
+
+    summary = Path(response["summary"]).read_text(encoding="utf-8")
+    assert "Profiled 2 activities" in summary
+    assert "_async_activity_update: 2 calls" in summary
+
+
+async def test_profile_duration(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test profiling stops after the duration without activity."""
+    await setup_integration(hass, config_entry)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "profile",
+        {"duration": 0.2},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response
+    assert response["activities"] == 0
+    assert response["duration"] >= 0.2
+
+    summary = Path(response["summary"]).read_text(encoding="utf-8")
+    assert "_async_activity_update: not called" in summary
@@ -0,0 +1,207 @@
+"""Test Yale Access Bluetooth Activity rate limiting."""
+
+import datetime as dt
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er, issue_registry as ir
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from yalexs_ble import LockActivity
+from yalexs_ble.const import LockOperationSource, LockStatus
+
+from custom_components.yalexs_ble_activity.const import (
+    ACTIVITY_RATE_LIMIT_BURST,
+    DOMAIN,
+    EVENT_ACTIVITY,
+    OPERATION_SENSOR_WRITE_DELAY,
+)
+from custom_components.yalexs_ble_activity.rate_limit import ActivityRateLimiter
+
+from . import MOCK_UTC_NOW, MockNow, activity_update_handler, setup_integration
+
+ISSUE_ID = "activity_storm_sensor.front_door_operation"
+
+
+def _lock_activity(seconds: int) -> LockActivity:
+    return LockActivity(
+        timestamp=MOCK_UTC_NOW + dt.timedelta(seconds=seconds),
+        status=LockStatus.LOCKED if seconds % 2 else LockStatus.UNLOCKED,
+        source=LockOperationSource.MANUAL,
+        remote_type=None,
+        slot=None,
+    )
+
+
+def test_rate_limiter(freezer: FrozenDateTimeFactory) -> None:
+    """Test activity beyond the burst is collapsed until tokens refill."""
+    limiter = ActivityRateLimiter(2, 0.5)
+
+    assert limiter.allow(_lock_activity(0))
+    assert limiter.allow(_lock_activity(1))
+    assert not limiter.allow(_lock_activity(3))
+    assert not limiter.allow(_lock_activity(2))
+
+    suppressed = limiter.suppressed
+    assert suppressed is not None
+    assert suppressed.count == 2
+    assert suppressed.since == _lock_activity(2).timestamp
+    assert suppressed.latest == _lock_activity(3)
+
+    freezer.tick(dt.timedelta(seconds=2))
+
+    assert limiter.allow(_lock_activity(4))
+    assert not limiter.allow(_lock_activity(5))
+
+    assert limiter.take_suppressed() is suppressed
+    assert suppressed.count == 3
+    assert limiter.take_suppressed() is None
+
+    freezer.tick(dt.timedelta(hours=1))
+
+    assert limiter.allow(_lock_activity(6))
+    assert limiter.allow(_lock_activity(7))
+    assert not limiter.allow(_lock_activity(8))
+
+
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_RATE", 0)
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_BURST", 3)
+async def test_activity_storm(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+    issue_registry: ir.IssueRegistry,
+) -> None:
+    """Test a storm of activity is collapsed & raises a repair issue."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    activity_update = activity_update_handler(hass, lock)
+
+    for seconds in range(10):
+        activity_update(
+            _lock_activity(seconds),
+            lock_info=None,
+            connection_info=None,
+        )
+    await hass.async_block_till_done()
+
+    assert len(events) == 3
+    assert issue_registry.async_get_issue(DOMAIN, ISSUE_ID)
+
+    activity_log = config_entry.runtime_data.locks["sensor.front_door_operation"]
+    assert activity_log.received == 10
+    assert activity_log.suppressed == 7
+    assert activity_log.storms == 1
+
+    now._tick(60)
+    await hass.async_block_till_done()
+
+    assert len(events) == 4
+    summary = events[-1].data
+    assert summary["state"] == "lock_locked"
+    assert summary["attributes"]["timestamp"] == _lock_activity(9).timestamp.isoformat()
+    assert summary["attributes"]["suppressed"] == 7
+    assert summary["attributes"]["suppressed_since"] == (
+        _lock_activity(3).timestamp.isoformat()
+    )
+    assert issue_registry.async_get_issue(DOMAIN, ISSUE_ID)
+
+    # the summary is written as the state once the write delay passes.
+    now._tick(OPERATION_SENSOR_WRITE_DELAY)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.front_door_operation")
+    assert state
+    assert state.state == "lock_locked"
+
+    activity_update(_lock_activity(10), lock_info=None, connection_info=None)
+    now._tick(60)
+    await hass.async_block_till_done()
+
+    assert len(events) == 5
+    assert events[-1].data["attributes"]["suppressed"] == 1
+    assert activity_log.storms == 1
+
+    now._tick(60)
+    await hass.async_block_till_done()
+
+    assert len(events) == 5
+    assert not issue_registry.async_get_issue(DOMAIN, ISSUE_ID)
+
+
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_RATE", 0)
+async def test_backlog_not_limited(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+    issue_registry: ir.IssueRegistry,
+) -> None:
+    """Test a backlog larger than the burst is processed while draining."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    activity_update = activity_update_handler(hass, lock)
+
+    # twice the burst, all of it older than the drain.
+    for seconds in range(-2 * ACTIVITY_RATE_LIMIT_BURST - 30, -30):
+        activity_update(
+            _lock_activity(seconds),
+            lock_info=None,
+            connection_info=None,
+        )
+    await hass.async_block_till_done()
+
+    assert len(events) == 2 * ACTIVITY_RATE_LIMIT_BURST
+    assert not issue_registry.async_get_issue(DOMAIN, ISSUE_ID)
+
+    activity_log = config_entry.runtime_data.locks["sensor.front_door_operation"]
+    assert activity_log.suppressed == 0
+    assert activity_log.storms == 0
+
+    # live activity is still limited.
+    for seconds in range(ACTIVITY_RATE_LIMIT_BURST + 2):
+        activity_update(
+            _lock_activity(seconds),
+            lock_info=None,
+            connection_info=None,
+        )
+    await hass.async_block_till_done()
+
+    assert len(events) == 3 * ACTIVITY_RATE_LIMIT_BURST
+    assert activity_log.suppressed == 2
+
+
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_RATE", 0)
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_BURST", 1)
+async def test_activity_storm_unload(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+    issue_registry: ir.IssueRegistry,
+) -> None:
+    """Test the storm issue is removed when the entry is unloaded."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+
+    for seconds in range(3):
+        activity_update(
+            _lock_activity(seconds),
+            lock_info=None,
+            connection_info=None,
+        )
+    await hass.async_block_till_done()
+
+    assert issue_registry.async_get_issue(DOMAIN, ISSUE_ID)
+
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert not issue_registry.async_get_issue(DOMAIN, ISSUE_ID)
@@ -0,0 +1,130 @@
+"""Test Yale Access Bluetooth Activity replay harness."""
+
+import math
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from yalexs_ble import LockActivity
+
+from custom_components.yalexs_ble_activity.const import (
+    CONF_FILTERS,
+    CONF_KINDS,
+    CONF_LOCK_ENTITIES,
+    DOMAIN,
+)
+
+from . import activity_update_handler, setup_integration
+from .replay import async_replay, load_activities, save_activities
+
+STREAM_PATH = Path(__file__).parent / "fixtures" / "activity_stream.jsonl"
+STREAM_SIZE = 17
+
+
+def test_load_save_round_trip(tmp_path: Path) -> None:
+    """Test activity streams can be saved & loaded without loss."""
+    activities = load_activities(STREAM_PATH)
+    path = tmp_path / "stream.jsonl"
+
+    save_activities(path, activities)
+
+    assert len(activities) == STREAM_SIZE
+    assert path.read_text(encoding="utf-8") == STREAM_PATH.read_text(encoding="utf-8")
+    assert load_activities(path) == activities
+
+
+async def test_replay_max_speed(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test replaying a stream as fast as possible."""
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    report = await async_replay(
+        hass,
+        activity_update_handler(hass, lock),
+        load_activities(STREAM_PATH),
+    )
+
+    assert len(events) == STREAM_SIZE
+    assert [event.data["state"] for event in events][:3] == [
+        "lock_unlocked",
+        "door_opened",
+        "door_closed",
+    ]
+    assert report.count == STREAM_SIZE
+    assert len(report.latencies) == STREAM_SIZE
+    assert report.throughput > 0
+    assert 0 <= report.percentile(50) <= report.percentile(99)
+    assert report.as_dict()["latency"]["max"] == report.percentile(100)
+
+
+async def test_replay_filtered(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test filtered activity has no latency & doesn't skew later activity."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_FILTERS: {"lock.front_door": {CONF_KINDS: ["door"]}},
+        },
+    )
+    await setup_integration(hass, config_entry)
+
+    activities = load_activities(STREAM_PATH)
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    report = await async_replay(hass, activity_update_handler(hass, lock), activities)
+
+    assert report.count == len(events)
+    assert report.count == sum(
+        isinstance(activity, LockActivity) for activity in activities
+    )
+    assert len(report.latencies) == report.count
+
+
+async def test_replay_empty(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test the report of a replay without activity."""
+    await setup_integration(hass, config_entry)
+
+    report = await async_replay(hass, activity_update_handler(hass, lock), [])
+
+    assert report.count == 0
+    assert math.isnan(report.percentile(50))
+    assert report.as_dict()["latency"] is None
+
+
+async def test_replay_accelerated(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test replaying a stream at an accelerated speed keeps recorded spacing."""
+    await setup_integration(hass, config_entry)
+
+    activities = load_activities(STREAM_PATH)
+    recorded = (activities[-1].timestamp - activities[0].timestamp).total_seconds()
+    speed = recorded / 0.1
+
+    report = await async_replay(
+        hass,
+        activity_update_handler(hass, lock),
+        activities,
+        speed=speed,
+    )
+
+    assert report.count == STREAM_SIZE
+    assert report.duration >= recorded / speed
@@ -0,0 +1,221 @@
+"""Test Yale Access Bluetooth Activity retention."""
+
+import concurrent.futures
+import datetime as dt
+from unittest.mock import Mock, patch
+
+from homeassistant.components.recorder import Recorder
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+from yalexs_ble import LockActivity
+from yalexs_ble.const import LockOperationSource, LockStatus
+
+from custom_components.yalexs_ble_activity import retention as retention_module
+from custom_components.yalexs_ble_activity.const import (
+    CONF_LOCK_ENTITIES,
+    CONF_RETENTION_DAYS,
+    DOMAIN,
+    RETENTION_PURGE_INTERVAL,
+)
+
+from . import activity_update_handler, setup_integration
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: Recorder,
+    enable_custom_integrations,
+):
+    """Enable custom integrations once the recorder is set up."""
+    return
+
+
+@pytest.fixture(autouse=True)
+def mock_recorder() -> None:
+    """Use the in-memory recorder rather than a mock."""
+    return
+
+
+@pytest.fixture(name="config_entry")
+def mock_config_entry() -> MockConfigEntry:
+    """Return a mocked config entry with a retention policy."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={
+            CONF_LOCK_ENTITIES: ["lock.front_door"],
+            CONF_RETENTION_DAYS: 30,
+        },
+    )
+
+
+async def _async_record_activity(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+    days_ago: list[int],
+) -> None:
+    activity_update = activity_update_handler(hass, lock)
+    utcnow = dt_util.utcnow()
+
+    for days in days_ago:
+        activity_update(
+            LockActivity(
+                timestamp=utcnow - dt.timedelta(days=days),
+                status=LockStatus.LOCKED,
+                source=LockOperationSource.MANUAL,
+            ),
+            lock_info=None,
+            connection_info=None,
+        )
+
+    await async_wait_recording_done(hass)
+
+
+async def test_purge_old_activity(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity older than the retention period is purged."""
+    await setup_integration(hass, config_entry)
+    await _async_record_activity(hass, lock, [60, 45, 31, 10, 0])
+
+    retention = config_entry.runtime_data.retention
+    assert sorted(retention._entity_ids()) == [
+        "event.front_door_activity",
+        "sensor.front_door_operation",
+    ]
+
+    run = await retention.async_purge()
+    assert run is not None
+    assert run.rows_removed == 3
+    assert run.chunks == 1
+
+    await async_wait_recording_done(hass)
+
+    run = await retention.async_purge()
+    assert run is not None
+    assert run.rows_removed == 0
+
+    diagnostics = retention.as_dict()
+    assert diagnostics["days"] == 30
+    assert diagnostics["running"] is False
+    assert diagnostics["total_rows_removed"] == 3
+    assert diagnostics["last_run"]["rows_removed"] == 0
+    assert diagnostics["last_run"]["chunks"] == 1
+
+
+async def test_purge_in_chunks(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity is purged in multiple chunks."""
+    await setup_integration(hass, config_entry)
+    await _async_record_activity(hass, lock, [60, 59, 58, 57, 56])
+
+    with patch(
+        "custom_components.yalexs_ble_activity.retention.RETENTION_PURGE_CHUNK_SIZE",
+        2,
+    ):
+        run = await config_entry.runtime_data.retention.async_purge()
+
+    assert run is not None
+    assert run.rows_removed == 5
+    assert run.chunks == 3
+
+
+async def test_purge_without_entities(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test a purge with no entities does not touch the recorder."""
+    await setup_integration(hass, config_entry)
+
+    run = await config_entry.runtime_data.retention.async_purge()
+
+    assert run is not None
+    assert run.rows_removed == 0
+    assert run.chunks == 0
+
+
+async def test_scheduled_purge(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test purges are scheduled periodically."""
+    await setup_integration(hass, config_entry)
+    await _async_record_activity(hass, lock, [45])
+
+    retention = config_entry.runtime_data.retention
+    assert retention.last_run is None
+
+    async_fire_time_changed(hass, dt_util.utcnow() + RETENTION_PURGE_INTERVAL)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert retention.last_run is not None
+    assert retention.last_run.rows_removed == 1
+
+
+async def test_purge_already_running(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test a purge is skipped while another is running."""
+    await setup_integration(hass, config_entry)
+
+    retention = config_entry.runtime_data.retention
+    first = hass.async_create_task(retention.async_purge())
+
+    assert await retention.async_purge() is None
+    assert await first is not None
+
+
+async def test_purge_failure(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test a failed purge is raised & does not stay running."""
+    await setup_integration(hass, config_entry)
+
+    retention = config_entry.runtime_data.retention
+
+    with (
+        patch(
+            "custom_components.yalexs_ble_activity.retention._purge_activity_chunk",
+            side_effect=RuntimeError("mock-failure"),
+        ),
+        pytest.raises(RuntimeError, match="mock-failure"),
+    ):
+        await retention.async_purge()
+
+    assert retention.as_dict()["running"] is False
+    assert retention.last_run is None
+
+
+def test_cancelled_purge_chunk() -> None:
+    """Test a cancelled chunk is not purged."""
+    future: concurrent.futures.Future[int] = concurrent.futures.Future()
+    future.cancel()
+
+    with patch(
+        "custom_components.yalexs_ble_activity.retention._purge_activity_chunk",
+    ) as mock_purge_activity_chunk:
+        retention_module._PurgeActivityChunkTask(
+            ["sensor.front_door_operation"], 0, future
+        ).run(Mock())
+
+    assert not mock_purge_activity_chunk.called
@@ -23,7 +23,9 @@ from yalexs_ble.const import (
     LockStatus,
 )
 
-from . import MOCK_UTC_NOW, MockNow, setup_integration
+from custom_components.yalexs_ble_activity.operation import OperationState
+
+from . import MOCK_UTC_NOW, MockNow, activity_update_handler, setup_integration
 
 
 async def test_sensors(
@@ -108,7 +110,7 @@ async def test_sensor_activity_update(
             assert state, f"State not found for {entity_entry.entity_id}"
             assert state == snapshot(name=f"{entity_entry.entity_id}-{phase}-state")
 
-    activity_update = _activity_update_handler(hass, lock)
+    activity_update = activity_update_handler(hass, lock)
 
     for lock_activity in lock_activities:
         activity_update(lock_activity, lock_info=None, connection_info=None)
@@ -120,6 +122,53 @@ async def test_sensor_activity_update(
     _snapshot("post-tick")
 
 
+async def test_sensor_operation_cached(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test attributes & restore data are built once for each operation."""
+    await setup_integration(hass, config_entry)
+
+    activity_update = activity_update_handler(hass, lock)
+    sensor = activity_update.__self__
+
+    activity_update(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+        lock_info=None,
+        connection_info=None,
+    )
+    now._tick(2)
+    await hass.async_block_till_done()
+
+    attributes = sensor.extra_state_attributes
+    extra_data = sensor.extra_restore_state_data
+
+    assert attributes == {"timestamp": MOCK_UTC_NOW}
+    assert sensor.extra_state_attributes is attributes
+    assert sensor.extra_restore_state_data is extra_data
+
+    activity_update(
+        LockActivity(
+            timestamp=MOCK_UTC_NOW,
+            status=LockStatus.LOCKED,
+            source=LockOperationSource.AUTO_LOCK,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    now._tick(2)
+    await hass.async_block_till_done()
+
+    assert sensor.extra_state_attributes == {
+        "timestamp": MOCK_UTC_NOW,
+        "source": "auto_lock",
+    }
+    assert sensor.extra_restore_state_data is not extra_data
+    assert sensor.extra_restore_state_data.as_dict()["value"] == "lock_locked"
+
+
 RESTORE_STATE_PARAMETRIZED = ("stored_data", "expected_state", "expected_attributes")
 RESTORE_STATE_SCENARIOS = {
     "simple": {
@@ -134,6 +183,24 @@ RESTORE_STATE_SCENARIOS = {
             "source": "auto_lock",
         },
     },
+    "lock": {
+        "stored_data": {
+            "value": "lock_unlocked",
+            "attributes": {
+                "timestamp": MOCK_UTC_NOW.isoformat(),
+                "source": "pin",
+                "remote_type": "unknown",
+                "slot": 3,
+            },
+        },
+        "expected_state": "lock_unlocked",
+        "expected_attributes": {
+            "timestamp": MOCK_UTC_NOW,
+            "source": "pin",
+            "remote_type": "unknown",
+            "slot": 3,
+        },
+    },
     "no_values": {
         "stored_data": {"value": None, "attributes": None},
         "expected_state": "unknown",
@@ -165,11 +232,15 @@ async def test_restore_sensor_save_state(
     await setup_integration(hass, config_entry)
 
     entity_id = "sensor.front_door_operation"
-    operation_entity = _activity_update_handler(hass, lock).__self__
-    operation_entity._attr_native_value = (
-        expected_state if expected_state != "unknown" else None
+    operation_entity = activity_update_handler(hass, lock).__self__
+    operation_entity._replace_operation(
+        OperationState.from_dict(
+            {
+                "value": expected_state if expected_state != "unknown" else None,
+                "attributes": expected_attributes or None,
+            }
+        )
     )
-    operation_entity._attr_extra_state_attributes = expected_attributes or None
 
     await hass.async_block_till_done()
     await async_mock_restore_state_shutdown_restart(hass)  # trigger saving state
@@ -226,13 +297,3 @@ async def test_restore_state(
         for key, value in state.attributes.items()
         if key not in {"friendly_name", "icon"}
     } == expected_attributes
-
-
-def _activity_update_handler(hass: HomeAssistant, lock: er.RegistryEntry):
-    core_entry = hass.config_entries.async_get_known_entry(lock.config_entry_id)
-    data = core_entry.runtime_data
-    register_activity_update_call = data.lock.register_activity_callback.mock_calls[-1]
-    _name, register_activity_update_args, _kwargs = register_activity_update_call
-    (activity_update,) = register_activity_update_args
-
-    return activity_update
@@ -0,0 +1,315 @@
+"""Test Yale Access Bluetooth Activity external sinks."""
+
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+    AiohttpClientMockResponse,
+)
+from yarl import URL
+
+from custom_components.yalexs_ble_activity.const import (
+    CONF_LOCK_ENTITIES,
+    CONF_SINK_TOPIC,
+    CONF_SINK_URL,
+    DOMAIN,
+    EVENT_ACTIVITY,
+    SINK_BATCH_DELAY,
+    SINK_RETRY_MIN,
+)
+
+from . import MOCK_UTC_NOW, MockNow, activity_update_handler, setup_integration
+from .fake_push_lock import make_activities
+
+SINK_URL = "http://security.local/activity"
+SINK_TOPIC = "security/locks/activity"
+
+
+def _sink_config_entry(**data: str) -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        entry_id="mock-entry-id",
+        data={CONF_LOCK_ENTITIES: ["lock.front_door"], **data},
+    )
+
+
+def _push(hass: HomeAssistant, lock: er.RegistryEntry, count: int) -> None:
+    activity_update = activity_update_handler(hass, lock)
+
+    for activity in make_activities(count, MOCK_UTC_NOW):
+        activity_update(activity, lock_info=None, connection_info=None)
+
+
+def _sent_activities(aioclient_mock: AiohttpClientMocker) -> list[dict]:
+    return [
+        activity
+        for _method, _url, data, _headers in aioclient_mock.mock_calls
+        for activity in json.loads(data)["activities"]
+    ]
+
+
+def _spill_path(hass: HomeAssistant, sink: str) -> Path:
+    return Path(hass.config.path(DOMAIN, "sink", "mock-entry-id", sink))
+
+
+async def test_http_batches(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test activity is posted in batches."""
+    aioclient_mock.post(SINK_URL)
+    config_entry = _sink_config_entry(**{CONF_SINK_URL: SINK_URL})
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    _push(hass, lock, 3)
+    await hass.async_block_till_done()
+
+    assert aioclient_mock.call_count == 0
+
+    now._tick(SINK_BATCH_DELAY)
+    await hass.async_block_till_done()
+
+    assert aioclient_mock.call_count == 1
+    assert _sent_activities(aioclient_mock) == [event.data for event in events]
+    assert config_entry.runtime_data.sinks[0].as_dict() == {
+        "buffered": 0,
+        "spilled_pending": 0,
+        "sent": 3,
+        "batches": 1,
+        "failures": 0,
+        "spilled": 0,
+        "dropped": 0,
+    }
+
+
+@patch("custom_components.yalexs_ble_activity.sink.SINK_BATCH_SIZE", 2)
+@patch("custom_components.yalexs_ble_activity.sink.SINK_BUFFER_SIZE", 4)
+async def test_http_retry_spill(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test failed batches are retried & overflow is spilled to disk."""
+    aioclient_mock.post(SINK_URL, status=503)
+    config_entry = _sink_config_entry(**{CONF_SINK_URL: SINK_URL})
+    await setup_integration(hass, config_entry)
+    forwarder = config_entry.runtime_data.sinks[0]
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    _push(hass, lock, 9)
+    await hass.async_block_till_done()
+
+    now._tick(SINK_BATCH_DELAY)
+    await hass.async_block_till_done()
+
+    assert forwarder.as_dict() == {
+        "buffered": 3,
+        "spilled_pending": 6,
+        "sent": 0,
+        "batches": 0,
+        "failures": 1,
+        "spilled": 6,
+        "dropped": 0,
+    }
+    assert len(list(_spill_path(hass, "http").iterdir())) == 3
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(SINK_URL)
+    now._tick(SINK_RETRY_MIN)
+    await hass.async_block_till_done()
+
+    assert _sent_activities(aioclient_mock) == [event.data for event in events]
+    assert aioclient_mock.call_count == 5
+    assert forwarder.as_dict()["sent"] == 9
+    assert forwarder.as_dict()["spilled_pending"] == 0
+    assert not list(_spill_path(hass, "http").iterdir())
+
+
+@patch("custom_components.yalexs_ble_activity.sink.SINK_SPILL_SEGMENTS", 1)
+@patch("custom_components.yalexs_ble_activity.sink.SINK_BATCH_SIZE", 2)
+@patch("custom_components.yalexs_ble_activity.sink.SINK_BUFFER_SIZE", 2)
+async def test_http_spill_full(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test activity is dropped once the spill is full."""
+    aioclient_mock.post(SINK_URL, status=503)
+    config_entry = _sink_config_entry(**{CONF_SINK_URL: SINK_URL})
+    await setup_integration(hass, config_entry)
+
+    _push(hass, lock, 6)
+    await hass.async_block_till_done()
+
+    assert config_entry.runtime_data.sinks[0].as_dict()["dropped"] == 2
+    assert len(list(_spill_path(hass, "http").iterdir())) == 1
+
+
+async def test_spill_on_unload(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test unsent activity is spilled at unload & sent after setup."""
+    aioclient_mock.post(SINK_URL, exc=TimeoutError)
+    config_entry = _sink_config_entry(**{CONF_SINK_URL: SINK_URL})
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    _push(hass, lock, 3)
+    await hass.async_block_till_done()
+    now._tick(SINK_BATCH_DELAY)
+    await hass.async_block_till_done()
+
+    assert config_entry.runtime_data.sinks[0].failures == 1
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert len(list(_spill_path(hass, "http").iterdir())) == 1
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(SINK_URL)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    now._tick(0)
+    await hass.async_block_till_done()
+
+    assert _sent_activities(aioclient_mock) == [event.data for event in events]
+    assert not list(_spill_path(hass, "http").iterdir())
+
+
+async def test_unload_while_sending(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test unloading waits for a batch that's being sent."""
+    release = asyncio.Event()
+
+    async def _async_slow_response(
+        method: str,
+        url: URL,
+        data: bytes,
+    ) -> AiohttpClientMockResponse:
+        await release.wait()
+        return AiohttpClientMockResponse("POST", URL(SINK_URL))
+
+    aioclient_mock.post(SINK_URL, side_effect=_async_slow_response)
+    config_entry = _sink_config_entry(**{CONF_SINK_URL: SINK_URL})
+    await setup_integration(hass, config_entry)
+    forwarder = config_entry.runtime_data.sinks[0]
+
+    _push(hass, lock, 1)
+    await hass.async_block_till_done()
+    now._tick(SINK_BATCH_DELAY)
+    await asyncio.sleep(0)
+
+    async_stop = forwarder.async_stop
+
+    async def _async_stop() -> None:
+        # the batch is still being sent when the forwarder is stopped.
+        assert forwarder._send_task is not None
+        release.set()
+        await async_stop()
+
+    with patch.object(forwarder, "async_stop", _async_stop):
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+    assert forwarder.as_dict()["sent"] == 1
+    assert not _spill_path(hass, "http").exists()
+
+
+async def test_mqtt(
+    hass: HomeAssistant,
+    mqtt_mock: MagicMock,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test activity is published in batches."""
+    config_entry = _sink_config_entry(**{CONF_SINK_TOPIC: SINK_TOPIC})
+    await setup_integration(hass, config_entry)
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    _push(hass, lock, 3)
+    await hass.async_block_till_done()
+    now._tick(SINK_BATCH_DELAY)
+    await hass.async_block_till_done()
+
+    mqtt_mock.async_publish.assert_called_once()
+    topic, payload, qos, _retain = mqtt_mock.async_publish.call_args.args
+    assert topic == SINK_TOPIC
+    assert qos == 1
+    assert json.loads(payload)["activities"] == [event.data for event in events]
+
+
+async def test_mqtt_unexpected_error(
+    hass: HomeAssistant,
+    mqtt_mock: MagicMock,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test a batch is kept & retried when publishing fails unexpectedly."""
+    mqtt_mock.async_publish = AsyncMock(
+        side_effect=[ValueError("Publish topic cannot contain wildcards"), None]
+    )
+    config_entry = _sink_config_entry(**{CONF_SINK_TOPIC: SINK_TOPIC})
+    await setup_integration(hass, config_entry)
+    forwarder = config_entry.runtime_data.sinks[0]
+
+    events = async_capture_events(hass, EVENT_ACTIVITY)
+    _push(hass, lock, 3)
+    await hass.async_block_till_done()
+    now._tick(SINK_BATCH_DELAY)
+    await hass.async_block_till_done()
+
+    assert forwarder.as_dict()["failures"] == 1
+    assert forwarder.as_dict()["buffered"] == 3
+
+    now._tick(SINK_RETRY_MIN)
+    await hass.async_block_till_done()
+
+    assert mqtt_mock.async_publish.call_count == 2
+    _topic, payload, _qos, _retain = mqtt_mock.async_publish.call_args.args
+    assert json.loads(payload)["activities"] == [event.data for event in events]
+    assert forwarder.as_dict()["sent"] == 3
+
+
+async def test_mqtt_unavailable(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test publishing fails without the MQTT integration."""
+    config_entry = _sink_config_entry(**{CONF_SINK_TOPIC: SINK_TOPIC})
+    await setup_integration(hass, config_entry)
+
+    _push(hass, lock, 1)
+    await hass.async_block_till_done()
+    now._tick(SINK_BATCH_DELAY)
+    await hass.async_block_till_done()
+
+    forwarder = config_entry.runtime_data.sinks[0]
+    assert forwarder.as_dict()["failures"] == 1
+    assert forwarder.as_dict()["buffered"] == 1
+
+    # buffered activity is spilled when home assistant stops.
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+
+    assert forwarder.as_dict()["buffered"] == 0
+    assert forwarder.as_dict()["spilled_pending"] == 1
+    assert len(list(_spill_path(hass, "mqtt").iterdir())) == 1
@@ -0,0 +1,228 @@
+"""Test Yale Access Bluetooth Activity site-wide timeline."""
+
+import datetime as dt
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.yalexs_ble_activity.activity_log import (
+    LockActivityLog,
+    LockTimeline,
+    ProcessedActivity,
+)
+from custom_components.yalexs_ble_activity.const import CONF_LOCK_ENTITIES, DOMAIN
+from custom_components.yalexs_ble_activity.timeline import (
+    InvalidCursorError,
+    timeline_page,
+)
+
+from . import (
+    MOCK_UTC_NOW,
+    MockNow,
+    activity_update_handler,
+    add_mock_lock,
+    setup_integration,
+)
+from .fake_push_lock import make_activities
+
+
+def _processed(minutes: int, state: str = "lock_locked") -> ProcessedActivity:
+    return ProcessedActivity(None, MOCK_UTC_NOW + dt.timedelta(minutes=minutes), state)
+
+
+def _minutes(timeline: LockTimeline) -> list[int]:
+    return [
+        int((activity.timestamp - MOCK_UTC_NOW).total_seconds() // 60)
+        for _, activity in timeline.before()
+    ]
+
+
+async def _async_get_timeline(hass: HomeAssistant, **data: Any) -> dict:
+    return await hass.services.async_call(
+        DOMAIN, "get_timeline", data, blocking=True, return_response=True
+    )
+
+
+def test_lock_timeline() -> None:
+    """Test backfilled activity is inserted in order & old activity is dropped."""
+    timeline = LockTimeline(size=3)
+
+    for minutes in (1, 3, 2):
+        timeline.insert(_processed(minutes))
+
+    assert _minutes(timeline) == [3, 2, 1]
+
+    timeline.insert(_processed(4))
+    assert _minutes(timeline) == [4, 3, 2]
+
+    # activity that's already kept isn't inserted again.
+    timeline.insert(_processed(3))
+    assert _minutes(timeline) == [4, 3, 2]
+
+    # activity older than all kept activity is dropped once the timeline is full.
+    timeline.insert(_processed(0))
+    assert _minutes(timeline) == [4, 3, 2]
+    assert len(timeline) == 3
+
+    newest, _ = next(timeline.before())
+    assert [activity for _, activity in timeline.before(newest)] == [
+        _processed(3),
+        _processed(2),
+    ]
+
+
+def test_restore_timeline() -> None:
+    """Test restored history joins processed activity in the timeline."""
+    log = LockActivityLog("mock-address")
+    log.append(_processed(2, "door_opened"))
+    log.restore([_processed(1, "lock_unlocked"), _processed(2, "door_opened")])
+
+    assert [activity.state for _, activity in log.timeline.before()] == [
+        "door_opened",
+        "lock_unlocked",
+    ]
+
+
+def _timelines() -> dict[str, LockTimeline]:
+    front_door = LockTimeline()
+    back_door = LockTimeline()
+
+    for minutes in (1, 3, 5):
+        front_door.insert(_processed(minutes))
+
+    for minutes in (2, 3, 4):
+        back_door.insert(_processed(minutes))
+
+    return {"sensor.front_door": front_door, "sensor.back_door": back_door}
+
+
+@pytest.mark.parametrize(
+    ("limit", "sizes"),
+    [(4, [4, 2]), (3, [3, 3])],
+    ids=["after_back_door", "after_front_door"],
+)
+def test_timeline_page(limit: int, sizes: list[int]) -> None:
+    """Test pages of the timeline of many locks."""
+    timelines = _timelines()
+    pages = [timeline_page(timelines, limit)]
+
+    while (cursor := pages[-1].cursor) is not None:
+        pages.append(timeline_page(timelines, limit, cursor))
+
+    assert [len(page.activities) for page in pages] == sizes
+    assert [
+        (entity_id, int((activity.timestamp - MOCK_UTC_NOW).total_seconds() // 60))
+        for page in pages
+        for entity_id, activity in page.activities
+    ] == [
+        ("sensor.front_door", 5),
+        ("sensor.back_door", 4),
+        ("sensor.front_door", 3),
+        ("sensor.back_door", 3),
+        ("sensor.back_door", 2),
+        ("sensor.front_door", 1),
+    ]
+    assert timeline_page(timelines, 6).cursor is None
+    assert timeline_page({}, 6).activities == []
+
+
+def test_cursor_after_restart() -> None:
+    """Test a cursor reads the same page from timelines restored after a restart."""
+    cursor = timeline_page(_timelines(), 2).cursor
+    assert cursor is not None
+
+    # the timelines are rebuilt as they would be from restored history.
+    restored = _timelines()
+    restored["sensor.front_door"].insert(_processed(3, "door_closed"))
+
+    assert [
+        (entity_id, activity.state)
+        for entity_id, activity in timeline_page(restored, 2, cursor).activities
+    ] == [("sensor.front_door", "lock_locked"), ("sensor.front_door", "door_closed")]
+
+
+def test_invalid_cursor() -> None:
+    """Test cursors that can't be read."""
+    with pytest.raises(InvalidCursorError):
+        timeline_page({}, 1, "not-a-cursor")
+
+
+async def test_get_timeline(
+    hass: HomeAssistant,
+    lock: er.RegistryEntry,
+    now: MockNow,
+) -> None:
+    """Test paging through the merged timeline of locks."""
+    back_door = add_mock_lock(hass, "lock.back_door")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={CONF_LOCK_ENTITIES: [lock.entity_id, back_door.entity_id]},
+    )
+    await setup_integration(hass, config_entry)
+
+    front_activities = make_activities(4, MOCK_UTC_NOW, dt.timedelta(minutes=2))
+    back_activities = make_activities(
+        4, MOCK_UTC_NOW - dt.timedelta(minutes=1), dt.timedelta(minutes=2)
+    )
+    front_update = activity_update_handler(hass, lock)
+    back_update = activity_update_handler(hass, back_door)
+
+    # the back door's history is read after its more recent activity.
+    for activity in front_activities:
+        front_update(activity, lock_info=None, connection_info=None)
+    for activity in [*back_activities[2:], *back_activities[:2]]:
+        back_update(activity, lock_info=None, connection_info=None)
+
+    await hass.async_block_till_done()
+
+    first = await _async_get_timeline(hass, limit=5)
+    second = await _async_get_timeline(hass, limit=5, cursor=first["cursor"])
+
+    assert second["cursor"] is None
+    assert [
+        (activity["entity_id"], activity["timestamp"])
+        for activity in [*first["activities"], *second["activities"]]
+    ] == [
+        (entity_id, activity.timestamp.isoformat())
+        for activity, entity_id in sorted(
+            [
+                *(
+                    (activity, "sensor.front_door_operation")
+                    for activity in front_activities
+                ),
+                *(
+                    (activity, "sensor.back_door_operation")
+                    for activity in back_activities
+                ),
+            ],
+            key=lambda item: item[0].timestamp,
+            reverse=True,
+        )
+    ]
+    assert first["activities"][0] == {
+        "entity_id": "sensor.front_door_operation",
+        "state": "lock_locked",
+        "timestamp": MOCK_UTC_NOW.isoformat(),
+        "source": "auto_lock",
+        "remote_type": None,
+        "slot": None,
+    }
+
+    response = await _async_get_timeline(hass, entity_id=["sensor.back_door_operation"])
+    assert len(response["activities"]) == 4
+    assert response["cursor"] is None
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await _async_get_timeline(hass, entity_id=["sensor.missing_operation"])
+
+    assert exc_info.value.translation_key == "invalid_entity"
+
+    with pytest.raises(ServiceValidationError) as exc_info:
+        await _async_get_timeline(hass, cursor="not-a-cursor")
+
+    assert exc_info.value.translation_key == "invalid_cursor"
@@ -0,0 +1,199 @@
+"""Test Yale Access Bluetooth Activity websocket API."""
+
+import asyncio
+import logging
+import time
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+from yalexs_ble import DoorActivity, LockActivity
+from yalexs_ble.const import (
+    DoorStatus,
+    LockOperationRemoteType,
+    LockOperationSource,
+    LockStatus,
+)
+
+from custom_components.yalexs_ble_activity.const import CONF_LOCK_ENTITIES, DOMAIN
+from custom_components.yalexs_ble_activity.payload import ActivityPayload
+
+from . import MOCK_UTC_NOW, activity_update_handler, add_mock_lock, setup_integration
+from .fake_push_lock import make_activities
+from .replay import async_replay
+
+_LOGGER = logging.getLogger(__name__)
+
+BENCHMARK_SIZE = 1000
+BENCHMARK_SUBSCRIBERS = 20
+
+
+def test_payload() -> None:
+    """Test payloads are JSON-ready & serialized once."""
+    payload = ActivityPayload.build(
+        "sensor.front_door_operation",
+        "lock_unlocked",
+        {"timestamp": MOCK_UTC_NOW, "source": "pin", "slot": 3},
+    )
+
+    assert payload.data == {
+        "entity_id": "sensor.front_door_operation",
+        "state": "lock_unlocked",
+        "attributes": {
+            "timestamp": "2025-05-20T10:51:32.003245+00:00",
+            "source": "pin",
+            "slot": 3,
+        },
+    }
+    assert payload.serialized == json_bytes(payload.data)
+    assert payload.event_message(7) == json_bytes(
+        {"id": 7, "type": "event", "event": payload.data}
+    )
+
+
+async def test_subscribe(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test subscribing to the activity of all or specific locks."""
+    back_door = add_mock_lock(hass, "lock.back_door")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yale Access Bluetooth Activity",
+        data={CONF_LOCK_ENTITIES: [lock.entity_id, back_door.entity_id]},
+    )
+    await setup_integration(hass, config_entry)
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id({"type": f"{DOMAIN}/subscribe"})
+    assert (await client.receive_json())["success"]
+
+    filtered_client = await hass_ws_client(hass)
+    await filtered_client.send_json_auto_id(
+        {"type": f"{DOMAIN}/subscribe", "entity_id": "sensor.back_door_operation"}
+    )
+    assert (await filtered_client.receive_json())["success"]
+
+    events = async_capture_events(hass, "yalexs_ble_activity")
+    activity_update_handler(hass, lock)(
+        LockActivity(
+            timestamp=MOCK_UTC_NOW,
+            status=LockStatus.UNLOCKED,
+            source=LockOperationSource.PIN,
+            remote_type=LockOperationRemoteType.UNKNOWN,
+            slot=3,
+        ),
+        lock_info=None,
+        connection_info=None,
+    )
+    activity_update_handler(hass, back_door)(
+        DoorActivity(timestamp=MOCK_UTC_NOW, status=DoorStatus.OPENED),
+        lock_info=None,
+        connection_info=None,
+    )
+    await hass.async_block_till_done()
+
+    front_door_event = {
+        "entity_id": "sensor.front_door_operation",
+        "state": "lock_unlocked",
+        "attributes": {
+            "timestamp": MOCK_UTC_NOW.isoformat(),
+            "source": "pin",
+            "remote_type": "unknown",
+            "slot": 3,
+        },
+    }
+    back_door_event = {
+        "entity_id": "sensor.back_door_operation",
+        "state": "door_opened",
+        "attributes": {"timestamp": MOCK_UTC_NOW.isoformat()},
+    }
+
+    assert [event.data for event in events] == [front_door_event, back_door_event]
+    assert (await client.receive_json())["event"] == front_door_event
+    assert (await client.receive_json())["event"] == back_door_event
+
+    msg = await filtered_client.receive_json()
+    assert msg["type"] == "event"
+    assert msg["event"] == back_door_event
+
+
+@patch("custom_components.yalexs_ble_activity.sensor.ACTIVITY_RATE_LIMIT_BURST", 10_000)
+async def test_fan_out_benchmark(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    config_entry: MockConfigEntry,
+    lock: er.RegistryEntry,
+) -> None:
+    """Test the serialization cost of a large replay to many dashboards.
+
+    Each activity is serialized once no matter how many dashboards are
+    subscribed. The cost is compared with serializing the payload for each
+    subscriber.
+    """
+    await setup_integration(hass, config_entry)
+
+    clients = [await hass_ws_client(hass) for _ in range(BENCHMARK_SUBSCRIBERS)]
+
+    for client in clients:
+        await client.send_json_auto_id({"type": f"{DOMAIN}/subscribe"})
+        assert (await client.receive_json())["success"]
+
+    serializations = 0
+    serialize_time = 0.0
+
+    def _timed_json_bytes(data: object) -> bytes:
+        nonlocal serializations, serialize_time
+
+        started = time.perf_counter()
+        result = json_bytes(data)
+        serialize_time += time.perf_counter() - started
+        serializations += 1
+
+        return result
+
+    async def _async_receive(client) -> list[dict]:
+        return [await client.receive_json() for _ in range(BENCHMARK_SIZE)]
+
+    receivers = [asyncio.create_task(_async_receive(client)) for client in clients]
+
+    with patch(
+        "custom_components.yalexs_ble_activity.payload.json_bytes", _timed_json_bytes
+    ):
+        report = await async_replay(
+            hass,
+            activity_update_handler(hass, lock),
+            make_activities(BENCHMARK_SIZE, MOCK_UTC_NOW),
+        )
+
+    received = await asyncio.gather(*receivers)
+
+    payloads = [msg["event"] for msg in received[0]]
+    started = time.perf_counter()
+
+    for msg_id in range(BENCHMARK_SUBSCRIBERS):
+        for payload in payloads:
+            json_bytes({"id": msg_id, "type": "event", "event": payload})
+
+    per_subscriber_time = time.perf_counter() - started
+
+    _LOGGER.info(
+        "replayed %s activities to %s subscribers in %.3fs; "
+        "serialized once in %.4fs vs %.4fs per subscriber",
+        report.count,
+        BENCHMARK_SUBSCRIBERS,
+        report.duration,
+        serialize_time,
+        per_subscriber_time,
+    )
+
+    assert report.count == BENCHMARK_SIZE
+    assert serializations == BENCHMARK_SIZE
+    assert all([msg["event"] for msg in messages] == payloads for messages in received)